@@ -18,18 +18,65 @@ Class:
 import json
 import re
 import collections
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import RequestException
 
 from javcra.application.checkpart.check_requires import init_env
 from javcra.application.checkpart.check_requires.dnf_api import DnfApi
 from javcra.application.checkpart.check_requires.osc_api import OscApi
-from javcra.application.checkpart.check_requires.shell_api_tool import ShellCmdApi
+from javcra.application.checkpart.check_requires.repodata_api import RepodataIndex
+from javcra.application.checkpart.check_requires.shell_api_tool import ShellCmdApi, get_command_runner
 from javcra.common.constant import BRANCH_LIST, LTS_BRANCH, REPO_EP_NAME, REPO_STA_NAME, EPOL_SRC_NAME, BRANCH_MAP, \
     X86_FRAME
+from javcra.common.release_body import ReleaseBody
+from javcra.libs.config import global_config
+from javcra.libs.http_base import get_pooled_session, host_slot
 from javcra.libs.log import logger
 
+BatchResult = collections.namedtuple("BatchResult", ["results", "failed"])
+# blocks of release issue that the update pkglist is collected from
+PKGLIST_BLOCK_NAMES = {"cve": "1、CVE", "bugfix": "2、bugfix", "req": "3、requires"}
+
+
+class ReleaseIssueSnapshot:
+    """
+    memoized content of the release issue, it is fetched once and shared by the
+    Issue objects of one command until the release issue is updated
+    """
+
+    def __init__(self):
+        self._issue_info = dict()
+        self._lock = threading.Lock()
+
+    def get(self, owner, fetch):
+        """
+        get the issue info of the release issue, fetch it only when it is not cached
+
+        Args:
+            owner: enterprise repository
+            fetch: callable to fetch the issue info when it is not cached
+
+        Returns:
+            issue info of the release issue or None
+        """
+        with self._lock:
+            if owner not in self._issue_info:
+                issue_info = fetch()
+                # failed fetches are not cached so that the next call retries
+                if not issue_info:
+                    return issue_info
+                self._issue_info[owner] = issue_info
+            return self._issue_info[owner]
+
+    def invalidate(self):
+        """
+        drop the cached content, the next access fetches the release issue again
+        """
+        with self._lock:
+            self._issue_info.clear()
+
 
 class Issue:
     """cover gitee APIs to python methods"""
@@ -44,6 +91,16 @@ class Issue:
         self.token = token
         self.issue_num = issue_num
         self.date = time.strftime("%Y%m%d", time.localtime())
+        self.release_snapshot = ReleaseIssueSnapshot()
+
+    def use_release_snapshot(self, snapshot):
+        """
+        share the release issue snapshot with other Issue objects of the same command
+
+        Args:
+            snapshot: ReleaseIssueSnapshot object
+        """
+        self.release_snapshot = snapshot
 
     def __generate_request_params(self, **kwargs):
         """
@@ -75,14 +132,17 @@ class Issue:
             params = {}
         success_code = {201, 200}
 
+        # all the gitee requests of the process share the keep-alive connection pool
+        session = get_pooled_session()
         try:
-            resp = requests.request(method.lower(), url, params=params, data=data, headers=self.headers)
+            with host_slot(url):
+                resp = session.request(method.lower(), url, params=params, data=data, headers=self.headers)
 
-            retry_count = 0
-            while resp.status_code == 408 and retry_count < retry:
-                logger.error("Api request timed out, retrying %s." % retry_count)
-                resp = requests.request(method.lower(), url, params=params, data=data, headers=self.headers)
-                retry_count += 1
+                retry_count = 0
+                while resp.status_code == 408 and retry_count < retry:
+                    logger.error("Api request timed out, retrying %s." % retry_count)
+                    resp = session.request(method.lower(), url, params=params, data=data, headers=self.headers)
+                    retry_count += 1
 
             if resp.status_code not in success_code:
                 logger.error("Api request failed, url: %s, response: %s." % (url, resp.text))
@@ -92,6 +152,59 @@ class Issue:
             return None
         return resp
 
+    @staticmethod
+    def batch_issue_request(issue_numbers, handler, max_workers=None):
+        """
+        call handler for each issue in parallel, the requests to the same host are
+        still limited by HTTP_HOST_CONCURRENCY
+
+        Args:
+            issue_numbers: list of issue id
+            handler: callable that takes an issue id and returns its result, an empty
+                     result or an exception means the issue failed
+            max_workers: number of threads, defaults to GITEE_BATCH_WORKERS
+
+        Returns:
+            BatchResult: results in the order of issue_numbers, None for the failed
+                         issues, and the list of failed issue ids
+        """
+
+        def run(issue_number):
+            try:
+                return handler(issue_number)
+            except (RequestException, ValueError, TypeError, KeyError) as error:
+                logger.error("failed to request issue %s, the error is %s" % (issue_number, error))
+                return None
+
+        issue_numbers = list(issue_numbers)
+        max_workers = min(max_workers or global_config.GITEE_BATCH_WORKERS, len(issue_numbers))
+        if max_workers <= 1:
+            results = [run(issue_number) for issue_number in issue_numbers]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(run, issue_numbers))
+
+        results = [result if result else None for result in results]
+        failed = [issue_number for issue_number, result in zip(issue_numbers, results) if result is None]
+        if failed:
+            logger.error("failed to request %s of %s issues: %s" % (len(failed), len(issue_numbers), ",".join(map(str, failed))))
+        return BatchResult(results, failed)
+
+    def get_issues_info(self, issue_numbers, owner="open_euler"):
+        """
+        get the info of several issues in enterprise repository in parallel
+
+        Args:
+            issue_numbers: list of issue id
+            owner: enterprise repository
+
+        Returns:
+            BatchResult: issue info dicts in the order of issue_numbers and the failed issue ids
+        """
+        return self.batch_issue_request(
+            issue_numbers, lambda issue_number: self.get_issue_info(issue_number, owner=owner)
+        )
+
     def externel_gitee_api_url(self, url_name, **kwargs):
         """
         Description: externel usage of gitee url api
@@ -170,6 +283,21 @@ class Issue:
 
         Returns:
 
+        """
+        if issue_number == self.issue_num:
+            return self.release_snapshot.get(owner, lambda: self.__request_issue_info(issue_number, owner))
+        return self.__request_issue_info(issue_number, owner)
+
+    def __request_issue_info(self, issue_number, owner):
+        """
+        request the info of specified issue in enterprise repository
+
+        Args:
+            issue_number: issue id
+            owner: enterprise repository
+
+        Returns:
+            issue info dict or None
         """
         issue_url = self.__get_gitee_api_url("issue_url", owner=owner, issue_id=issue_number)
         resp = self.gitee_api_request("get", issue_url)
@@ -287,11 +415,46 @@ class Issue:
         data = self.__generate_request_params(**kwargs)
         update_issue_url = self.__get_gitee_api_url("update_issue_url", owner=owner)
 
-        return self.gitee_api_request(
+        resp = self.gitee_api_request(
             "patch",
             url=update_issue_url,
             data=data
         )
+        # the release issue may have been changed, fetch it again on the next access
+        self.release_snapshot.invalidate()
+        return resp
+
+    def commit_body_edits(self, edits, base_body):
+        """
+        apply the staged edits of release issue body and update the issue in one request,
+        when the body has been changed since base_body was read, the edits are applied
+        on the latest body so that the changes of others are kept
+
+        Args:
+            edits: ReleaseBodyEdits object
+            base_body: release issue body str which the edits are staged on
+
+        Raises:
+            ValueError: the block of an edit does not exist in the latest body
+
+        Returns:
+            update issue result, True if there is nothing to update
+        """
+        if not edits:
+            logger.info("nothing changed in release issue body, no need to update.")
+            return True
+
+        # the issue api of gitee has no conditional update, a PATCH overwrites the body whatever
+        # it is now, so a conflict can not be detected from the response. The body is read again
+        # right before the PATCH to keep the changes made by others since base_body was read
+        self.release_snapshot.invalidate()
+        latest_body = self.get_issue_body(self.issue_num)
+        if not latest_body:
+            logger.error("can not get the latest release issue body, failed to update it.")
+            return None
+        if latest_body != base_body:
+            logger.info("release issue body has been changed since it was read, apply the edits on the latest body.")
+        return self.update_issue(body=edits.apply(latest_body))
 
     def create_issue_comment(self, comment):
         """
@@ -349,62 +512,35 @@ class Issue:
         return body
 
     @staticmethod
-    def __process_body_for_pkglist(body, block_name):
+    def __get_pkglist_from_specific_part(release_body, block_name, pkg_set):
         """
-        process the md string of cve bugfix requires for pkg_list
+        get pkglist from cve part、bugfix part、requires part
 
         Args:
-            body: block body
-            block_name: given [cve,bugfix,req]
+            release_body: ReleaseBody object of release issue
+            block_name: cve、bugfix、req
+            pkg_set: set of pkglist
 
         Returns:
-            current pkgs in block
+            pkg_set
         """
-        # using regular to match the specific issue content in the table
-        content = re.compile("\|\-\|\\n(?P<content>.*)", re.S).search(body)
-        if not content:
-            content = ""
-        else:
-            content = content["content"]
+        block = release_body.block(PKGLIST_BLOCK_NAMES[block_name])
+        if not block:
+            logger.warning("Not found %s content when getting pkglist from specific part." % block_name)
+            return pkg_set
 
-        repos = set()
         # If the part is cve or bugfix, then the second column is pkgname
-        pkgname_index_dict = {"cve": 2, "bugfix": 2, "req": 1}
-
-        for line in content.splitlines():
-            if not line:
-                continue
+        pkgname_index_dict = {"cve": 1, "bugfix": 1, "req": 0}
+        for row in block.data_rows():
             try:
-                repo_idx = pkgname_index_dict.get(block_name)
-                repo_info = line.split("|")[repo_idx]
+                pkg_set.add(row.column(pkgname_index_dict.get(block_name)))
             except IndexError:
                 logger.error("Can not get pkg info in {} block".format(block_name))
-            else:
-                repos.add(repo_info)
-        return repos
-
-    def __get_pkglist_from_specific_part(self, block_res, block_name, pkg_set):
-        """
-        get pkglist from cve part、bugfix part、requires part
-
-        Args:
-            block_res: cve part res、bugfix part res、requires part res
-            block_name: cve、bugfix、requires
-            pkg_set: set of pkglist
-
-        Returns:
-            pkg_set
-        """
-        # If exists specific part, then get packages
-        if block_res:
-            pkg_set.update(self.__process_body_for_pkglist(block_res[block_name], block_name=block_name))
-        else:
-            logger.warning("Not found %s content when getting pkglist from specific part." % block_name)
         return pkg_set
 
     def get_update_list(self):
         """
-        use regular to get pkglist
+        get pkglist from the cve, bugfix and requires tables of release issue
 
         Args:
             issue_body: issue body str
@@ -416,16 +552,12 @@ class Issue:
 
         if issue_body:
             pkgs = set()
-
-            # using regular to get the contents of the specified part
-            cve_res = re.compile("(?P<cve>1、CVE.*?\\n\\n)", re.S).search(issue_body)
-            bugfix_res = re.compile("(?P<bugfix>2、bugfix.*?\\n\\n)", re.S).search(issue_body)
-            req_res = re.compile("(?P<req>3、requires.*?\\n\\n)", re.S).search(issue_body)
+            release_body = ReleaseBody.parse(issue_body)
 
             # get packages from cve、bugfix、requires table
-            cve_pkgs = self.__get_pkglist_from_specific_part(cve_res, "cve", pkgs)
-            cve_bugfix_pkgs = self.__get_pkglist_from_specific_part(bugfix_res, "bugfix", cve_pkgs)
-            cve_bugfix_req_pkgs = self.__get_pkglist_from_specific_part(req_res, "req", cve_bugfix_pkgs)
+            cve_pkgs = self.__get_pkglist_from_specific_part(release_body, "cve", pkgs)
+            cve_bugfix_pkgs = self.__get_pkglist_from_specific_part(release_body, "bugfix", cve_pkgs)
+            cve_bugfix_req_pkgs = self.__get_pkglist_from_specific_part(release_body, "req", cve_bugfix_pkgs)
 
             return list(cve_bugfix_req_pkgs)
         else:
@@ -479,10 +611,24 @@ class Issue:
         standard_repo_condition = DnfApi.generate_repo_condition(repo_standard)
         epol_repo_condition = DnfApi.generate_repo_condition(repo_epol)
 
-        pkglist_standard = []
-        pkglist_epol = []
+        # the repodata of repos is parsed once, "dnf info" is only used for the repos it can not be loaded
+        repo_index = RepodataIndex(repofile) if repofile else None
+
+        def in_repos(pkg_name, repo_names, repo_condition):
+            """
+            whether the package is provided by the repos
+            """
+            provided = repo_index.provides(pkg_name, repo_names) if repo_index else None
+            if provided is None:
+                provided = shell_cmd(["dnf", "info", pkg_name], repo_file_condition, repo_condition)
+            return provided
+
         obs_branchs = collections.OrderedDict(BRANCH_MAP).get(branch)
-        for pkg in pkg_list:
+
+        def classify(pkg):
+            """
+            get the repo type of package, standard, epol or None
+            """
             # use "osc" to get pkg_name
             pkg_name = OscApi.get_pkg_rpm_name(pkg, obs_branchs[0])
             if len(pkg_name) == 0:
@@ -496,18 +642,23 @@ class Issue:
                                                    X86_FRAME)
             if len(pkg_name) == 0:
                 logger.error(" %s did not compile successfully in %s" % (pkg, branch))
-                continue
-            basis_cmd = ["dnf", "info", pkg_name]
-            # use "dnf" to query package info of specific repo
-            if shell_cmd(basis_cmd, repo_file_condition, standard_repo_condition):
-                pkglist_standard.append(pkg)
-            elif shell_cmd(basis_cmd, repo_file_condition, epol_repo_condition):
-                pkglist_epol.append(pkg)
+                return None
+            if in_repos(pkg_name, repo_standard, standard_repo_condition):
+                return "standard"
+            if in_repos(pkg_name, repo_epol, epol_repo_condition):
+                return "epol"
+            return None
+
+        # the packages are classified in parallel, the osc and dnf commands share the bound of command runner
+        pkg_list = list(pkg_list)
+        repo_types = get_command_runner().map(classify, pkg_list)
+        pkglist_standard = [pkg for pkg, repo_type in zip(pkg_list, repo_types) if repo_type == "standard"]
+        pkglist_epol = [pkg for pkg, repo_type in zip(pkg_list, repo_types) if repo_type == "epol"]
         return pkglist_standard, pkglist_epol
 
     def get_issue_tables(self):
         """
-        use regex to get bugfix and cve tables
+        get pkglist from the cve, bugfix and requires tables of release issue
 
         Args:
             issue_body: issue body str
@@ -522,16 +673,12 @@ class Issue:
             return []
 
         pkgs = set()
-
-        # using regular to get the contents of the specified part
-        cve_res = re.compile("(?P<cve>1、CVE.*?\\n\\n)", re.S).search(issue_body)
-        bugfix_res = re.compile("(?P<bugfix>2、bugfix.*?\\n\\n)", re.S).search(issue_body)
-        req_res = re.compile("(?P<req>3、requires.*?\\n\\n)", re.S).search(issue_body)
+        release_body = ReleaseBody.parse(issue_body)
 
         # get packages from cve、bugfix、requires table
-        pkgs = self.__get_pkglist_from_specific_part(cve_res, "cve", pkgs)
-        pkgs = self.__get_pkglist_from_specific_part(bugfix_res, "bugfix", pkgs)
-        pkgs = self.__get_pkglist_from_specific_part(req_res, "req", pkgs)
+        pkgs = self.__get_pkglist_from_specific_part(release_body, "cve", pkgs)
+        pkgs = self.__get_pkglist_from_specific_part(release_body, "bugfix", pkgs)
+        pkgs = self.__get_pkglist_from_specific_part(release_body, "req", pkgs)
 
         return list(pkgs)
 
@@ -14,8 +14,11 @@
 Description: conver multiple Jenkins restful APIs to python methods
 Class:
 """
+import copy
+import hashlib
 import math
 import re
+import threading
 import time
 import xml.etree.ElementTree as ET
 from collections import defaultdict
@@ -25,6 +28,7 @@ import jenkins
 from gevent import monkey
 
 monkey.patch_all(ssl=False)
+import requests
 from requests.exceptions import RequestException
 from javcra.libs.log import logger
 from javcra.common.constant import AARCH_FRAME
@@ -36,6 +40,32 @@ from javcra.common.constant import X86_TM_JOB
 from javcra.common.constant import ACTUATOR_DICT
 from javcra.common.constant import ISO_BUILD_WAIT_NUMBER
 from javcra.common.constant import MIN_JENKINS_BUILD_WAIT_TIME
+from javcra.common.constant import MAX_JENKINS_BUILD_WAIT_TIME
+from javcra.common.constant import JENKINS_QUEUE_WAIT_TIME
+from javcra.common.constant import JENKINS_CONSOLE_TIMEOUT
+from javcra.api.jenkins_wait import BackoffPolicy, BuildWaiter
+
+# prefix of the parallel self-build job names, like selfbuild_1
+SELFBUILD_JOB_PREFIX = "selfbuild_"
+# demo: Starting building: function-item » release-manager » openeuler-202106281604 » aarch64 » 2-11 #14
+STARTING_BUILD_PATTERN = re.compile(r"Starting building: (?P<job_name>\S.*?) #(?P<build_id>\d+)")
+# demo: Build function-item » release-manager » openeuler-202106281604 » aarch64 » 2-11 #14 completed: SUCCESS
+COMPLETED_BUILD_PATTERN = re.compile(r"Build (?P<job_name>\S.*?) #(?P<build_id>\d+) completed: (?P<result>[A-Z_]+)")
+
+
+def get_config_hash(config_xml):
+    """
+    get the md5 of jenkins job config, the xml is canonicalized first so that the
+    xml declaration and the indentation returned by jenkins do not change the hash
+
+    Args:
+        config_xml: config xml str
+
+    Returns:
+        md5 hex str
+    """
+    canonical_xml = ET.canonicalize(xml_data=config_xml, strip_text=True)
+    return hashlib.md5(canonical_xml.encode("utf-8")).hexdigest()
 
 
 def catch_jenkins_error(func):
@@ -73,6 +103,9 @@ class JenkinsJob(object):
         self.paral_job_num = paral_num
         self.branch = branch
         self.release_date = update_time
+        # template job name -> parsed config, every template is downloaded and parsed once
+        self._template_configs = dict()
+        self._template_lock = threading.Lock()
 
     @staticmethod
     def get_path_prefix():
@@ -118,9 +151,9 @@ class JenkinsJob(object):
         base_path = self.get_base_path()
         for index in range(1, self.paral_job_num + 1):
             parallel_job_dict[AARCH_FRAME].append(base_path + "/" + AARCH_FRAME + "/" +
-                                                  "selfbuild_" + str(index))
+                                                  SELFBUILD_JOB_PREFIX + str(index))
             parallel_job_dict[X86_FRAME].append(base_path + "/" + X86_FRAME + "/" +
-                                                "selfbuild_" + str(index))
+                                                SELFBUILD_JOB_PREFIX + str(index))
         return parallel_job_dict
 
     @staticmethod
@@ -182,6 +215,44 @@ class JenkinsJob(object):
             logger.error("failed to create the jenkins job: %s. %s", (job_name, err))
             return False
 
+    def reconfig_job(self, job_name, job_config):
+        """
+        update the config of existing jenkins job
+
+        Args:
+            job_name: jenkins job name
+            job_config: xml config
+
+        Returns:
+            True or False
+        """
+        try:
+            self.server.reconfig_job(job_name, job_config)
+            return True
+        except jenkins.JenkinsException as err:
+            logger.error("failed to update the config of jenkins job: %s. %s" % (job_name, err))
+            return False
+
+    def get_folder_jobs(self, folder_name):
+        """
+        get the full names of the jobs in jenkins folder
+
+        Args:
+            folder_name: folder name
+
+        Raises:
+            jenkins.JenkinsException: the jobs of the folder can not be read
+
+        Returns:
+            set of job names, empty if the folder does not exist
+        """
+        # get_job_info raises the same JenkinsException for a missing folder and for a server error
+        if not self.server.job_exists(folder_name):
+            logger.info("folder %s does not exist yet" % folder_name)
+            return set()
+        folder_info = self.server.get_job_info(folder_name)
+        return {folder_name + "/" + job["name"] for job in folder_info.get("jobs", []) if job.get("name")}
+
     def build_jenkins_job(self, job_name, params=None, retry=3):
         """
         build the jenkins job
@@ -331,12 +402,37 @@ class JenkinsJob(object):
             logger.error("failed to get parameter definition of parallel job.")
             return None
 
-    def update_config(self, target_job, template_job_config, packages):
+    def get_template_config(self, template_job):
+        """
+        get the parsed config of template job, the config is downloaded and parsed
+        on the first call and cached for the later jobs created from the same template
+
+        Args:
+            template_job: template job name
+
+        Raises:
+            jenkins.NotFoundException: template job does not exist
+
+        Returns:
+            xml.etree.ElementTree.Element: root of the config, it must not be modified
+        """
+        with self._template_lock:
+            template_config = self._template_configs.get(template_job)
+            if template_config is None:
+                if not self.server.job_exists(template_job):
+                    raise jenkins.NotFoundException("template job:%s not found." % template_job)
+
+                config_xml = self.server.get_job_config(template_job)
+                template_config = ET.fromstring(config_xml.encode("utf-8"))
+                self._template_configs[template_job] = template_config
+        return template_config
+
+    def update_config(self, target_job, template_root, packages):
         """
         update config for trigger、aarch64、x86 jenkins job
         Args:
             target_job: target jenkins job to create
-            template_job_config: template jenkins job
+            template_root: parsed config of template job, it is modified in place
             packages: packages
 
         Returns:
@@ -344,7 +440,7 @@ class JenkinsJob(object):
 
         """
         paral_job_dict = self.generate_parallel_job_name()
-        root = ET.fromstring(template_job_config.encode("utf-8"))
+        root = template_root
         if root:
             # modify the setting of trigger
             if "trigger" in target_job:
@@ -368,7 +464,7 @@ class JenkinsJob(object):
 
         return None
 
-    def create_multi_job(self, template_job, jobs, packages, concurrency=75, retry=3):
+    def create_multi_job(self, template_job, jobs, packages, concurrency=75, retry=3, existing_jobs=None):
         """
         create multi jenkins job
         Args:
@@ -377,6 +473,8 @@ class JenkinsJob(object):
             packages: packages
             concurrency: concurrency,default to 75
             retry: count to retry
+            existing_jobs: names of the target jobs which already exist, their configs
+                           are updated only when they differ from the desired ones
         Returns:
             True or False
         """
@@ -389,7 +487,7 @@ class JenkinsJob(object):
             _failed_jobs = []
             for idx in range(batch):
                 # jenkins job object list
-                work_list = [gevent.spawn(self.dispatch, job, template_job, pkg_list)
+                work_list = [gevent.spawn(self.dispatch, job, template_job, pkg_list, existing_jobs)
                              for job in target_jobs[idx * concurrency: (idx + 1) * concurrency]]
                 gevent.joinall(work_list)
                 for work in work_list:
@@ -412,33 +510,48 @@ class JenkinsJob(object):
         return True
 
     @catch_jenkins_error
-    def dispatch(self, job, template_job, packages):
+    def dispatch(self, job, template_job, packages, existing_jobs=None):
         """
-        dispatch create jenkins job
+        dispatch create jenkins job, the existing job is updated only when its config
+        differs from the desired one
         Args:
             job: jenkins job name
             template_job: template job name
             packages: package names
+            existing_jobs: names of the target jobs which already exist
 
         Returns:
             dict like {"job": job, "result": create_result}
         """
-        job_exists = self.server.job_exists(template_job)
-        if not job_exists:
-            raise jenkins.NotFoundException("template job:%s not found." % template_job)
+        template_config = self.get_template_config(template_job)
+        # every job modifies its own copy of the parsed template
+        updated_config = self.update_config(job, copy.deepcopy(template_config), packages)
+        if not updated_config:
+            return {"job": job, "result": False}
 
-        temp_job_config = self.server.get_job_config(template_job)
-        updated_config = self.update_config(job, temp_job_config, packages)
-        create_result = self.create_new_job(job, updated_config)
-        return {"job": job, "result": create_result}
+        if not existing_jobs or job not in existing_jobs:
+            return {"job": job, "result": self.create_new_job(job, updated_config)}
+
+        if get_config_hash(self.server.get_job_config(job)) == get_config_hash(updated_config):
+            logger.info("the config of job %s is up to date." % job)
+            return {"job": job, "result": True}
+        return {"job": job, "result": self.reconfig_job(job, updated_config)}
 
     @catch_jenkins_error
-    def create_selfbuild_jenkins_jobs(self, packages):
+    def create_selfbuild_jenkins_jobs(self, packages, reconcile=True):
         """
         Create trigger, aarch64, x86 jobs respectively
+
+        Args:
+            packages: packages to build
+            reconcile: when it is True, the existing jobs are compared with the desired ones, only the
+                       jobs that differ are created or updated and the redundant self-build jobs are deleted.
+                       Otherwise the folder of the branch is deleted and all jobs are created again
         Returns:
             created_res
         """
+        if not reconcile:
+            self.delete_jenkins_job(self.get_base_path())
         self.create_folder()
         template_job_list = [TRIGGER_TM_JOB, AARCH64_TM_JOB, X86_TM_JOB]
         for template_job in template_job_list:
@@ -447,12 +560,106 @@ class JenkinsJob(object):
                 return False
 
             target_jobs = self.get_jobs_to_create(template_job)
-            created_res = self.create_multi_job(template_job, target_jobs, packages)
+            existing_jobs = set()
+            if reconcile:
+                for folder_name in {job.rsplit("/", 1)[0] for job in target_jobs}:
+                    existing_jobs.update(self.get_folder_jobs(folder_name))
+
+            created_res = self.create_multi_job(template_job, target_jobs, packages, existing_jobs=existing_jobs)
             if not created_res:
                 return False
 
+            # self-build jobs left by a run with more parallel jobs
+            redundant_jobs = [job for job in existing_jobs - set(target_jobs)
+                              if job.rsplit("/", 1)[-1].startswith(SELFBUILD_JOB_PREFIX)]
+            for job in sorted(redundant_jobs):
+                self.delete_jenkins_job(job)
+
         return True
 
+    def wait_builds(self, builds, max_wait_time=MAX_JENKINS_BUILD_WAIT_TIME, timeout=None):
+        """
+        wait for the results of several builds in one loop
+
+        Args:
+            builds: list of (job name, build id)
+            max_wait_time: max seconds between two polls of a build
+            timeout: seconds to wait, None means waiting until all the builds finish
+
+        Returns:
+            dict: {(job name, build id): result}
+        """
+        waiter = self.new_build_waiter(max_wait_time, timeout)
+        for job_name, job_id in builds:
+            waiter.watch(job_name, job_id)
+        return waiter.wait()
+
+    def new_build_waiter(self, max_wait_time=MAX_JENKINS_BUILD_WAIT_TIME, timeout=None):
+        """
+        get a waiter which logs the result of every finished build
+
+        Args:
+            max_wait_time: max seconds between two polls of a build
+            timeout: seconds to wait, None means waiting until all the builds finish
+
+        Returns:
+            BuildWaiter
+        """
+        policy = BackoffPolicy(min_delay=min(MIN_JENKINS_BUILD_WAIT_TIME, max_wait_time), max_delay=max_wait_time)
+        return BuildWaiter(
+            self.server,
+            policy=policy,
+            timeout=timeout,
+            on_complete=lambda job_name, job_id, build_res: logger.info(
+                "%s %s build finished. The result status is %s" % (job_name, job_id, build_res))
+        )
+
+    def iter_console_lines(self, job_name, build_id, on_wait=None, timeout=JENKINS_CONSOLE_TIMEOUT):
+        """
+        read the console output of build by the progressive text api of jenkins, the lines are
+        yielded as soon as they are written, until the build finishes or the timeout is reached
+
+        Args:
+            job_name: job name
+            build_id: build id
+            on_wait: function called every time before waiting for more output
+            timeout: seconds to wait for the build to finish writing its output
+
+        Returns:
+            generator of console lines
+        """
+        job_url = self.server.build_job_url(job_name).rsplit("/", 1)[0]
+        progressive_url = "%s/%s/logText/progressiveText" % (job_url, build_id)
+        policy = BackoffPolicy(min_delay=JENKINS_QUEUE_WAIT_TIME, max_delay=MIN_JENKINS_BUILD_WAIT_TIME)
+        deadline = time.monotonic() + timeout
+        start = 0
+        idle_polls = 0
+        partial_line = ""
+        while True:
+            response = self.server.jenkins_request(requests.Request("GET", progressive_url, params={"start": start}))
+            text = response.text or ""
+            # X-Text-Size is the byte offset to start the next read from
+            start = int(response.headers.get("X-Text-Size", start + len(text.encode("utf-8"))))
+            lines = (partial_line + text).split("\n")
+            partial_line = lines.pop()
+            for line in lines:
+                yield line
+
+            # X-More-Data is set while the build is still running
+            if response.headers.get("X-More-Data") != "true":
+                break
+            idle_polls = 0 if text else idle_polls + 1
+            if on_wait:
+                on_wait()
+            delay = policy.next_delay(0, overdue_polls=idle_polls)
+            if time.monotonic() + delay > deadline:
+                logger.warning("stop reading the console output of %s #%s after %ss" % (job_name, build_id, timeout))
+                break
+            time.sleep(delay)
+
+        if partial_line:
+            yield partial_line
+
     @catch_jenkins_error
     def get_job_result_status(self, job_name, job_id):
         """
@@ -464,13 +671,7 @@ class JenkinsJob(object):
         Returns:
             build_res: SUCCESS, FAILURE, ABORTED, None(means the job is under building)
         """
-        while True:
-            time.sleep(5)
-            build_res = self.server.get_build_info(job_name, job_id)['result']
-            if build_res:
-                break
-        logger.info("%s %s build finished. The result status is %s" % (job_name, job_id, build_res))
-        return build_res
+        return self.wait_builds([(job_name, job_id)]).get((job_name, int(job_id)))
 
     def build_specific_job(self, job_name, params=None):
         """
@@ -491,11 +692,21 @@ class JenkinsJob(object):
             logger.info("successfully trigger %s, please waiting the jenkins job result..." % job_name)
 
             # The returned dict will have a "why" key if the queued item is still waiting for an executor
+            policy = BackoffPolicy(min_delay=JENKINS_QUEUE_WAIT_TIME, max_delay=MIN_JENKINS_BUILD_WAIT_TIME)
+            polls = 0
             while True:
-                time.sleep(1)
                 queue_item_resp = self.server.get_queue_item(queue_item)
+                if queue_item_resp.get("cancelled"):
+                    logger.error("the queue item of %s has been cancelled." % job_name)
+                    return None
+                # the item which has left the queue has the number of the build
+                build_number = (queue_item_resp.get("executable") or {}).get("number")
+                if build_number:
+                    return build_number
                 if not queue_item_resp.get("why"):
                     break
+                time.sleep(policy.next_delay(0, overdue_polls=polls))
+                polls += 1
 
             # when the queue is over, the build id can be obtained
             last_job_num = self.server.get_job_info(job_name)['lastBuild']['number']
@@ -534,39 +745,45 @@ class JenkinsJob(object):
 
         """
 
-        def get_paral_job_id():
-            job_name_id_dict = dict()
-            try:
-                target_trigger_job = self.get_jobs_to_create(TRIGGER_TM_JOB)[0]
-                job_id = self.build_specific_job(target_trigger_job)
-                trigger_status = self.get_job_result_status(target_trigger_job, job_id)
-                logger.info("trigger job build finished, the result status is: %s" % trigger_status)
-
-                # trigger output example:
-                # Starting building: function-item » release-manager » openeuler-202106281604 » aarch64 » 2-11 #14
-                output = self.server.get_build_console_output(target_trigger_job, job_id)
-                new_output = output.replace(" » ", "/").splitlines()
-
-                for line in new_output:
-                    if "Starting building" in line:
-                        line_info = line.split()
-                        _job_name = line_info[2]
-                        build_id_info = line_info[3]
-                        job_name_id_dict[_job_name] = re.findall(r'\d+', build_id_info)[0]
-                logger.info("finished to get build id dict: %s" % job_name_id_dict)
-            except IndexError as err:
-                logger.error("error in get self_build parallel job id. %s" % err)
-                return {}
-
-            return job_name_id_dict
+        try:
+            target_trigger_job = self.get_jobs_to_create(TRIGGER_TM_JOB)[0]
+        except IndexError as err:
+            logger.error("error in get self_build parallel job id. %s" % err)
+            return []
+        job_id = self.build_specific_job(target_trigger_job)
+        if not job_id:
+            return []
+
+        # the parallel builds are watched as soon as the trigger starts them, and the
+        # results that the trigger writes when they complete are taken without a poll
+        # trigger output example:
+        # Starting building: function-item » release-manager » openeuler-202106281604 » aarch64 » 2-11 #14
+        # Build function-item » release-manager » openeuler-202106281604 » aarch64 » 2-11 #14 completed: SUCCESS
+        waiter = self.new_build_waiter()
+        job_name_id_map = dict()
+        for line in self.iter_console_lines(target_trigger_job, job_id, on_wait=waiter.poll):
+            starting_build = STARTING_BUILD_PATTERN.search(line)
+            if starting_build:
+                _job_name = starting_build["job_name"].replace(" » ", "/")
+                job_name_id_map[_job_name] = starting_build["build_id"]
+                waiter.watch(_job_name, starting_build["build_id"])
+                continue
+            completed_build = COMPLETED_BUILD_PATTERN.search(line)
+            if completed_build:
+                waiter.notify(completed_build["job_name"].replace(" » ", "/"), completed_build["build_id"],
+                              completed_build["result"])
+        logger.info("finished to get build id dict: %s" % job_name_id_map)
+
+        trigger_status = self.get_job_result_status(target_trigger_job, job_id)
+        logger.info("trigger job build finished, the result status is: %s" % trigger_status)
 
-        job_name_id_map = get_paral_job_id()
         # get the status and output according to the job name and id
+        build_results = waiter.wait()
         job_status_list = []
         for job_name, build_id in job_name_id_map.items():
             job_name_status_dict = {
                 "name": job_name,
-                "status": self.get_job_result_status(job_name, int(build_id)),
+                "status": build_results.get((job_name, int(build_id))),
                 "output": self.get_output_hyperlink(job_name, build_id)
             }
             job_status_list.append(job_name_status_dict)
@@ -603,22 +820,12 @@ class JenkinsJob(object):
         Args:
             job_name: job name
             job_id: jenkins job build id
-            wait_time: The amount of time it takes to get jenkins' result
+            wait_time: max seconds between two polls, the build is given up after
+                       ISO_BUILD_WAIT_NUMBER times of it
         Returns:
-            build_res: SUCCESS, FAILURE, ABORTED, None(means the job is under building)
+            build_res: SUCCESS, FAILURE, ABORTED, BUILD(means the job is still building when timeout)
         """
-        get_status_results = 0
-        while True:
-            time.sleep(wait_time)
-            build_res = self.server.get_build_info(job_name, job_id)["result"]
-            get_status_results += 1
-            if build_res:
-                break
-            if get_status_results > ISO_BUILD_WAIT_NUMBER:
-                build_res = "BUILD"
-                break
-        logger.info(
-            "%s %s build finished. The result status is %s"
-            % (job_name, job_id, build_res)
+        build_results = self.wait_builds(
+            [(job_name, job_id)], max_wait_time=wait_time, timeout=wait_time * ISO_BUILD_WAIT_NUMBER
         )
-        return build_res
+        return build_results.get((job_name, int(job_id)))
@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: wait for the results of jenkins builds
+Class: BackoffPolicy, BuildWaiter
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jenkins
+from requests import RequestException
+
+from javcra.common.constant import JENKINS_WAIT_BACKOFF_FACTOR
+from javcra.common.constant import JENKINS_WAIT_ESTIMATE_RATIO
+from javcra.common.constant import JENKINS_WAIT_JITTER
+from javcra.common.constant import MAX_JENKINS_BUILD_WAIT_TIME
+from javcra.common.constant import MIN_JENKINS_BUILD_WAIT_TIME
+from javcra.libs.config import global_config
+from javcra.libs.log import logger
+
+# result of the build which is still building when the waiting times out
+BUILD_TIMEOUT_RESULT = "BUILD"
+
+
+class BackoffPolicy:
+    """
+    interval between two polls of a build. Before the estimated duration of the build is
+    reached, the interval is a ratio of the remaining time, so that short builds are detected
+    soon after they finish; after that it grows exponentially from min_delay to max_delay
+    """
+
+    def __init__(self, min_delay=MIN_JENKINS_BUILD_WAIT_TIME, max_delay=MAX_JENKINS_BUILD_WAIT_TIME,
+                 factor=JENKINS_WAIT_BACKOFF_FACTOR, jitter=JENKINS_WAIT_JITTER,
+                 estimate_ratio=JENKINS_WAIT_ESTIMATE_RATIO):
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.factor = factor
+        self.jitter = jitter
+        self.estimate_ratio = estimate_ratio
+
+    def next_delay(self, elapsed, estimated=None, overdue_polls=0):
+        """
+        get the seconds to wait before the next poll
+
+        Args:
+            elapsed: seconds since the build started
+            estimated: estimated duration of the build in seconds, None if unknown
+            overdue_polls: number of polls after the estimated duration
+
+        Returns:
+            float: seconds
+        """
+        if estimated and elapsed < estimated:
+            delay = (estimated - elapsed) * self.estimate_ratio
+        else:
+            delay = self.min_delay * self.factor ** overdue_polls
+        delay = min(max(delay, self.min_delay), self.max_delay)
+        # the jitter spreads the polls of builds started at the same time
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(delay, self.max_delay)
+
+
+class _WatchedBuild:
+    """
+    polling state of a watched build
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.next_poll = started
+        self.estimated = None
+        self.overdue_polls = 0
+
+
+class BuildWaiter:
+    """
+    wait for many jenkins builds in one loop, the builds which are due in the same tick are
+    polled by a bounded worker pool. A build is finished when a poll of it returns the result,
+    or when its result is pushed by notify, like the result read from the console output of
+    the job which started it
+    """
+
+    def __init__(self, server, policy=None, timeout=None, on_complete=None, max_workers=None):
+        """
+        Args:
+            server: jenkins.Jenkins object
+            policy: BackoffPolicy object
+            timeout: seconds to wait for all the builds, None means waiting until all of them finish
+            on_complete: callback called with job name, build id and result when a build finishes
+            max_workers: max number of builds polled at the same time, defaults to JENKINS_WAIT_WORKERS
+        """
+        self.server = server
+        self.policy = policy or BackoffPolicy()
+        self.timeout = timeout
+        self.on_complete = on_complete
+        self.max_workers = max_workers or global_config.JENKINS_WAIT_WORKERS
+        self._pending = dict()
+        self._results = dict()
+        self._notified = dict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def watch(self, job_name, build_id):
+        """
+        add a build to wait for
+
+        Args:
+            job_name: job name
+            build_id: build id
+        """
+        self._pending.setdefault((job_name, int(build_id)), _WatchedBuild(time.monotonic()))
+
+    def notify(self, job_name, build_id, result):
+        """
+        push the result of a finished build, the waiting loop wakes up at once
+
+        Args:
+            job_name: job name
+            build_id: build id
+            result: build result like SUCCESS, FAILURE
+        """
+        with self._lock:
+            self._notified[(job_name, int(build_id))] = result
+        self._wakeup.set()
+
+    def _finish(self, key, result):
+        """
+        record the result of build
+        """
+        self._pending.pop(key, None)
+        self._results[key] = result
+        if self.on_complete:
+            self.on_complete(key[0], key[1], result)
+
+        total = len(self._results) + len(self._pending)
+        if total > 1:
+            logger.info("%s/%s builds finished, %.0f%% complete." % (
+                len(self._results), total, len(self._results) * 100 / total))
+
+    def _poll_due_builds(self):
+        """
+        poll all the builds which are due in one tick
+        """
+        now = time.monotonic()
+        due_builds = [(key, build) for key, build in self._pending.items() if build.next_poll <= now]
+        if len(due_builds) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due_builds))) as executor:
+                build_infos = list(executor.map(lambda due_build: self._get_build_info(due_build[0]), due_builds))
+        else:
+            build_infos = [self._get_build_info(key) for key, _ in due_builds]
+
+        now = time.monotonic()
+        for (key, build), build_info in zip(due_builds, build_infos):
+            self._update(key, build, build_info, now)
+
+    def _get_build_info(self, key):
+        """
+        poll the build, the error of one build does not stop the waiting of the others
+
+        Returns:
+            dict: build info, empty if the poll failed
+        """
+        try:
+            return self.server.get_build_info(*key)
+        except (jenkins.JenkinsException, RequestException) as err:
+            logger.warning("failed to get the build info of %s %s, poll it later: %s" % (key[0], key[1], err))
+            return dict()
+
+    def _update(self, key, build, build_info, now):
+        """
+        finish the build by the polled build info, or schedule the next poll when it is still building
+        or the poll failed
+        """
+        if build_info.get("result"):
+            self._finish(key, build_info["result"])
+            return
+
+        # estimatedDuration is in milliseconds, -1 if jenkins has no history of the job
+        estimated = build_info.get("estimatedDuration") or -1
+        if estimated > 0:
+            build.estimated = estimated / 1000
+        elapsed = now - build.started
+        if build.estimated is None or elapsed >= build.estimated:
+            build.overdue_polls += 1
+        build.next_poll = now + self.policy.next_delay(elapsed, build.estimated, build.overdue_polls - 1)
+
+    def wait(self):
+        """
+        wait until all the watched builds finish or the timeout is reached
+
+        Returns:
+            dict: {(job name, build id): result}, the result of the build which is still
+                  building when the timeout is reached is "BUILD"
+        """
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        while self.poll():
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                for key in list(self._pending):
+                    logger.error("timeout when waiting for the result of %s %s." % key)
+                    self._finish(key, BUILD_TIMEOUT_RESULT)
+                break
+
+            wakeup_time = min(build.next_poll for build in self._pending.values())
+            if deadline is not None:
+                wakeup_time = min(wakeup_time, deadline)
+            self._wakeup.wait(max(wakeup_time - now, 0))
+            self._wakeup.clear()
+        return dict(self._results)
+
+    def results(self):
+        """
+        results of the builds which have finished
+
+        Returns:
+            dict: {(job name, build id): result}
+        """
+        return dict(self._results)
+
+    def poll(self):
+        """
+        one tick of waiting without sleep, take the notified results and poll the due builds,
+        it can be called by the caller which is doing other things while the builds are running
+
+        Returns:
+            int: number of builds which are still building
+        """
+        with self._lock:
+            notified, self._notified = self._notified, dict()
+        for key, result in notified.items():
+            if key in self._pending:
+                self._finish(key, result)
+        if self._pending:
+            self._poll_due_builds()
+        return len(self._pending)
@@ -14,13 +14,47 @@
 file archiving
 """
 import argparse
+import base64
+import hashlib
+import http.client
+import json
 import os
 import logging
+import threading
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import wraps
+from obs import DeleteObjectsRequest
+from obs import GetObjectHeader
+from obs import Object
 from obs import ObsClient
 from obs import PutObjectHeader
 
+# max number of objects returned by one listObjects request, 1000 is the upper limit of obs
+LIST_PAGE_SIZE = 1000
+# max number of objects deleted by one deleteObjects request, 1000 is the upper limit of obs
+DELETE_BATCH_SIZE = 1000
+# number of deleteObjects requests sent at the same time
+DELETE_WORKERS = 4
+# number of log files uploaded at the same time
+UPLOAD_WORKERS = 8
+# times to upload a log file before giving up
+UPLOAD_RETRY = 3
+# log files larger than it are uploaded by multipart upload
+MULTIPART_THRESHOLD = 20 * 1024 * 1024
+MULTIPART_PART_SIZE = 9 * 1024 * 1024
+# number of parts of a log file uploaded at the same time
+MULTIPART_TASK_NUM = 4
+# records the uploaded log files in local_path, it is removed when all the files are uploaded
+UPLOAD_MANIFEST = ".obs_upload_manifest"
+# suffix of the checkpoint file of multipart upload, it is kept beside the log file
+UPLOAD_CHECKPOINT_SUFFIX = ".upload_record"
+# key of the object metadata (x-obs-meta-md5) which records the md5 of the uploaded log file
+MD5_METADATA_KEY = "md5"
+READ_CHUNK_SIZE = 1024 * 1024
+# bytes of log requested by one ranged getObject when reading the tail of log
+TAIL_CHUNK_SIZE = 64 * 1024
+
 
 def catch_error(func):
     """
@@ -40,6 +74,121 @@ def catch_error(func):
     return inner
 
 
+class ResultLogIndex:
+    """
+    index of the archived install and build logs keyed by (branch, result type, package),
+    it is built by one listing of the branch and looked up exactly by package name
+    """
+
+    def __init__(self):
+        self._logs = dict()
+        self._packages = dict()
+
+    def add(self, object_key):
+        """
+        Add an archived log to the index
+        Args:
+            object_key: like install_build_log/branch_name/build_result/failed_log/package_name/self_build_res
+
+        Returns:
+            True if the object is a log of package
+        """
+        parts = object_key.split("/")
+        if len(parts) < 5 or parts[3] != "failed_log" or not parts[4]:
+            return False
+        branch, result_type, package = parts[1], parts[2], parts[4]
+        self._logs.setdefault((branch, result_type, package), []).append(object_key)
+        self._packages.setdefault((branch, result_type), set()).add(package)
+        return True
+
+    def logs(self, branch, result_type, package):
+        """
+        Get the logs of package
+        Args:
+            branch: branch name
+            result_type: build_result or check_result
+            package: package name
+
+        Returns:
+            list: object keys of logs in listing order
+        """
+        return list(self._logs.get((branch, result_type, package), []))
+
+    def packages(self, branch, result_type):
+        """
+        Get the packages which have logs
+        Args:
+            branch: branch name
+            result_type: build_result or check_result
+
+        Returns:
+            set: package names
+        """
+        return set(self._packages.get((branch, result_type), set()))
+
+
+class UploadManifest:
+    """
+    the log files already uploaded by an interrupted archive, one json line {"key": key, "md5": md5}
+    is appended for each uploaded file, so that the next archive only uploads the rest
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.uploaded = dict()
+        self._lock = threading.Lock()
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    self.uploaded[record["key"]] = record["md5"]
+                except (ValueError, KeyError, TypeError):
+                    # the last line may be broken when the archive is interrupted
+                    continue
+
+    def is_uploaded(self, object_key, md5):
+        """
+        Whether the log file is uploaded with the same content
+        """
+        return self.uploaded.get(object_key) == md5
+
+    def record(self, object_key, md5):
+        """
+        Record the uploaded log file
+        """
+        with self._lock:
+            self.uploaded[object_key] = md5
+            with open(self.manifest_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"key": object_key, "md5": md5}) + "\n")
+
+    def remove(self):
+        """
+        Remove the manifest after all the log files are uploaded
+        """
+        with self._lock:
+            if os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+            self.uploaded.clear()
+
+
+def file_md5(path):
+    """
+    md5 of local file, the file is read by chunks
+    Args:
+        path: Local file path
+
+    Returns:
+        hex digest of md5
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
 class ObsCloud:
     """
     file archiving
@@ -75,14 +224,71 @@ class ObsCloud:
         Returns:
             files: All objects in the bucket
         """
-        files = list()
-        resp = self.obs_client.listObjects(self.bucketName, prefix=prefix_name)
-        # If the response status code is less than 300, the operation succeeds
-        if resp.status < 300:
-            for content in resp.body.contents:
-                files.append(content.key)
-            return files
-        return files
+        return list(self.iter_objects(prefix_name))
+
+    def _iter_pages(self, prefix_name, page_size, delimiter):
+        """
+        list the objects page by page, the next page starts from the marker of the last page
+        Args:
+            prefix_name: prefix of objects
+            page_size: max number of objects in a page
+            delimiter: delimiter to group the objects into common prefixes
+
+        Returns:
+            generator of response bodies
+        """
+        marker = None
+        while True:
+            resp = self.obs_client.listObjects(self.bucketName, prefix=prefix_name, marker=marker,
+                                               max_keys=page_size, delimiter=delimiter)
+            # If the response status code is less than 300, the operation succeeds
+            if resp.status >= 300:
+                logging.error("Failed to list the objects of %s" % prefix_name)
+                return
+            body = resp.body
+            yield body
+
+            if not getattr(body, "is_truncated", False):
+                return
+            marker = getattr(body, "next_marker", None)
+            if not marker:
+                # next_marker is only returned when delimiter is given, otherwise the last key is the marker
+                keys = [content.key for content in body.contents or []]
+                keys.extend(common_prefix.prefix for common_prefix in getattr(body, "commonPrefixs", None) or [])
+                if not keys:
+                    return
+                marker = max(keys)
+
+    def iter_objects(self, prefix_name, page_size=LIST_PAGE_SIZE, delimiter=None):
+        """
+        Gets all objects in the bucket page by page
+        Args:
+            prefix_name: prefix of objects
+            page_size: max number of objects requested at a time
+            delimiter: when it is given, only the objects directly under the "directory" of
+                       prefix_name are listed, see iter_dirs for the sub directories
+
+        Returns:
+            generator of object keys
+        """
+        for body in self._iter_pages(prefix_name, page_size, delimiter):
+            for content in body.contents or []:
+                yield content.key
+
+    def iter_dirs(self, prefix_name, page_size=LIST_PAGE_SIZE, delimiter="/"):
+        """
+        Gets the "directories" directly under prefix_name
+        Args:
+            prefix_name: prefix of objects, like "install_build_log/branch/"
+            page_size: max number of objects requested at a time
+            delimiter: delimiter of directory
+
+        Returns:
+            generator of common prefixes like "install_build_log/branch/build_result/"
+        """
+        for body in self._iter_pages(prefix_name, page_size, delimiter):
+            for common_prefix in getattr(body, "commonPrefixs", None) or []:
+                yield common_prefix.prefix
 
     def delete_file(self, path_name):
         """
@@ -97,30 +303,67 @@ class ObsCloud:
         return False
 
     @staticmethod
-    def os_list_dir(local_path, choice):
+    def iter_local_logs(local_path, choice):
         """
-        Go through local folders
-        Returns:
-            paths: A collection of folders that meet the requirements
+        Go through local folders, the log files are yielded as soon as they are found
+        Args:
+            local_path: Locally generate the directory above the log folder
             choice: build_result or check_result
+
+        Returns:
+            generator of log file paths
         """
-        paths = []
         find_path = os.path.join(local_path, choice)
         if choice == "check_result" and os.path.exists(os.path.join(find_path, "failed_install_pkglist")):
-            paths.append(os.path.join(find_path, "failed_install_pkglist"))
+            yield os.path.join(find_path, "failed_install_pkglist")
         find_path = os.path.join(find_path, "failed_log")
         if not os.path.exists(find_path):
-            return paths
+            return
         for log_dir, dirs, files in os.walk(find_path, topdown=False):
-            paths.extend([os.path.join(log_dir, file) for file in files])
-        return paths
+            for file in files:
+                if not file.endswith(UPLOAD_CHECKPOINT_SUFFIX):
+                    yield os.path.join(log_dir, file)
+
+    @staticmethod
+    def os_list_dir(local_path, choice):
+        """
+        Go through local folders
+        Returns:
+            paths: A collection of folders that meet the requirements
+            choice: build_result or check_result
+        """
+        return list(ObsCloud.iter_local_logs(local_path, choice))
+
+    def object_md5(self, path_name):
+        """
+        md5 of the object saved on the cloud, it is read from the md5 metadata which is set when
+        the log file is uploaded, or from the etag of the object uploaded by a single request
+        Args:
+            path_name: A file object saved on the cloud
+
+        Returns:
+            hex digest of md5, None if the object does not exist or its md5 is unknown
+        """
+        resp = self.obs_client.getObjectMetadata(self.bucketName, path_name)
+        # If the response status code is less than 300, the operation succeeds
+        if resp.status >= 300:
+            return None
+        md5 = dict(getattr(resp, "header", None) or []).get(MD5_METADATA_KEY)
+        if md5:
+            return md5
+        etag = (getattr(resp.body, "etag", None) or "").strip('"')
+        # the etag of object uploaded by multipart upload is not the md5 of its content
+        if not etag or "-" in etag:
+            return None
+        return etag
 
-    def upload_dir(self, path_name, path):
+    def upload_dir(self, path_name, path, md5=None):
         """
         Upload folder
         Args:
             path_name: A file object saved on the cloud
             path: Local file path
+            md5: hex digest of md5 of the file, obs verifies the uploaded content with it
 
         Returns:
             True or False
@@ -128,12 +371,127 @@ class ObsCloud:
 
         headers = PutObjectHeader()
         headers.contentType = 'text/plain'
-        resp = self.obs_client.putFile(self.bucketName, path_name, path, headers=headers)
+        metadata = None
+        if md5:
+            headers.md5 = base64.b64encode(bytes.fromhex(md5)).decode()
+            metadata = {MD5_METADATA_KEY: md5}
+        resp = self.obs_client.putFile(self.bucketName, path_name, path, metadata=metadata, headers=headers)
+        # If the response status code is less than 300, the operation succeeds
+        if resp.status < 300:
+            return True
+        return False
+
+    def upload_large_file(self, path_name, path, md5=None):
+        """
+        Upload large file by multipart upload, the parts are uploaded in parallel and
+        an interrupted upload continues from the checkpoint file beside the local file
+        Args:
+            path_name: A file object saved on the cloud
+            path: Local file path
+            md5: hex digest of md5 of the file, it is saved in the metadata of the object
+
+        Returns:
+            True or False
+        """
+        headers = PutObjectHeader()
+        headers.contentType = 'text/plain'
+        metadata = {MD5_METADATA_KEY: md5} if md5 else None
+        resp = self.obs_client.uploadFile(self.bucketName, path_name, path, partSize=MULTIPART_PART_SIZE,
+                                          taskNum=MULTIPART_TASK_NUM, enableCheckpoint=True,
+                                          checkpointFile=path + UPLOAD_CHECKPOINT_SUFFIX, metadata=metadata,
+                                          headers=headers)
         # If the response status code is less than 300, the operation succeeds
         if resp.status < 300:
             return True
         return False
 
+    def upload_log(self, path_name, path, manifest, retry=UPLOAD_RETRY):
+        """
+        Upload a log file unless it is unchanged, retry when the upload fails
+        Args:
+            path_name: A file object saved on the cloud
+            path: Local file path
+            manifest: UploadManifest of the archive
+            retry: times to upload the file
+
+        Returns:
+            True or False
+        """
+        md5 = file_md5(path)
+        if manifest.is_uploaded(path_name, md5):
+            return True
+        # the object uploaded by an earlier archive is kept if its content is unchanged
+        if self.object_md5(path_name) == md5:
+            manifest.record(path_name, md5)
+            return True
+
+        large_file = os.path.getsize(path) > MULTIPART_THRESHOLD
+        for attempt in range(1, retry + 1):
+            try:
+                if large_file:
+                    upload_res = self.upload_large_file(path_name, path, md5)
+                else:
+                    upload_res = self.upload_dir(path_name, path, md5)
+            except (OSError, http.client.HTTPException) as error:
+                logging.warning("Failed to upload %s: %s" % (path_name, error))
+                upload_res = False
+            if upload_res:
+                manifest.record(path_name, md5)
+                return True
+            logging.warning("%s File upload failed, attempt %s/%s" % (path_name, attempt, retry))
+        return False
+
+    def delete_objects(self, object_keys):
+        """
+        Delete several objects in one request
+        Args:
+            object_keys: keys of objects, at most DELETE_BATCH_SIZE
+
+        Returns:
+            dict: the keys failed to delete and the reasons
+        """
+        delete_request = DeleteObjectsRequest(quiet=True, objects=[Object(key=key) for key in object_keys])
+        resp = self.obs_client.deleteObjects(self.bucketName, delete_request)
+        # If the response status code is less than 300, the operation succeeds
+        if resp.status >= 300:
+            reason = getattr(resp, "errorMessage", None) or "status code {}".format(resp.status)
+            return {key: reason for key in object_keys}
+        # in quiet mode only the objects failed to delete are returned
+        return {error.key: error.message or error.code for error in getattr(resp.body, "error", None) or []}
+
+    def bulk_delete(self, prefix_name, batch_size=DELETE_BATCH_SIZE, max_workers=DELETE_WORKERS):
+        """
+        Delete the objects under prefix by batches, the batches are deleted in parallel
+        while the objects are being listed
+        Args:
+            prefix_name: prefix_name
+            batch_size: max number of objects deleted by one request
+            max_workers: max number of requests sent at the same time
+
+        Returns:
+            dict: the keys failed to delete and the reasons, empty if all deleted successfully
+        """
+        fails = dict()
+        batch = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = set()
+            for path_name in self.iter_objects(prefix_name):
+                batch.append(path_name)
+                if len(batch) < batch_size:
+                    continue
+                # keep at most max_workers batches in memory
+                if len(running) >= max_workers:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        fails.update(future.result())
+                running.add(executor.submit(self.delete_objects, batch))
+                batch = []
+            if batch:
+                running.add(executor.submit(self.delete_objects, batch))
+            for future in running:
+                fails.update(future.result())
+        return fails
+
     def delete_dir(self, prefix_name):
         """
         Bulk delete file objects
@@ -144,13 +502,10 @@ class ObsCloud:
             True: All deleted successfully
             False: An object exists that failed to delete
         """
-        path_names = self.bucket_list(prefix_name)
-        fails = []
-        for path_name in path_names:
-            res = self.delete_file(path_name)
-            if not res:
-                logging.error("Failed to delete %s file" % path_name)
-                fails.append(path_name)
+        fails = self.bulk_delete(prefix_name)
+        for path_name, reason in sorted(fails.items()):
+            logging.error("Failed to delete %s file" % path_name)
+            logging.debug("the reason of deleting %s failed: %s" % (path_name, reason))
         if fails:
             return False
         return True
@@ -171,40 +526,101 @@ class ObsCloud:
             return True
         return False
 
-    def parse_install_build_content(self, branch, prefix_name="install_build_log"):
+    def object_size(self, object_key):
         """
-        parse install build content
+        Get the size of object by its metadata
         Args:
-            branch: branch
-            prefix_name: prefix_name
+            object_key: Name of the object under the bucket
 
         Returns:
-            content_list: content list
+            size in bytes, None if failed to get the metadata
+        """
+        resp = self.obs_client.getObjectMetadata(self.bucketName, object_key)
+        # If the response status code is less than 300, the operation succeeds
+        if resp.status >= 300:
+            return None
+        return int(getattr(resp.body, "contentLength", None) or 0)
+
+    def read_range(self, object_key, start, end):
+        """
+        Read a range of object into memory
+        Args:
+            object_key: Name of the object under the bucket
+            start: first byte of the range
+            end: last byte of the range, inclusive
+
+        Returns:
+            bytes, None if failed to read
+        """
+        headers = GetObjectHeader(range="{}-{}".format(start, end))
+        resp = self.obs_client.getObject(self.bucketName, object_key, headers=headers, loadStreamInMemory=True)
+        # If the response status code is less than 300, the operation succeeds
+        if resp.status >= 300:
+            return None
+        return getattr(resp.body, "buffer", None) or b""
+
+    def tail_lines(self, object_key, line_num, chunk_size=TAIL_CHUNK_SIZE):
+        """
+        Read the last lines of a text object, the ranges are read backwards from the end of
+        the object until enough lines are collected, so the rest of the object is never downloaded
+        Args:
+            object_key: Name of the object under the bucket
+            line_num: number of lines to read
+            chunk_size: bytes requested at a time
+
+        Returns:
+            str of the last lines, None if failed to read the object
         """
-        content_list = {}
-        build_res = set()
-        install_res = set()
-        build_list = self.bucket_list("{}/{}/build_result/failed_log".format(prefix_name, branch))
+        end = self.object_size(object_key)
+        if end is None:
+            return None
+        data = b""
+        # one more line break than line_num makes sure the first of the lines is complete
+        while end > 0 and data.count(b"\n") <= line_num:
+            start = max(end - chunk_size, 0)
+            chunk = self.read_range(object_key, start, end - 1)
+            if chunk is None:
+                return None
+            data = chunk + data
+            end = start
+        lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+        return "".join(lines[-line_num:])
 
-        install_list = self.bucket_list("{}/{}/check_result/failed_log".format(prefix_name, branch))
+    def result_log_index(self, branch, prefix_name="install_build_log"):
+        """
+        Index the archived logs of branch in one listing
+        Args:
+            branch: branch
+            prefix_name: prefix_name
 
-        # the objects stored on cloud are cut according to "/",
-        # and the position of 4 is the name of the software package
-        # example: /install_build_log/branch_name/build_result/failed_log/package_name/self_build_res
-        for build_con in build_list:
-            if build_con.split("/")[4]:
-                build_res.add(build_con.split("/")[4])
-        content_list["build_list"] = build_res
+        Returns:
+            ResultLogIndex
+        """
+        index = ResultLogIndex()
+        for object_key in self.iter_objects("{}/{}/".format(prefix_name, branch)):
+            index.add(object_key)
+        return index
 
-        for install_con in install_list:
-            if install_con.split("/")[4]:
-                install_res.add(install_con.split("/")[4])
-        content_list["install_list"] = install_res
+    def parse_install_build_content(self, branch, prefix_name="install_build_log", log_index=None):
+        """
+        parse install build content
+        Args:
+            branch: branch
+            prefix_name: prefix_name
+            log_index: ResultLogIndex of branch, it is built if not given
 
-        return content_list
+        Returns:
+            content_list: content list
+        """
+        if log_index is None:
+            log_index = self.result_log_index(branch, prefix_name)
+        return {
+            "build_list": log_index.packages(branch, "build_result"),
+            "install_list": log_index.packages(branch, "check_result"),
+        }
 
     @catch_error
-    def run(self, branch, choice, local_path, prefix_name="install_build_log"):
+    def run(self, branch, choice, local_path, prefix_name="install_build_log", max_workers=UPLOAD_WORKERS):
         """
         log dir archived function main entry
         Args:
@@ -212,6 +628,7 @@ class ObsCloud:
             choice: Select install or compile log logging
             prefix_name: Save the document special name
             local_path: Locally generate the directory above the log folder
+            max_workers: max number of log files uploaded at the same time
 
         Returns:
             True: The operation success
@@ -223,21 +640,40 @@ class ObsCloud:
         if not self.bucket_exist():
             logging.error("The bucket does not exist")
             return False
-        paths = self.os_list_dir(local_path, choice=choice)
-        if not paths:
+
+        manifest = UploadManifest(os.path.join(local_path, UPLOAD_MANIFEST))
+        failed_upload_file = []
+        found_file = False
+        running = dict()
+
+        def collect(futures):
+            for future in futures:
+                if not future.result():
+                    logging.error("%s File upload failed" % running[future])
+                    failed_upload_file.append(running[future])
+                running.pop(future)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for path in self.iter_local_logs(local_path, choice):
+                found_file = True
+                path_name = path.replace(str(local_path), "")
+                if not path_name.startswith("/"):
+                    path_name = "/" + path_name
+                # keep at most twice max_workers files waiting for upload
+                if len(running) >= max_workers * 2:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(self.upload_log, "{}/{}{}".format(prefix_name, branch, path_name),
+                                         path, manifest)
+                running[future] = path
+            collect(list(running))
+
+        if not found_file:
             logging.error("The file to be uploaded was not retrieved locally")
             return False
-        failed_upload_file = []
-        for path in paths:
-            path_name = path.replace(str(local_path), "")
-            if not path_name.startswith("/"):
-                path_name = "/" + path_name
-            upload_res = self.upload_dir("{}/{}{}".format(prefix_name, branch, path_name), path)
-            if not upload_res:
-                logging.error("%s File upload failed" % path_name)
-                failed_upload_file.append(path)
         if failed_upload_file:
             return False
+        manifest.remove()
         return True
 
 
@@ -252,9 +688,11 @@ if __name__ == '__main__':
     parser.add_argument("--server", required=False, type=str, default="obs.cn-north-4.myhuaweicloud.com",
                         help="Name of the branch")
     parser.add_argument("--bucketname", required=False, type=str, default="release-tools", help="Name of the branch")
+    parser.add_argument("--workers", required=False, type=int, default=UPLOAD_WORKERS,
+                        help="Number of log files uploaded at the same time")
     args = parser.parse_args()
     client = ObsCloud(args.ak, args.sk, args.server, args.bucketname)
-    RESP = client.run(args.branch, args.choice, args.path)
+    RESP = client.run(args.branch, args.choice, args.path, max_workers=args.workers)
     if not RESP:
         logging.error("File archiving failure")
     logging.info("File archiving succeeded")
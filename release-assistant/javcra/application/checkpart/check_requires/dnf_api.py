@@ -13,10 +13,16 @@
 # Create: 2021-7-13
 # ******************************************************************************/
 
+import glob
 import logging
 import os
 
-from .shell_api_tool import ShellCmdApi, RpmNameParser
+from .shell_api_tool import ShellCmdApi
+
+# fields of the packages queried by `dnf repoquery --qf`, separated by "|" which is not allowed in rpm names
+REPOQUERY_FIELDS = ("name", "epoch", "version", "release", "arch", "repoid")
+REPOQUERY_FORMAT = "|".join("%{{{}}}".format(field) for field in REPOQUERY_FIELDS)
+
 
 class DnfApi(ShellCmdApi):
     @staticmethod
@@ -51,42 +57,57 @@ class DnfApi(ShellCmdApi):
         return ["-c", repo_file]
 
     @staticmethod
-    def get_pkg_version(pkg_name, repos=None, repo_file=None, rt_err=False):
+    def repoquery(query, repos=None, repo_file=None, rt_err=False):
         """
-        use command [dnf list (--repo repo_name)* | grep pkg_name.src] to get [e:v-r] format version
-        return epoch, version, release
+        use command [dnf repoquery --qf format (--repo repo_name)* query] to query packages,
+        the machine-readable output is parsed in process
         Args:
-            pkg_name: pkg_name
+            query: arguments of repoquery, like ["--arch", "src", "pkg_a", "pkg_b"]
             repos: repos
             repo_file: repo_file
             rt_err: True, return stdout and stderr; False only return stdout
 
         Returns:
-            epoch: epoch
-            version: version
-            release: release
+            result: list of dict with the keys in REPOQUERY_FIELDS
         """
-        cmd = ["dnf", "list"]
+        cmd = ["dnf", "repoquery", "--qf", REPOQUERY_FORMAT]
         repo_condition = DnfApi.generate_repo_condition(repos)
         cmd.extend(repo_condition)
         repo_file_condition = DnfApi.generate_repo_file_condition(repo_file)
         cmd.extend(repo_file_condition)
-        cmd.extend(["|", "grep", f"{pkg_name}.src"])
-        
+        cmd.extend(query)
         stdout = DnfApi.call_subprocess(cmd, rt_err)
-        release = ""
-        epoch = "0"
-        for line in stdout.splitlines(False):
-            if not line:
+        result = []
+        for line in stdout.splitlines():
+            fields = line.strip().split("|")
+            # the lines of dnf messages like "Last metadata expiration check" are skipped
+            if len(fields) != len(REPOQUERY_FIELDS):
                 continue
-            pkg_info = line.split()
-            if len(pkg_info) != 3: # `dnf list` result: <rpm_name> <full-ver> <repo> has 3 attribute
+            result.append(dict(zip(REPOQUERY_FIELDS, fields)))
+        return result
+
+    @staticmethod
+    def get_pkg_version(pkg_name, repos=None, repo_file=None, rt_err=False):
+        """
+        use command [dnf repoquery --arch src pkg_name] to get [e:v-r] format version
+        return epoch, version, release
+        Args:
+            pkg_name: pkg_name
+            repos: repos
+            repo_file: repo_file
+            rt_err: True, return stdout and stderr; False only return stdout
+
+        Returns:
+            epoch: epoch
+            version: version
+            release: release, without dist like ".oe1"
+        """
+        [epoch, version, release] = ["0", "", ""]
+        for pkg in DnfApi.repoquery(["--arch", "src", pkg_name], repos, repo_file, rt_err):
+            if pkg["name"] != pkg_name:
                 continue
-            # pkg_info[1] -> <full-ver> -> <version>-<release>.<dist>
-            # pkg_info[1].rsplit(".", 1) -> [<version>-<release>, <dist>]
-            # pkg_info[1].rsplit(".", 1)[0] -> <version>-<release>
-            ver_info = pkg_info[1].rsplit(".", 1)[0]
-            [epoch, version, release] = RpmNameParser.parse_rpm_evr(ver_info)
+            # <release>.<dist> -> <release>
+            [epoch, version, release] = [pkg["epoch"] or "0", pkg["version"], pkg["release"].rsplit(".", 1)[0]]
         return [epoch, version, release]
 
     @staticmethod
@@ -127,15 +148,16 @@ class DnfApi(ShellCmdApi):
             rt_err: True, return stdout and stderr; False only return stdout
 
         Returns:
-            result: stdout of `dnf info bin_name | grep key`
+            result: the lines of `dnf info bin_name` which contain key
         """
         cmd = ["dnf", "info"]
         repo_condition = DnfApi.generate_repo_condition(repos)
         cmd.extend(repo_condition)
         repo_file_condition = DnfApi.generate_repo_file_condition(repo_file)
         cmd.extend(repo_file_condition)
-        cmd.extend([bin_name, "|", "grep", key])
-        return DnfApi.call_subprocess(cmd, rt_err)
+        cmd.append(bin_name)
+        stdout = DnfApi.call_subprocess(cmd, rt_err)
+        return "".join(line for line in stdout.splitlines(keepends=True) if key in line)
 
     @staticmethod
     def find_what_requires(bin_name, repos=None, repo_file=None, rt_err=False):
@@ -185,12 +207,16 @@ class DnfApi(ShellCmdApi):
         if not os.path.isdir(rpm_dir) or not repos:
             logging.warning(f"localdir: [{rpm_dir}] or repos: [{repos}] is None")
             return set()
-        install_rpms = os.path.abspath(rpm_dir) + "/*"
+        # the rpms are expanded here, "*" is not expanded without shell
+        install_rpms = sorted(glob.glob(os.path.join(os.path.abspath(rpm_dir), "*")))
+        if not install_rpms:
+            logging.warning(f"localdir: [{rpm_dir}] has no rpm")
+            return set()
         repo_name = repos[0]
         cmd = ["dnf", "install"]
         repo_file_condition = DnfApi.generate_repo_file_condition(repo_file)
         cmd.extend(repo_file_condition)
-        cmd.extend([install_rpms, "--assumeno", "|", "grep", repo_name])
+        cmd.extend([*install_rpms, "--assumeno"])
         stdout = DnfApi.call_subprocess(cmd, rt_err)
         data = stdout.split("\n")
         result = set()
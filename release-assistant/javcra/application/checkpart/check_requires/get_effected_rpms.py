@@ -13,12 +13,20 @@
 # Create: 2021-06-24
 # ******************************************************************************/
 
+import logging
+
+from .init_env import get_yum_repo_file
+from .repodata_api import RepodataIndex
+from .requires_graph import RequiresGraph, parse_capabilities
+
 
 def get_whatrequires(
     pkg_list: list,
     published_repos: list,
     dev_repos: list,
     branch: str = "openEuler:20.03:LTS:SP1",
+    repo_file: str = None,
+    max_depth: int = None,
 ) -> dict:
     """
     get effected src rpm list which requires rpm in pkg_list
@@ -28,6 +36,8 @@ def get_whatrequires(
         published_repos: published repo name list in /etc/yum.repo.d/xxx.repo (repo.openuler.org/xxx etc.)
         dev_repos: develop repo name list in /etc/yum.repo.d/xxx.repo (obs.repo/xxxx etc.)
         branch: branch in obs proj such as (openEuler:20.03:LTS:SP1, openEuler:20.03:LTS:SP1:EPOL, etc.)
+        repo_file: yum repo file which has the published and develop repos, the template of branch by default
+        max_depth: max length of the require chain, 1 means the direct requirers, None means no limit
 
     return:
         pkg_dict = {
@@ -35,7 +45,12 @@ def get_whatrequires(
             ...
         }
     """
-    pass
+    repodata_index = RepodataIndex(repo_file or get_yum_repo_file(branch))
+    graph = RequiresGraph.from_repodata(repodata_index, [*published_repos, *dev_repos])
+    if graph is None:
+        logging.error("failed to get the packages which require %s of %s", pkg_list, branch)
+        return dict()
+    return graph.affected(pkg_list, max_depth)
 
 
 def get_update_install(
@@ -43,15 +58,18 @@ def get_update_install(
     published_repos: list,
     dev_repos: list,
     branch: str = "openEuler:20.03:LTS:SP1",
+    repo_file: str = None,
 ) -> dict:
     """
-    get effected src rpm list which requires rpm in pkg_list
+    get src rpm list which must be updated together with pkg_list, because the binaries of pkg_list
+    require the capabilities which only the develop repos provide
 
     Attributes:
         pkg_list: source rpm list
         published_repos: published repo name list in /etc/yum.repo.d/xxx.repo (repo.openuler.org/xxx etc.)
         dev_repos: develop repo name list in /etc/yum.repo.d/xxx.repo (obs.repo/xxxx etc.)
         branch: branch in obs proj such as (openEuler:20.03:LTS:SP1, openEuler:20.03:LTS:SP1:EPOL, etc.)
+        repo_file: yum repo file which has the published and develop repos, the template of branch by default
 
     return:
         pkg_dict = {
@@ -59,4 +77,43 @@ def get_update_install(
             ...
         }
     """
-    pass
+    repodata_index = RepodataIndex(repo_file or get_yum_repo_file(branch))
+    published_provides = set()
+    for repo_id in published_repos:
+        dependencies = repodata_index.dependencies(repo_id)
+        if dependencies is None:
+            logging.error("failed to get the install requires of %s of %s", pkg_list, branch)
+            return dict()
+        for name, _, provides, _, files in dependencies:
+            published_provides.update((name, *provides, *files))
+
+    dev_packages = []
+    for repo_id in dev_repos:
+        dependencies = repodata_index.dependencies(repo_id)
+        if dependencies is None:
+            logging.error("failed to get the install requires of %s of %s", pkg_list, branch)
+            return dict()
+        dev_packages.extend(dependencies)
+
+    # the requires of the updated binaries which only the develop repos provide
+    updated = set(pkg_list)
+    providers = dict()
+    for name, src_name, provides, _, files in dev_packages:
+        for capability in (name, *provides, *files):
+            providers.setdefault(capability, []).append((src_name or name, name))
+    pkg_dict = dict()
+    for _, src_name, _, requires, _ in dev_packages:
+        if src_name not in updated:
+            continue
+        for require in requires:
+            capabilities = parse_capabilities(require)
+            if not capabilities or any(capability in published_provides for capability in capabilities):
+                continue
+            for capability in capabilities:
+                for provider_src, provider_name in providers.get(capability, ()):
+                    if provider_src in updated:
+                        continue
+                    bin_names = pkg_dict.setdefault(provider_src, [])
+                    if provider_name not in bin_names:
+                        bin_names.append(provider_name)
+    return pkg_dict
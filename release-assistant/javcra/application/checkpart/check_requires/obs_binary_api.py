@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+
+import configparser
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import requests
+
+from javcra.libs.config import global_config
+from javcra.libs.http_base import get_pooled_session
+
+_BINARY_TABLE = None
+_BINARY_TABLE_LOCK = threading.Lock()
+
+
+def get_obs_binary_table():
+    """
+    get the process-wide binary table, so that a project is listed once for all the callers
+
+    return:
+        ObsBinaryTable
+    """
+    global _BINARY_TABLE
+    with _BINARY_TABLE_LOCK:
+        if _BINARY_TABLE is None:
+            _BINARY_TABLE = ObsBinaryTable()
+        return _BINARY_TABLE
+
+
+def reset_obs_binary_table():
+    """
+    drop the process-wide binary table, the next get_obs_binary_table call creates a new one
+    """
+    global _BINARY_TABLE
+    with _BINARY_TABLE_LOCK:
+        _BINARY_TABLE = None
+
+
+class ObsBinaryTable(object):
+    """
+    binaries of all the packages of an obs project, repo and arch, listed by one
+    `/build/<proj>/_result?view=binarylist` request instead of one `osc ls -b` per package.
+    The tables are cached in memory and on disk until the ttl expires
+    """
+
+    def __init__(self, apiurl=None, cache_dir=None, ttl=None, oscrc=global_config.DEFAULT_OSCRC_POSITION):
+        self.oscrc = oscrc
+        self.apiurl, self.auth, self.verify = self.load_oscrc(oscrc)
+        self.apiurl = (apiurl or global_config.OBS_API_URL or self.apiurl).rstrip("/")
+        self.cache_dir = cache_dir or global_config.OBS_BINARY_CACHE_DIR
+        self.ttl = global_config.OBS_BINARY_CACHE_TTL if ttl is None else ttl
+        # {(proj, repo, arch): (listed time, {package: [binary file names]})}
+        self._tables = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_oscrc(oscrc):
+        """
+        get api url and account of obs from oscrc
+
+        Attribute:
+            oscrc: the position of oscrc file
+
+        return:
+            apiurl, (user, password) or None, whether to verify the certificate
+        """
+        apiurl = global_config.DEFAULT_OSCRC_APIURL
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        try:
+            parser.read(oscrc, encoding="utf-8")
+        except (configparser.Error, OSError) as error:
+            logging.warning("failed to read oscrc %s: %s", oscrc, error)
+            return apiurl, None, True
+        apiurl = parser.get("general", "apiurl", fallback=apiurl)
+        verify = parser.get("general", "no_verify", fallback="0") != "1"
+        if not parser.has_section(apiurl):
+            return apiurl, None, verify
+        user = parser.get(apiurl, "user", fallback="")
+        password = parser.get(apiurl, "pass", fallback="")
+        return apiurl, (user, password) if user else None, verify
+
+    def fetch(self, proj, repo, arch):
+        """
+        list the binaries of all the packages of project
+
+        Attribute:
+            proj: obs project
+            repo: repo like standard_aarch64
+            arch: arch
+
+        return:
+            content of binary list xml, None if failed to list
+        """
+        url = "{}/build/{}/_result".format(self.apiurl, proj)
+        params = {"view": "binarylist", "repository": repo, "arch": arch}
+        try:
+            resp = get_pooled_session().get(url, params=params, auth=self.auth, verify=self.verify,
+                                            timeout=global_config.OBS_BINARY_TIMEOUT)
+        except requests.RequestException as error:
+            logging.warning("failed to list binaries of %s %s %s: %s", proj, repo, arch, error)
+            return None
+        if resp.status_code != 200:
+            logging.warning("failed to list binaries of %s %s %s, status code is %s",
+                            proj, repo, arch, resp.status_code)
+            return None
+        return resp.content
+
+    @staticmethod
+    def parse_binarylist(content):
+        """
+        parse the binary list of project
+
+        Attribute:
+            content: xml like
+                <resultlist><result project="" repository="" arch="">
+                    <binarylist package="zlib"><binary filename="zlib-1.2.11-18.oe1.src.rpm"/></binarylist>
+                </result></resultlist>
+
+        return:
+            dict: {package: [binary file names]}
+        """
+        table = dict()
+        for binarylist in ET.fromstring(content).iter("binarylist"):
+            package = binarylist.get("package")
+            if not package:
+                continue
+            files = table.setdefault(package, [])
+            files.extend(binary.get("filename") for binary in binarylist.iter("binary") if binary.get("filename"))
+        return table
+
+    def _cache_path(self, proj, repo, arch):
+        """
+        cache file of the binary table, the tables of different obs servers do not share it
+        """
+        url_hash = hashlib.sha256(self.apiurl.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, url_hash, "{}_{}_{}.json".format(proj, repo, arch))
+
+    def _read_cache(self, cache_path):
+        """
+        read the cached table if it is not expired
+        """
+        try:
+            listed_time = os.path.getmtime(cache_path)
+            if time.time() - listed_time >= self.ttl:
+                return None
+            with open(cache_path, "r", encoding="utf-8") as file:
+                return listed_time, json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, cache_path, table):
+        """
+        write the table to cache file
+        """
+        cache_folder = os.path.dirname(cache_path)
+        try:
+            os.makedirs(cache_folder, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=cache_folder, delete=False) as file:
+                json.dump(table, file)
+            os.replace(file.name, cache_path)
+        except OSError as error:
+            logging.warning("failed to cache binary list in %s: %s", cache_folder, error)
+
+    def binaries(self, proj, repo="standard_aarch64", arch="aarch64"):
+        """
+        binary table of project, it is listed from obs when the cache expires
+
+        Attribute:
+            proj: obs project
+            repo: repo
+            arch: arch
+
+        return:
+            dict: {package: [binary file names]}, None if failed to list
+        """
+        key = (proj, repo, arch)
+        with self._lock:
+            cached = self._tables.get(key)
+            if cached and time.time() - cached[0] < self.ttl:
+                return cached[1]
+
+            cache_path = self._cache_path(proj, repo, arch)
+            cached = self._read_cache(cache_path)
+            if cached is None:
+                content = self.fetch(proj, repo, arch)
+                if content is None:
+                    return None
+                try:
+                    table = self.parse_binarylist(content)
+                except ET.ParseError as error:
+                    logging.warning("failed to parse binaries of %s %s %s: %s", proj, repo, arch, error)
+                    return None
+                self._write_cache(cache_path, table)
+                cached = (time.time(), table)
+            self._tables[key] = cached
+            return cached[1]
+
+    def package_binaries(self, proj, pkg, repo="standard_aarch64", arch="aarch64"):
+        """
+        binaries of package
+
+        Attribute:
+            proj: obs project
+            pkg: package name
+            repo: repo
+            arch: arch
+
+        return:
+            list of binary file names, empty if the package has no binary,
+            None if the project can not be listed
+        """
+        table = self.binaries(proj, repo, arch)
+        if table is None:
+            return None
+        return list(table.get(pkg, []))
+
+    def clear(self):
+        """
+        drop the tables in memory, the next query reads the disk cache or lists from obs again
+        """
+        with self._lock:
+            self._tables.clear()
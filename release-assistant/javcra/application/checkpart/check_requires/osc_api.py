@@ -15,6 +15,7 @@
 
 import logging
 
+from .obs_binary_api import get_obs_binary_table
 from .shell_api_tool import ShellCmdApi, RpmNameParser
 
 class OscApi(ShellCmdApi):
@@ -41,6 +42,11 @@ class OscApi(ShellCmdApi):
         """
         if not proj or not pkg:
             return []
+        # the binaries of the whole project are listed once and shared by all the packages,
+        # "osc ls -b" is only used when the project can not be listed
+        binaries = get_obs_binary_table().package_binaries(proj, pkg, repo, arch)
+        if binaries is not None:
+            return "".join(f"{binary}\n" for binary in binaries)
         cmd = f"osc ls -b {proj} {pkg} {repo} {arch}".split()
         return OscApi.call_subprocess(cmd, rt_err)
 
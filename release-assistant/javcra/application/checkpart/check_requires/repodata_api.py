@@ -0,0 +1,369 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+
+import bz2
+import configparser
+import gzip
+import hashlib
+import io
+import json
+import logging
+import lzma
+import os
+import sqlite3
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+
+import requests
+
+from javcra.libs.config.global_config import REPODATA_BASEARCH, REPODATA_CACHE_DIR, REPODATA_TIMEOUT
+from javcra.libs.http_base import get_pooled_session
+
+REPO_NS = "{http://linux.duke.edu/metadata/repo}"
+COMMON_NS = "{http://linux.duke.edu/metadata/common}"
+RPM_NS = "{http://linux.duke.edu/metadata/rpm}"
+DECOMPRESSORS = {".gz": gzip.decompress, ".bz2": bz2.decompress, ".xz": lzma.decompress}
+
+
+class RepodataIndex(object):
+    """
+    package names of the repos in a yum repo file, parsed from the primary metadata of each
+    repo once and cached on disk by the revision of its repomd.xml, so that whether a repo
+    provides a package is a set lookup instead of a `dnf info` subprocess
+    """
+
+    def __init__(self, repo_file, cache_dir=None, basearch=REPODATA_BASEARCH):
+        self.repos = self.parse_repo_file(repo_file, basearch)
+        self.cache_dir = cache_dir or REPODATA_CACHE_DIR
+        self._packages = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_repo_file(repo_file, basearch=REPODATA_BASEARCH):
+        """
+        get the baseurl of repos in yum repo file
+
+        Attribute:
+            repo_file: yum repo file
+            basearch: value of $basearch
+
+        return:
+            dict: {repo_id: baseurl}
+        """
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        try:
+            parser.read(repo_file, encoding="utf-8")
+        except (configparser.Error, OSError) as error:
+            logging.error("failed to parse repo file %s: %s", repo_file, error)
+            return dict()
+        repos = dict()
+        for repo_id in parser.sections():
+            baseurl = parser.get(repo_id, "baseurl", fallback="").strip()
+            if baseurl:
+                repos[repo_id] = baseurl.replace("$basearch", basearch).rstrip("/") + "/"
+        return repos
+
+    @staticmethod
+    def fetch(url):
+        """
+        download a repodata file
+
+        Attribute:
+            url: url of file
+
+        return:
+            bytes of file, None if failed to download
+        """
+        try:
+            resp = get_pooled_session().get(url, timeout=REPODATA_TIMEOUT)
+        except requests.RequestException as error:
+            logging.warning("failed to download %s: %s", url, error)
+            return None
+        if resp.status_code != 200:
+            logging.warning("failed to download %s, status code is %s", url, resp.status_code)
+            return None
+        return resp.content
+
+    @staticmethod
+    def parse_repomd(repomd):
+        """
+        get revision and the location of primary metadata from repomd.xml
+
+        Attribute:
+            repomd: content of repomd.xml
+
+        return:
+            revision, {data type: location}
+        """
+        root = ET.fromstring(repomd)
+        locations = dict()
+        for data in root.iter(REPO_NS + "data"):
+            location = data.find(REPO_NS + "location")
+            if location is not None and location.get("href"):
+                locations[data.get("type")] = location.get("href")
+        return root.findtext(REPO_NS + "revision") or "", locations
+
+    @staticmethod
+    def decompress(content, location):
+        """
+        decompress primary metadata by the extension of its location
+
+        Attribute:
+            content: content of primary metadata
+            location: location of primary metadata in repomd.xml
+
+        return:
+            decompressed content, whether it is a sqlite database
+        """
+        base, ext = os.path.splitext(location)
+        decompress = DECOMPRESSORS.get(ext)
+        if decompress:
+            content = decompress(content)
+        else:
+            base = location
+        return content, base.endswith(".sqlite")
+
+    @staticmethod
+    def query_sqlite(content, query):
+        """
+        run query on the connection of a sqlite database in memory
+
+        Attribute:
+            content: content of the sqlite database
+            query: function called with the connection
+
+        return:
+            result of query
+        """
+        with tempfile.NamedTemporaryFile(suffix=".sqlite") as db_file:
+            db_file.write(content)
+            db_file.flush()
+            conn = sqlite3.connect(db_file.name)
+            try:
+                return query(conn)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def parse_primary(content, location):
+        """
+        get package names from primary.xml or primary.sqlite
+
+        Attribute:
+            content: compressed content of primary metadata
+            location: location of primary metadata in repomd.xml
+
+        return:
+            set: package names
+        """
+        content, is_sqlite = RepodataIndex.decompress(content, location)
+        if is_sqlite:
+            return RepodataIndex.query_sqlite(
+                content, lambda conn: {row[0] for row in conn.execute("SELECT DISTINCT name FROM packages")})
+
+        names = set()
+        for _, elem in ET.iterparse(io.BytesIO(content)):
+            if elem.tag == COMMON_NS + "package":
+                names.add(elem.findtext(COMMON_NS + "name"))
+                elem.clear()
+        names.discard(None)
+        return names
+
+    @staticmethod
+    def _src_name(sourcerpm):
+        """
+        <name>-<version>-<release>.src.rpm -> <name>
+        """
+        return sourcerpm.rsplit("-", 2)[0] if sourcerpm else ""
+
+    @staticmethod
+    def parse_primary_deps(content, location):
+        """
+        get the dependencies of binary packages from primary.xml or primary.sqlite, the
+        source packages are skipped
+
+        Attribute:
+            content: compressed content of primary metadata
+            location: location of primary metadata in repomd.xml
+
+        return:
+            list: [[name, source package name, [provides], [requires], [files]]]
+        """
+        content, is_sqlite = RepodataIndex.decompress(content, location)
+        if is_sqlite:
+            return RepodataIndex.query_sqlite(content, RepodataIndex._query_sqlite_deps)
+
+        packages = []
+        for _, elem in ET.iterparse(io.BytesIO(content)):
+            if elem.tag != COMMON_NS + "package":
+                continue
+            if elem.findtext(COMMON_NS + "arch") != "src":
+                fmt = elem.find(COMMON_NS + "format")
+                if fmt is None:
+                    fmt = ET.Element("format")
+                packages.append([
+                    elem.findtext(COMMON_NS + "name"),
+                    RepodataIndex._src_name(fmt.findtext(RPM_NS + "sourcerpm")),
+                    [entry.get("name") for entry in fmt.iterfind(RPM_NS + "provides/" + RPM_NS + "entry")],
+                    [entry.get("name") for entry in fmt.iterfind(RPM_NS + "requires/" + RPM_NS + "entry")],
+                    [file.text for file in fmt.iterfind(COMMON_NS + "file") if file.text],
+                ])
+            elem.clear()
+        return packages
+
+    @staticmethod
+    def _query_sqlite_deps(conn):
+        """
+        get the dependencies of binary packages from primary.sqlite
+        """
+        packages = dict()
+        for pkg_key, name, sourcerpm in conn.execute(
+                "SELECT pkgKey, name, rpm_sourcerpm FROM packages WHERE arch != 'src'"):
+            packages[pkg_key] = [name, RepodataIndex._src_name(sourcerpm), [], [], []]
+        for column, table in ((2, "provides"), (3, "requires"), (4, "files")):
+            for pkg_key, dep_name in conn.execute("SELECT pkgKey, name FROM {}".format(table)):
+                if pkg_key in packages:
+                    packages[pkg_key][column].append(dep_name)
+        return list(packages.values())
+
+    def _cache_path(self, repo_id, revision):
+        """
+        cache file of repo at revision, the repos with the same id but different baseurl do not share it
+        """
+        url_hash = hashlib.sha256(self.repos[repo_id].encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, "{}-{}".format(repo_id, url_hash), "{}.json".format(revision))
+
+    def _write_cache(self, cache_path, data, cache_key):
+        """
+        write data to the cache of repo, the caches of the older revisions of repo are removed
+        """
+        cache_folder = os.path.dirname(cache_path)
+        try:
+            os.makedirs(cache_folder, exist_ok=True)
+            for old_cache in os.listdir(cache_folder):
+                if not old_cache.startswith(cache_key):
+                    os.remove(os.path.join(cache_folder, old_cache))
+            with tempfile.NamedTemporaryFile("w", dir=cache_folder, delete=False) as file:
+                json.dump(data, file)
+            os.replace(file.name, cache_path)
+        except OSError as error:
+            logging.warning("failed to cache repodata in %s: %s", cache_folder, error)
+
+    def _load_primary(self, repo_id, kind, parse):
+        """
+        load the data parsed from the primary metadata of repo from the cache, or from the
+        repodata when it is updated
+
+        Attribute:
+            repo_id: repo id in repo file
+            kind: kind of the data, the suffix of cache file
+            parse: function to parse the content and location of primary metadata
+
+        return:
+            parsed data which can be dumped to json, None if the repodata can not be loaded
+        """
+        baseurl = self.repos.get(repo_id)
+        if not baseurl:
+            logging.warning("repo %s is not in repo file", repo_id)
+            return None
+        repomd = self.fetch(baseurl + "repodata/repomd.xml")
+        if not repomd:
+            return None
+        try:
+            revision, locations = self.parse_repomd(repomd)
+        except ET.ParseError as error:
+            logging.warning("failed to parse repomd.xml of %s: %s", repo_id, error)
+            return None
+        location = locations.get("primary") or locations.get("primary_db")
+        if not location:
+            logging.warning("no primary metadata in repomd.xml of %s", repo_id)
+            return None
+
+        # the revision alone may be reused by a rebuilt repo, so the location which has the checksum is hashed too
+        cache_key = "{}-{}".format(revision, hashlib.sha256(location.encode("utf-8")).hexdigest()[:12])
+        cache_path = self._cache_path(repo_id, cache_key + kind)
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as file:
+                    return json.load(file)
+            except (OSError, ValueError) as error:
+                logging.warning("failed to read repodata cache %s: %s", cache_path, error)
+
+        content = self.fetch(baseurl + location)
+        if content is None:
+            return None
+        try:
+            data = parse(content, location)
+        except (OSError, EOFError, lzma.LZMAError, ET.ParseError, sqlite3.Error) as error:
+            logging.warning("failed to parse primary metadata of %s: %s", repo_id, error)
+            return None
+        self._write_cache(cache_path, data, cache_key)
+        return data
+
+    def _load_repo(self, repo_id):
+        """
+        load the package names of repo
+        """
+        names = self._load_primary(repo_id, "", lambda content, location: sorted(
+            self.parse_primary(content, location)))
+        return None if names is None else set(names)
+
+    def dependencies(self, repo_id):
+        """
+        dependencies of the binary packages of repo, they are not kept by the index because
+        they are much larger than the package names
+
+        Attribute:
+            repo_id: repo id in repo file
+
+        return:
+            list: [[name, source package name, [provides], [requires], [files]]],
+            None if the repodata can not be loaded
+        """
+        return self._load_primary(repo_id, ".deps", self.parse_primary_deps)
+
+    def packages(self, repo_id):
+        """
+        package names of repo, the repo is loaded once for the index
+
+        Attribute:
+            repo_id: repo id in repo file
+
+        return:
+            set of package names, None if the repodata can not be loaded
+        """
+        with self._lock:
+            if repo_id not in self._packages:
+                self._packages[repo_id] = self._load_repo(repo_id)
+            return self._packages[repo_id]
+
+    def provides(self, pkg_name, repo_ids):
+        """
+        whether any of the repos provides the package
+
+        Attribute:
+            pkg_name: package name
+            repo_ids: repo ids in repo file
+
+        return:
+            True or False, None if it is not found and the repodata of any repo can not be loaded
+        """
+        unknown = False
+        for repo_id in repo_ids:
+            names = self.packages(repo_id)
+            if names is None:
+                unknown = True
+            elif pkg_name in names:
+                return True
+        return None if unknown else False
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+
+import logging
+from array import array
+from collections import deque
+
+# operators and keywords of rich dependencies like "(foo >= 1.0 with foo < 2.0)"
+RICH_DEP_KEYWORDS = {"and", "or", "if", "else", "with", "without", "unless"}
+RICH_DEP_OPERATORS = {"<", "<=", "=", ">=", ">"}
+
+
+def split_rich_dep(require):
+    """
+    split a rich dependency into tokens, the parentheses of the groups are dropped, while
+    a capability like "perl(Foo::Bar)" or "python3dist(foo)" is kept as one token
+
+    Attribute:
+        require: rich dependency like "(python3dist(foo) if python3)"
+
+    return:
+        list of tokens
+    """
+    tokens = []
+    index = 0
+    while index < len(require):
+        if require[index].isspace() or require[index] in "()":
+            index += 1
+            continue
+        end = index
+        depth = 0
+        while end < len(require):
+            char = require[end]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                # the parenthesis closes the group which the token is in
+                if not depth:
+                    break
+                depth -= 1
+            elif char.isspace() and not depth:
+                break
+            end += 1
+        tokens.append(require[index:end])
+        index = end
+    return tokens
+
+
+def parse_capabilities(require):
+    """
+    get the capability names of a require, the names in a rich dependency are all returned
+
+    Attribute:
+        require: require name in primary metadata
+
+    return:
+        list of capability names
+    """
+    if require.startswith("rpmlib("):
+        return []
+    if not require.startswith("("):
+        return [require]
+    names = []
+    is_version = False
+    for token in split_rich_dep(require):
+        # the version follows the comparison operator
+        if is_version:
+            is_version = False
+            continue
+        if token in RICH_DEP_OPERATORS:
+            is_version = True
+            continue
+        if token in RICH_DEP_KEYWORDS or token.startswith("rpmlib(") or token in names:
+            continue
+        names.append(token)
+    return names
+
+
+class RequiresGraph(object):
+    """
+    requires/provides graph of the binary packages of repos. The packages are numbered, and the
+    edges from a package to the packages which require it are kept in integer arrays
+    (offsets and targets), so that the packages affected by an update are found by one
+    breadth-first search instead of one `dnf repoquery --whatrequires` per binary
+    """
+
+    def __init__(self, packages):
+        """
+        Attribute:
+            packages: [[name, source package name, [provides], [requires], [files]]] of all the repos
+        """
+        self.names = []
+        self.src_ids = array("l")
+        self.src_names = []
+        src_index = dict()
+        providers = dict()
+        for pkg_id, (name, src_name, provides, _, files) in enumerate(packages):
+            self.names.append(name)
+            self.src_ids.append(src_index.setdefault(src_name or name, len(src_index)))
+            for capability in (name, *provides, *files):
+                providers.setdefault(capability, set()).add(pkg_id)
+        self.src_names = [None] * len(src_index)
+        for src_name, src_id in src_index.items():
+            self.src_names[src_id] = src_name
+        self._src_index = src_index
+
+        # edges from the provider to the requirer, grouped by the provider
+        edges = [set() for _ in packages]
+        for pkg_id, (_, _, _, requires, _) in enumerate(packages):
+            for require in requires:
+                for capability in parse_capabilities(require):
+                    for provider in providers.get(capability, ()):
+                        if provider != pkg_id:
+                            edges[provider].add(pkg_id)
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        for requirers in edges:
+            self.targets.extend(sorted(requirers))
+            self.offsets.append(len(self.targets))
+
+    @classmethod
+    def from_repodata(cls, repodata_index, repo_ids):
+        """
+        build the graph of repos from their primary metadata
+
+        Attribute:
+            repodata_index: RepodataIndex of the repo file
+            repo_ids: repo ids in repo file
+
+        return:
+            RequiresGraph, None if the repodata of any repo can not be loaded
+        """
+        packages = []
+        for repo_id in repo_ids:
+            dependencies = repodata_index.dependencies(repo_id)
+            if dependencies is None:
+                logging.error("failed to load the dependencies of repo %s", repo_id)
+                return None
+            packages.extend(dependencies)
+        return cls(packages)
+
+    def binaries_of(self, src_names):
+        """
+        ids of the binary packages built from the source packages
+
+        Attribute:
+            src_names: source package names
+
+        return:
+            list of package ids
+        """
+        src_ids = {self._src_index[name] for name in src_names if name in self._src_index}
+        return [pkg_id for pkg_id, src_id in enumerate(self.src_ids) if src_id in src_ids]
+
+    def requirers(self, pkg_id):
+        """
+        ids of the packages which require the package directly
+        """
+        return self.targets[self.offsets[pkg_id]:self.offsets[pkg_id + 1]]
+
+    def affected(self, src_names, max_depth=None):
+        """
+        source packages whose binaries require the binaries of src_names, directly or transitively
+
+        Attribute:
+            src_names: source package names to update
+            max_depth: max length of the require chain, 1 means the direct requirers, None means no limit
+
+        return:
+            dict: {src_name: [bin_name]}, the source packages in src_names are not in it
+        """
+        seeds = self.binaries_of(src_names)
+        visited = bytearray(len(self.names))
+        for pkg_id in seeds:
+            visited[pkg_id] = 1
+        queue = deque((pkg_id, 0) for pkg_id in seeds)
+        while queue:
+            pkg_id, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for requirer in self.requirers(pkg_id):
+                if not visited[requirer]:
+                    visited[requirer] = 1
+                    queue.append((requirer, depth + 1))
+
+        updated = set(src_names)
+        result = dict()
+        for pkg_id, is_visited in enumerate(visited):
+            src_name = self.src_names[self.src_ids[pkg_id]]
+            if is_visited and src_name not in updated:
+                bin_names = result.setdefault(src_name, [])
+                if self.names[pkg_id] not in bin_names:
+                    bin_names.append(self.names[pkg_id])
+        return result
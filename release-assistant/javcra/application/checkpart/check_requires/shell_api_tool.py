@@ -15,35 +15,157 @@
 
 import logging
 import os
+import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from javcra.libs.config import global_config
 
-class ShellCmdApi(object):
-    @staticmethod
-    def call_subprocess(cmd_list: list, rt_err=False):
+_COMMAND_RUNNER = None
+_COMMAND_RUNNER_LOCK = threading.Lock()
+# segments of rpm version compared by rpmvercmp, the other characters are separators
+RPM_VERSION_SEGMENT = re.compile(r"~|\^|[0-9]+|[a-zA-Z]+")
+# bytes of command output read at a time
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+
+def get_command_runner():
+    """
+    get the process-wide command runner, so that all the shell commands share its bound
+
+    return:
+        CommandRunner
+    """
+    global _COMMAND_RUNNER
+    with _COMMAND_RUNNER_LOCK:
+        if _COMMAND_RUNNER is None:
+            _COMMAND_RUNNER = CommandRunner()
+        return _COMMAND_RUNNER
+
+
+def reset_command_runner():
+    """
+    drop the process-wide command runner, the next get_command_runner call creates a new one
+    """
+    global _COMMAND_RUNNER
+    with _COMMAND_RUNNER_LOCK:
+        _COMMAND_RUNNER = None
+
+
+class CommandRunner(object):
+    """
+    run shell commands with a timeout and an output cap, at most max_workers commands
+    of the process run at the same time, the commands of the functions called by map share the bound
+    """
+
+    def __init__(self, max_workers=None, timeout=None, max_output=None):
+        self.max_workers = max(max_workers or global_config.SHELL_CMD_WORKERS, 1)
+        self.timeout = timeout or global_config.SHELL_CMD_TIMEOUT
+        self.max_output = max_output or global_config.SHELL_CMD_MAX_OUTPUT
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    def _read_output(self, stream):
         """
-        use subprocess run shell cmd
+        read the output of command by chunks until the end or the output cap
 
         Attribute:
-            cmd: shell command
+            stream: stdout of the command
+
+        return:
+            (output bytes, True if the output is cut)
+        """
+        chunks = []
+        size = 0
+        for chunk in iter(lambda: stream.read(OUTPUT_CHUNK_SIZE), b""):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_output:
+                return b"".join(chunks)[:self.max_output], True
+        return b"".join(chunks), False
+
+    def run(self, cmd_list: list, rt_err=False, timeout=None):
+        """
+        run shell cmd in the calling thread once a slot is free, the command is killed
+        when it times out or its output reaches the cap
+
+        Attribute:
+            cmd_list: shell command
             rt_err: True, return stdout and stderr; False only return stdout
+            timeout: seconds to wait for the command, defaults to the timeout of runner
 
         return:
-            result: console output str
+            result: console output str, empty if the command fails or times out
         """
-        output = ""
-        try:
-            output = subprocess.check_output(
+        timeout = timeout or self.timeout
+        expired = threading.Event()
+        with self._slots:
+            process = subprocess.Popen(
                 cmd_list,
-                # PIPE is default value of stderr
-                stderr=subprocess.STDOUT if rt_err else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT if rt_err else subprocess.DEVNULL,
                 shell=False,
             )
-        except subprocess.CalledProcessError:
-            logging.warning(f"cmd [{' '.join(cmd_list)}] exit with non-zero code")
 
+            def expire():
+                expired.set()
+                process.kill()
+
+            timer = threading.Timer(timeout, expire)
+            timer.start()
+            try:
+                with process.stdout:
+                    output, cut = self._read_output(process.stdout)
+                if cut:
+                    process.kill()
+                returncode = process.wait()
+            finally:
+                timer.cancel()
+
+        if cut:
+            logging.warning(f"output of cmd [{' '.join(cmd_list)}] is cut to {self.max_output} bytes")
+        elif expired.is_set():
+            logging.warning(f"cmd [{' '.join(cmd_list)}] timeout after {timeout}s")
+            return ""
+        elif returncode:
+            logging.warning(f"cmd [{' '.join(cmd_list)}] exit with non-zero code")
+            return ""
         return output.decode("utf-8", "ignore") if output else ""
 
+    def map(self, func, items):
+        """
+        call func with each of items in parallel, the shell commands run by func share the bound of runner
+
+        Attribute:
+            func: function with one argument
+            items: arguments of func
+
+        return:
+            list: results in the order of items
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_workers == 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
+
+class ShellCmdApi(object):
+    @staticmethod
+    def call_subprocess(cmd_list: list, rt_err=False, timeout=None):
+        """
+        use subprocess run shell cmd
+
+        Attribute:
+            cmd: shell command
+            rt_err: True, return stdout and stderr; False only return stdout
+            timeout: seconds to wait for the command
+
+        return:
+            result: console output str
+        """
+        return get_command_runner().run(cmd_list, rt_err, timeout)
+
 
 class RpmNameParser(object):
     def __init__(self, rpm_name, auto_parse=False):
@@ -108,6 +230,67 @@ class RpmNameParser(object):
             [epoch, version] = _split2item(version, ":")
         return [epoch, version, release]
 
+    @staticmethod
+    def compare_version(ver_a, ver_b):
+        """
+        compare version or release strings like rpmvercmp: digit segments are compared as numbers,
+        alpha segments as strings, a digit segment is newer than an alpha one, "~" sorts before
+        anything and "^" sorts after the end of version
+
+        Attribute:
+            ver_a: version or release
+            ver_b: version or release
+        return:
+            result: 1 if ver_a is newer, -1 if ver_b is newer, 0 if they are equal
+        """
+        if ver_a == ver_b:
+            return 0
+        segs_a = RPM_VERSION_SEGMENT.findall(ver_a)
+        segs_b = RPM_VERSION_SEGMENT.findall(ver_b)
+        for index in range(max(len(segs_a), len(segs_b))):
+            seg_a = segs_a[index] if index < len(segs_a) else None
+            seg_b = segs_b[index] if index < len(segs_b) else None
+            if seg_a == "~" or seg_b == "~":
+                if seg_a != seg_b:
+                    return -1 if seg_a == "~" else 1
+                continue
+            if seg_a == "^" or seg_b == "^":
+                if seg_a != seg_b:
+                    if seg_a is None:
+                        return -1
+                    if seg_b is None:
+                        return 1
+                    return -1 if seg_a == "^" else 1
+                continue
+            if seg_a is None or seg_b is None:
+                return 1 if seg_b is None else -1
+            if seg_a.isdigit() != seg_b.isdigit():
+                return 1 if seg_a.isdigit() else -1
+            if seg_a.isdigit():
+                seg_a, seg_b = seg_a.lstrip("0"), seg_b.lstrip("0")
+                if len(seg_a) != len(seg_b):
+                    return 1 if len(seg_a) > len(seg_b) else -1
+            if seg_a != seg_b:
+                return 1 if seg_a > seg_b else -1
+        return 0
+
+    @staticmethod
+    def compare_evr(evr_a, evr_b):
+        """
+        compare [epoch, version, release] like rpm, an empty epoch is 0
+
+        Attribute:
+            evr_a: [epoch, version, release]
+            evr_b: [epoch, version, release]
+        return:
+            result: 1 if evr_a is newer, -1 if evr_b is newer, 0 if they are equal
+        """
+        epoch_a, epoch_b = int(evr_a[0] or 0), int(evr_b[0] or 0)
+        if epoch_a != epoch_b:
+            return 1 if epoch_a > epoch_b else -1
+        return (RpmNameParser.compare_version(evr_a[1], evr_b[1])
+                or RpmNameParser.compare_version(evr_a[2], evr_b[2]))
+
     @property
     def name(self):
         return self._name
@@ -18,6 +18,7 @@ import json
 import requests
 from requests import RequestException
 from javcra.application.modifypart.modifyentrance import IssueOperation
+from javcra.common.release_body import ReleaseBodyEdits
 from javcra.libs.config.global_config import TEST_IP_PORT
 from javcra.libs.log import logger
 
@@ -31,20 +32,16 @@ class CheckEntrance(IssueOperation):
         """
         add repo in release issue table
         """
-        start_flag = "# 2、测试repo源"
-        end_flag = "\n"
+        block_name = "# 2、测试repo源"
         issue_body = self.get_issue_body(self.issue_num)
         if not issue_body:
             logger.error("can not get release issue body, failed to add repo in table.")
             return False
 
-        issue_body_lines = issue_body.splitlines(keepends=True)
         try:
-            repo_lines, start_idx, end_idx = self.get_block_lines(issue_body_lines, start_flag, end_flag)
-            new_repo_lines = self.get_repo().splitlines(keepends=True)
-            final_lines = self.modify_block_lines(issue_body_lines, new_repo_lines, start_idx, end_idx)
-            body_str = "".join(final_lines)
-            return True if self.update_issue(body=body_str) else False
+            edits = ReleaseBodyEdits()
+            edits.replace(block_name, self.get_repo())
+            return True if self.commit_body_edits(edits, issue_body) else False
         except ValueError as err:
             logger.error(err)
             return False
@@ -13,13 +13,13 @@
 
 
 import datetime
-import json
 import os
 import re
+import sqlite3
 from enum import Enum, unique
 from functools import wraps
-import requests
-from javcra.common.constant import MAJUN_CALLBACK_URL, BRANCH_LIST
+from javcra.application.majun.outbox import MajunOutbox, MajunSender, drain_at_exit
+from javcra.common.constant import BRANCH_LIST
 from javcra.libs.log import logger
 
 
@@ -38,17 +38,20 @@ class ConstantNumber(Enum):
     CON_NUMBER_TWO = 2
 
 
-def combine_content(content, majun_id, multip_start):
+def combine_content(content, majun_id, multip_start, detail=None):
     """
     jenkins run result
     Args:
         content: jenkins run result
         majun_id: majun id
         multip_start: Whether to enable the multi-version start function
+        detail: detail of the result sent next to data, it is not sent if empty
     Returns:
         content_dic: Send a combination of Majun's data
     """
     content_dic = {"data": content, "id": majun_id}
+    if detail:
+        content_dic["detail"] = detail
     if any([content, multip_start]):
         content_dic.update(
             {
@@ -66,29 +69,38 @@ def combine_content(content, majun_id, multip_start):
     return content_dic
 
 
-def send_content_majun(content, majun_id, multip_start=False):
+def send_content_majun(content, majun_id, multip_start=False, detail=None):
     """
     jenkins result sent to majun
     Args:
         content: Data sent to majun
         majun_id: majun id
         multip_start: Whether to enable the multi-version start function
+        detail: detail of the result sent next to data
     Returns:
-        Sending data Results
+        Sending data Results, False if it is not sent yet and is kept in the outbox to be retried
     """
-    new_content = combine_content(content, majun_id, multip_start)
-    heard = {"access_token": os.getenv("majun_access_token")}
+    new_content = combine_content(content, majun_id, multip_start, detail)
     try:
-        resp = requests.post(
-            url=MAJUN_CALLBACK_URL, data=json.dumps(new_content), headers=heard
-        )
-    except requests.RequestException as error:
-        logger.error(f"Failed to send data, because {error}")
+        outbox = MajunOutbox()
+        outbox.put(majun_id, new_content)
+        # the callbacks left by the earlier runs are sent together with the new one
+        MajunSender(outbox).drain()
+        drain_at_exit(outbox)
+        status = outbox.status(majun_id)
+    except (OSError, sqlite3.Error) as error:
+        logger.error(f"Failed to use the outbox of majun callbacks, because {error}")
+    else:
+        if status is None or status[0] is not None:
+            return True
+        logger.warning(f"the callback of {majun_id} is kept in {outbox.db_file} to be sent later")
+        return False
+    error = MajunSender.post(new_content)
+    if error:
+        logger.error(error)
         return False
-    if resp.status_code == requests.codes.ok:
-        logger.info(f"The {new_content} data sent to majun was successful")
-        return True
-    return False
+    logger.info(f"The {new_content} data sent to majun was successful")
+    return True
 
 
 def get_product_version(task_title):
@@ -15,7 +15,10 @@ at use-case results assist in obtaining
 """
 import re
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from javcra.api.jenkins_wait import BackoffPolicy
 from javcra.common.constant import (
     DAYLIBUILD_URL,
     ISO_ARCH_MAP,
@@ -24,7 +27,11 @@ from javcra.common.constant import (
     OBS_VALUES_NAMES,
     VM_IP_MAP,
     MAX_ISO_BUILD_WAIT_TIME,
-    ISO_BUILD_JOB_MAP
+    ISO_BUILD_JOB_MAP,
+    ISO_BUILD_WAIT_NUMBER,
+    ISO_PUBLISH_GRACE_TIME,
+    ISO_WATCH_MAX_DELAY,
+    ISO_WATCH_MIN_DELAY,
 )
 from javcra.application.majun import (
     ConstantNumber,
@@ -33,6 +40,105 @@ from javcra.application.majun import (
     send_content_majun,
 )
 from javcra.application.majun.majun_operate import MajunOperate
+from javcra.libs.config import global_config
+from javcra.libs.http_base import get_pooled_session
+from javcra.libs.log import logger
+
+
+def probe_all_arch(probe, arch_urls):
+    """
+    probe the release_iso pointers of several arch at the same time
+    Args:
+        probe: function called with arch url
+        arch_urls: {arch name: arch url}
+
+    Returns:
+        {arch name: result of probe}
+    """
+    if not arch_urls:
+        return dict()
+    with ThreadPoolExecutor(max_workers=len(arch_urls)) as executor:
+        results = executor.map(probe, arch_urls.values())
+        return dict(zip(arch_urls.keys(), results))
+
+
+class IsoFreshnessWatcher:
+    """
+    poll the release_iso pointers of all the arch with backoff until every arch points
+    to an iso built after the baseline, so that the waiting ends as soon as the new isos
+    are published
+    """
+
+    def __init__(self, branch_name, baseline, policy=None, arch_map=None):
+        """
+        Args:
+            branch_name: branch name
+            baseline: {arch name: {"iso_build_url": url, "iso_build_time": datetime}} before the build
+            policy: BackoffPolicy of the polls
+            arch_map: {arch name: arch url}, defaults to ISO_ARCH_MAP
+        """
+        self.branch_name = branch_name
+        self.baseline = baseline
+        self.policy = policy or BackoffPolicy(min_delay=ISO_WATCH_MIN_DELAY, max_delay=ISO_WATCH_MAX_DELAY)
+        self.pending = dict(arch_map or ISO_ARCH_MAP)
+        self.updated = dict()
+
+    def _probe(self, arch_url):
+        """
+        iso info of arch, None if it can not be read this time
+        """
+        try:
+            return MaJunAt.get_iso_single_build_time(self.branch_name, arch_url)
+        except ValueError as error:
+            logger.warning(f"failed to read the iso of {arch_url}: {error}")
+            return None
+
+    def poll(self):
+        """
+        probe the arch whose iso is not updated yet
+
+        Returns:
+            int: number of arch whose iso is not updated
+        """
+        for arch_name, iso_info in probe_all_arch(self._probe, self.pending).items():
+            if iso_info is None:
+                continue
+            iso_build_url, iso_build_time = iso_info
+            if iso_build_time > self.baseline[arch_name]["iso_build_time"]:
+                logger.info(f"iso of {arch_name} is updated to {iso_build_url}")
+                self.updated[arch_name] = dict(iso_build_url=iso_build_url, iso_build_time=iso_build_time)
+                self.pending.pop(arch_name)
+        return len(self.pending)
+
+    def wait(self, timeout=None, is_building=None, grace=ISO_PUBLISH_GRACE_TIME):
+        """
+        wait until the isos of all the arch are updated
+        Args:
+            timeout: seconds to wait, None means no limit
+            is_building: function called every poll, it returns whether the iso build is still
+                         running and raises if the build fails
+            grace: seconds to wait after the build is not running any more
+
+        Returns:
+            bool: True if the isos of all the arch are updated
+        """
+        started = time.monotonic()
+        deadline = started + timeout if timeout else None
+        polls = 0
+        while self.poll():
+            now = time.monotonic()
+            if is_building is not None and not is_building():
+                is_building = None
+                grace_deadline = now + grace
+                deadline = grace_deadline if deadline is None else min(deadline, grace_deadline)
+            if deadline is not None and now >= deadline:
+                return False
+            delay = self.policy.next_delay(now - started, overdue_polls=polls)
+            polls += 1
+            if deadline is not None:
+                delay = min(delay, deadline - now)
+            time.sleep(delay)
+        return True
 
 
 class MaJunAt:
@@ -63,7 +169,9 @@ class MaJunAt:
                            'openEuler-20.03-LTS-SP4']:
             branch_name = "EBS-" + branch_name
         try:
-            resp = requests.get(f"{DAYLIBUILD_URL}{branch_name}/{arch_url}/release_iso")
+            resp = get_pooled_session().get(
+                f"{DAYLIBUILD_URL}{branch_name}/{arch_url}/release_iso", timeout=global_config.ISO_PROBE_TIMEOUT
+            )
         except requests.RequestException as error:
             raise ValueError(
                 f"An error occurred at the parse iso build time, because {error}"
@@ -73,6 +181,8 @@ class MaJunAt:
         iso_build_url = resp.text.rstrip()
         base_re = r"^(.+)(openeuler-)([\d|-]+)(.+)"
         openeuler_build_time = re.compile(base_re).search(iso_build_url)
+        if not openeuler_build_time:
+            raise ValueError(f"Failed to parse the iso compile time of {iso_build_url}")
         iso_build_time = datetime.datetime.strptime(
             openeuler_build_time.group(3),
             "%Y-%m-%d-%H-%M-%S",
@@ -117,15 +227,50 @@ class MaJunAt:
             all_iso_info: iso addresses for different architectures
         """
         all_iso_info = dict()
-        for arch_name, arch_url in ISO_ARCH_MAP.items():
-            iso_build_url, iso_build_time = self.get_iso_single_build_time(
-                branch_name, arch_url
-            )
+        probe_results = probe_all_arch(
+            lambda arch_url: self.get_iso_single_build_time(branch_name, arch_url), ISO_ARCH_MAP
+        )
+        for arch_name, (iso_build_url, iso_build_time) in probe_results.items():
             all_iso_info[arch_name] = dict(
                 iso_build_url=iso_build_url, iso_build_time=iso_build_time
             )
         return all_iso_info
 
+    def watch_iso_build(self, branch_name, jenkins_job, jenkins_params):
+        """
+        Trigger the iso build, and wait until the isos of all the arch are updated
+        Args:
+            branch_name: branch name
+            jenkins_job: iso build job
+            jenkins_params: jenkins parameters
+
+        Returns:
+            iso_build_last_info: updated iso addresses for different architectures
+        """
+        build_id = self.jenkins_server_obj.build_specific_job(jenkins_job, jenkins_params)
+        if not build_id:
+            raise ValueError(
+                "The iso construction fails. Check the cause of the failure"
+            )
+        build_waiter = self.jenkins_server_obj.new_build_waiter(MAX_ISO_BUILD_WAIT_TIME)
+        build_waiter.watch(jenkins_job, build_id)
+
+        def is_building():
+            if build_waiter.poll():
+                return True
+            if build_waiter.results().get((jenkins_job, int(build_id))) != "SUCCESS":
+                raise ValueError(
+                    "The iso construction fails. Check the cause of the failure"
+                )
+            return False
+
+        watcher = IsoFreshnessWatcher(branch_name, self.iso_build_first_info)
+        if not watcher.wait(MAX_ISO_BUILD_WAIT_TIME * ISO_BUILD_WAIT_NUMBER, is_building):
+            raise ValueError(
+                "The iso url is not updated. Check the cause manually"
+            )
+        return watcher.updated
+
     @catch_majun_error
     def run(self, params):
         """
@@ -145,24 +290,9 @@ class MaJunAt:
         )
         jenkins_params = self.jenkins_param(branch_name)
         jenkins_job = ISO_BUILD_JOB_MAP.get(branch_name)
-        res = self.jenkins_server_obj.get_jenkins_job_build_result(
-            jenkins_params, jenkins_job, MAX_ISO_BUILD_WAIT_TIME
-        )
-        if not res or res[0].get("status") != "SUCCESS":
-            raise ValueError(
-                "The iso construction fails. Check the cause of the failure"
-            )
-        # Gets the last build time of the iso build.
-        self.iso_build_last_info = self.all_iso_time(branch_name)
-        iso_urls = list()
-        for arch_name, iso_info in self.iso_build_last_info.items():
-            if (
-                    iso_info.get("iso_build_time")
-                    - self.iso_build_first_info.get(arch_name).get("iso_build_time")
-            ).seconds <= 0:
-                raise ValueError(
-                    "The iso url is not updated. Check the cause manually"
-                )
-            else:
-                iso_urls.append(iso_info.get("iso_build_url"))
+        # Gets the last build time of the iso build as soon as the isos are published.
+        self.iso_build_last_info = self.watch_iso_build(branch_name, jenkins_job, jenkins_params)
+        iso_urls = [
+            self.iso_build_last_info[arch_name].get("iso_build_url") for arch_name in ISO_ARCH_MAP
+        ]
         return send_content_majun(";".join(iso_urls), params.id)
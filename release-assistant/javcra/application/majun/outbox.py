@@ -0,0 +1,252 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+durable outbox of the callbacks sent to majun
+"""
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import requests
+
+from javcra.common.constant import MAJUN_CALLBACK_URL
+from javcra.libs.config import global_config
+from javcra.libs.http_base import get_pooled_session
+from javcra.libs.log import logger
+
+# delivered callbacks are kept for dedup for this many seconds
+DELIVERED_KEEP_TIME = 7 * 24 * 3600
+# max number of callbacks claimed by a sender at a time
+CLAIM_LIMIT = 16
+
+_EXIT_DRAINS = set()
+_EXIT_DRAINS_LOCK = threading.Lock()
+
+
+class MajunOutbox:
+    """
+    callbacks to majun stored in a sqlite database before they are sent, so that a callback
+    is not lost when majun is slow or down. There is one callback for a majun id: an undelivered
+    callback is replaced by a newer one of the same id, and a callback identical to the delivered
+    one is not sent again. A callback which fails to be sent is retried with exponential backoff
+    by the later drains of the outbox, and it is dead after max attempts
+    """
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or global_config.MAJUN_OUTBOX_FILE
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_file)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS callbacks ("
+                "majun_id TEXT PRIMARY KEY, payload TEXT NOT NULL, digest TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, "
+                "delivered REAL, dead REAL, last_error TEXT)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_file, timeout=30)
+
+    def put(self, majun_id, payload):
+        """
+        store the callback of majun id
+
+        Args:
+            majun_id: majun id
+            payload: content sent to majun
+
+        Returns:
+            bool: False if the same callback has been delivered
+        """
+        text = json.dumps(payload, sort_keys=True)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT digest, delivered FROM callbacks WHERE majun_id = ?", (str(majun_id),)
+            ).fetchone()
+            if row and row[0] == digest and row[1] is not None:
+                logger.info(f"the callback of {majun_id} has been sent to majun")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO callbacks (majun_id, payload, digest, attempts, next_attempt) "
+                "VALUES (?, ?, ?, 0, ?)",
+                (str(majun_id), text, digest, time.time()),
+            )
+        return True
+
+    def claim(self, limit, lease):
+        """
+        take the callbacks which are due, they are not due for other senders during the lease
+
+        Args:
+            limit: max number of callbacks
+            lease: seconds that the callbacks are held
+
+        Returns:
+            list: [(majun id, payload, attempts)]
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            # the write lock is taken at once, so that two processes do not claim the same callbacks
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT majun_id, payload, attempts FROM callbacks "
+                "WHERE delivered IS NULL AND dead IS NULL AND next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE callbacks SET next_attempt = ? WHERE majun_id = ?",
+                [(now + lease, row[0]) for row in rows],
+            )
+        return [(majun_id, json.loads(payload), attempts) for majun_id, payload, attempts in rows]
+
+    def mark_delivered(self, majun_ids):
+        """
+        record that the callbacks are delivered, the old delivered ones are dropped
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE callbacks SET delivered = ?, last_error = NULL WHERE majun_id = ?",
+                [(now, str(majun_id)) for majun_id in majun_ids],
+            )
+            conn.execute("DELETE FROM callbacks WHERE delivered < ?", (now - DELIVERED_KEEP_TIME,))
+
+    def mark_failed(self, majun_ids, error):
+        """
+        schedule the next attempt of the callbacks with exponential backoff, a callback
+        which has been sent max attempts times is dead
+
+        Returns:
+            list: majun ids of the callbacks which are dead
+        """
+        now = time.time()
+        dead_ids = []
+        with closing(self._connect()) as conn, conn:
+            for majun_id in majun_ids:
+                # the right side of SET uses the attempts before the update
+                conn.execute(
+                    "UPDATE callbacks SET attempts = attempts + 1, last_error = ?, "
+                    "next_attempt = ? + MIN(? * (1 << MIN(attempts, 20)), ?), "
+                    "dead = CASE WHEN attempts + 1 >= ? THEN ? ELSE NULL END WHERE majun_id = ?",
+                    (
+                        str(error),
+                        now,
+                        global_config.MAJUN_CALLBACK_MIN_DELAY,
+                        global_config.MAJUN_CALLBACK_MAX_DELAY,
+                        global_config.MAJUN_CALLBACK_MAX_ATTEMPTS,
+                        now,
+                        str(majun_id),
+                    ),
+                )
+                row = conn.execute("SELECT dead FROM callbacks WHERE majun_id = ?", (str(majun_id),)).fetchone()
+                if row and row[0] is not None:
+                    dead_ids.append(majun_id)
+        return dead_ids
+
+    def status(self, majun_id):
+        """
+        Returns:
+            (delivered time or None, dead time or None, attempts), None if there is no callback of majun id
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT delivered, dead, attempts FROM callbacks WHERE majun_id = ?", (str(majun_id),)
+            ).fetchone()
+
+    def dead_letters(self):
+        """
+        Returns:
+            list: [(majun id, attempts, last error)] of the dead callbacks
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT majun_id, attempts, last_error FROM callbacks WHERE dead IS NOT NULL ORDER BY dead"
+            ).fetchall()
+
+
+class MajunSender:
+    """
+    send the callbacks in the outbox to majun with the pooled session, one callback per request.
+    The sender never waits for the backoff of a failed callback, the callback is sent by the
+    next drain of the outbox which finds it due
+    """
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+
+    @staticmethod
+    def post(payload):
+        """
+        post one callback
+
+        Returns:
+            error message, None if succeeded
+        """
+        headers = {"access_token": os.getenv("majun_access_token")}
+        try:
+            resp = get_pooled_session().post(
+                url=MAJUN_CALLBACK_URL,
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=global_config.MAJUN_CALLBACK_TIMEOUT,
+            )
+        except requests.RequestException as error:
+            return f"Failed to send data, because {error}"
+        if resp.status_code != requests.codes.ok:
+            return f"Failed to send data, status code is {resp.status_code}"
+        return None
+
+    def send_due(self):
+        """
+        send the callbacks which are due
+
+        Returns:
+            int: number of callbacks claimed
+        """
+        callbacks = self.outbox.claim(CLAIM_LIMIT, global_config.MAJUN_CALLBACK_TIMEOUT * 2)
+        for majun_id, payload, _ in callbacks:
+            error = self.post(payload)
+            if not error:
+                logger.info(f"The {payload} data sent to majun was successful")
+                self.outbox.mark_delivered([majun_id])
+                continue
+            logger.error(error)
+            for dead_id in self.outbox.mark_failed([majun_id], error):
+                logger.error(f"the callback of {dead_id} is dead after "
+                             f"{global_config.MAJUN_CALLBACK_MAX_ATTEMPTS} attempts, it is kept in "
+                             f"{self.outbox.db_file}")
+        return len(callbacks)
+
+    def drain(self):
+        """
+        send the callbacks until none of them is due, a failed callback is not due again until its backoff
+        """
+        while self.send_due():
+            pass
+
+
+def drain_at_exit(outbox):
+    """
+    drain the outbox once more when the process exits, so that the callbacks which
+    become due while the process runs are not left to the next run
+    """
+    with _EXIT_DRAINS_LOCK:
+        if outbox.db_file in _EXIT_DRAINS:
+            return
+        _EXIT_DRAINS.add(outbox.db_file)
+    atexit.register(MajunSender(outbox).drain)
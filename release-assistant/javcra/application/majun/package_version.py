@@ -13,15 +13,135 @@
 
 import re
 import collections
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import requests
 from pyrpm.spec import Spec, replace_macros
 from requests import RequestException
-from javcra.application.checkpart.check_requires.shell_api_tool import ShellCmdApi
+from javcra.application.checkpart.check_requires.obs_binary_api import get_obs_binary_table
+from javcra.application.checkpart.check_requires.osc_api import OscApi
+from javcra.application.checkpart.check_requires.shell_api_tool import RpmNameParser, get_command_runner
 from javcra.application.majun import catch_majun_error, get_product_version, send_content_majun
+from javcra.application.majun.spec_cache import SpecVersionCache
 from javcra.common.constant import BRANCH_MAP, OBS_PROJECT_MULTI_VERSION_MAP
+from javcra.libs.config import global_config
+from javcra.libs.http_base import get_pooled_session, host_slot
 from javcra.libs.log import logger
 
 
+def parse_spec_text(spec_text):
+    """
+    Parse the version and release of spec, it runs in the worker processes because pyrpm is cpu-bound
+    Args:
+        spec_text: content of spec
+
+    Returns:
+        version: Package Version
+        release: package release
+    """
+    version, release = "", ""
+    try:
+        spec = Spec.from_string(spec_text)
+    except AttributeError as error:
+        logger.error(f"An error occurred parsing spec contents {error}")
+        return version, release
+    try:
+        version = replace_macros(spec.version, spec)
+        release = replace_macros(spec.release, spec)
+    except TypeError as error:
+        logger.error(f"An error occurred parsing spec contents {error}")
+        return version, release
+    return version, release
+
+
+def start_parse_pool(max_workers):
+    """
+    Start the process pool of parsing specs, all the workers are started before the caller
+    starts any thread, so that no worker is forked while another thread holds a lock
+    Args:
+        max_workers: number of worker processes
+
+    Returns:
+        ProcessPoolExecutor, None if the specs are parsed in the current process
+    """
+    if max_workers <= 1:
+        return None
+    try:
+        parse_pool = ProcessPoolExecutor(max_workers=max_workers)
+        # the first task starts the workers, the forking ones are all started by it
+        for future in [parse_pool.submit(int) for _ in range(max_workers)]:
+            future.result()
+    except (OSError, NotImplementedError, BrokenProcessPool) as error:
+        logger.warning(f"specs are parsed in the current process, because {error}")
+        return None
+    return parse_pool
+
+
+class VersionTable:
+    """
+    versions of packages from all the sources, kept in columns: a column is the versions of all
+    the packages from one source like the spec on gitee or an arch of an obs project, and it is
+    filled by one bulk query. The rows are compared in one pass at the end
+    """
+
+    SAME = "same"
+    NEWER = "newer"
+    OLDER = "older"
+    UNKNOWN = "unknow"
+
+    def __init__(self, packagenames):
+        self.packagenames = list(dict.fromkeys(packagenames))
+        self.columns = collections.OrderedDict()
+
+    def add_column(self, source, versions):
+        """
+        add the versions from source
+        Args:
+            source: name of source
+            versions: list of (version, release) in the order of packagenames, ("", "") if not found
+        """
+        self.columns[source] = [tuple(version) for version in versions]
+
+    def compare(self, base_source, sources):
+        """
+        compare the version of base source with the first found version of sources of each package
+        Args:
+            base_source: name of base source, like the spec on gitee
+            sources: names of the sources compared with base source, in the order of priority
+
+        Returns:
+            diff: {package name: {"result": same, newer, older or unknow, "base": version-release,
+                   "source": the source found, "version": version-release of the source,
+                   "sources": {source: version-release}}}, newer means base is newer
+        """
+        base_column = self.columns[base_source]
+        diff = dict()
+        for row, packagename in enumerate(self.packagenames):
+            base_version = base_column[row]
+            found_source, found_version = "", ("", "")
+            for source in sources:
+                if self.columns[source][row][0]:
+                    found_source, found_version = source, self.columns[source][row]
+                    break
+            if base_version[0] and found_version[0]:
+                result = RpmNameParser.compare_evr(["0", *base_version], ["0", *found_version])
+                result = {0: self.SAME, 1: self.NEWER, -1: self.OLDER}[result]
+            else:
+                result = self.UNKNOWN
+            diff[packagename] = {
+                "result": result,
+                "base": "-".join(base_version) if base_version[0] else "",
+                "source": found_source,
+                "version": "-".join(found_version) if found_version[0] else "",
+                "sources": {
+                    source: "-".join(column[row]) if column[row][0] else ""
+                    for source, column in self.columns.items()
+                },
+            }
+        return diff
+
+
 class PackageVersion:
     def __init__(self) -> None:
         self.pkglist = None
@@ -45,73 +165,138 @@ class PackageVersion:
         Returns:
             Binary package list
         """
-        cmd = "osc ls -b {proj} {pkg} {repo} {arch}".format(
-            proj=proj, pkg=pkg, repo=f"standard_{arch}", arch=arch
-        )
-        stout = ShellCmdApi.call_subprocess(cmd.split())
-        return stout
+        return OscApi.ls_binaries_list(proj, pkg, f"standard_{arch}", arch)
 
-    def parse_spec_version(self, spec_format_url):
+    @staticmethod
+    def spec_url(packagename, branch_name):
         """
-        Parse spec content
+        url of the spec of package on gitee
+        Args:
+            packagename: package name
+            branch_name: branch name
+
+        Returns:
+            url
+        """
+        return f"https://gitee.com/src-openeuler/{packagename}/raw/{branch_name}/{packagename}.spec"
+
+    def request_spec(self, spec_format_url, etag=None):
+        """
+        Download spec by the process-wide session
         Args:
             spec_format_url: repo spec url
+            etag: ETag of the cached spec, the server answers 304 if the spec is unchanged
 
         Returns:
-            version: Package Version
-            release: package release
+            response, None if the request failed
         """
-        version, release = "", ""
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
         try:
-            response = requests.get(spec_format_url, headers=self.headers)
+            with host_slot(spec_format_url):
+                return get_pooled_session().get(
+                    spec_format_url, headers=headers, timeout=global_config.SPEC_FETCH_TIMEOUT
+                )
         except RequestException as error:
-            logger.error(f"An error occurred parsing spec contents {error}")
-            return version, release
-        if response.status_code != requests.codes.ok or not response.text:
-            return version, release
-        try:
-            spec = Spec.from_string(response.text)
-        except AttributeError as error:
-            logger.error(f"An error occurred parsing spec contents {error}")
-            return version, release
-        try:
-            version = replace_macros(spec.version, spec)
-            release = replace_macros(spec.release, spec)
-        except TypeError as error:
-            logger.error(f"An error occurred parsing spec contents {error}")
-            return version, release
-        return version, release
+            logger.error(f"Failed to download spec {spec_format_url}, because {error}")
+            return None
 
-    def git_package_version(self, packagename, branch_name):
+    def fetch_cached_spec(self, packagename, branch_name, spec_cache):
         """
-        Get the contents in the spec on the git repository
+        Get the version of package from cache if its spec is unchanged, otherwise download the spec
         Args:
             packagename: package name
             branch_name: branch name
+            spec_cache: SpecVersionCache
 
         Returns:
-            package_versions: eg{"22.03":"CUnit-5.3.0"}
+            cached (version, release) or None, content of spec, ETag of spec
         """
-        package_versions = {}
-        spec_format_url = f"https://gitee.com/src-openeuler/{packagename}/raw/{branch_name}/{packagename}.spec"
-        version, release = self.parse_spec_version(spec_format_url)
-        version, release = (version, release) if version else ("unknow", "unknow")
-        package_versions[packagename] = {branch_name: f"{version}-{release}"}
-        return package_versions
-
-    def gitee_package_version(self, branch_name):
+        spec_format_url = self.spec_url(packagename, branch_name)
+        etag = spec_cache.etag(packagename, branch_name)
+        response = self.request_spec(spec_format_url, etag)
+        if response is not None and etag and response.status_code == requests.codes.not_modified:
+            cached_version = spec_cache.lookup(packagename, branch_name, etag=etag)
+            if cached_version:
+                return cached_version, "", None
+            # the entry is evicted after its ETag is sent
+            response = self.request_spec(spec_format_url)
+        if response is None:
+            return None, "", None
+        if response.status_code != requests.codes.ok or not response.text:
+            return None, "", None
+        # a spec without ETag, or whose ETag changed with the same content, is still matched by digest
+        return (
+            spec_cache.lookup(packagename, branch_name, spec_text=response.text),
+            response.text,
+            response.headers.get("ETag"),
+        )
+
+    def gitee_spec_versions(self, branch_name):
         """
-        gitee repo package name
+        versions in the specs of packages on gitee, the specs are downloaded by a bounded thread
+        pool and each downloaded spec is parsed by a process pool at once. The versions of the
+        specs which are unchanged since the last run are taken from the spec cache without parsing
         Args:
             branch_name: branch name
 
         Returns:
-            packages_version
+            versions: {package name: (version, release)}, ("", "") if the spec can not be parsed
         """
-        packages_version = dict()
-        for packagename in self.pkglist:
-            packages_version.update(self.git_package_version(packagename, branch_name))
-        return packages_version
+        packagenames = list(dict.fromkeys(self.pkglist))
+        spec_cache = SpecVersionCache()
+        versions = dict()
+        spec_texts = dict()
+        parse_futures = dict()
+        parse_pool = start_parse_pool(min(global_config.SPEC_PARSE_WORKERS, len(packagenames)))
+
+        def parse_in_pool(packagename, spec_text):
+            """
+            parse spec by the process pool, or in the current process if the pool fails
+            """
+            if parse_pool:
+                try:
+                    parse_futures[packagename] = parse_pool.submit(parse_spec_text, spec_text)
+                    return
+                except (BrokenProcessPool, RuntimeError) as error:
+                    logger.warning(f"spec of {packagename} is parsed in the current process, {error}")
+            versions[packagename] = parse_spec_text(spec_text)
+
+        try:
+            fetch_workers = max(min(global_config.SPEC_FETCH_WORKERS, len(packagenames)), 1)
+            with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+                fetch_futures = {
+                    fetch_pool.submit(self.fetch_cached_spec, packagename, branch_name, spec_cache): packagename
+                    for packagename in packagenames
+                }
+                for future in as_completed(fetch_futures):
+                    packagename = fetch_futures[future]
+                    cached_version, spec_text, etag = future.result()
+                    if cached_version:
+                        versions[packagename] = cached_version
+                    elif not spec_text:
+                        versions[packagename] = ("", "")
+                    else:
+                        spec_texts[packagename] = (spec_text, etag)
+                        parse_in_pool(packagename, spec_text)
+
+            for packagename, future in parse_futures.items():
+                try:
+                    versions[packagename] = future.result()
+                except (BrokenProcessPool, OSError, pickle.PickleError) as error:
+                    logger.warning(f"spec of {packagename} is parsed in the current process, {error}")
+                    versions[packagename] = parse_spec_text(spec_texts[packagename][0])
+        finally:
+            if parse_pool:
+                parse_pool.shutdown()
+
+        for packagename, (spec_text, etag) in spec_texts.items():
+            if versions[packagename][0]:
+                spec_cache.store(packagename, branch_name, spec_text, etag, *versions[packagename])
+        spec_cache.save()
+        logger.info(f"spec version cache of {branch_name}: {spec_cache.stats}")
+        return versions
 
     def get_osc_pkg_version(self, pkg_name, project, arch):
         """
@@ -125,97 +310,81 @@ class PackageVersion:
             version: package version
             release: package release
         """
-        version, release = "", ""
         stdout = self.osc_ls_binaries_list(project, pkg_name, arch)
         if not stdout:
-            return version, release
-        for line in stdout.splitlines():
-            if line.strip().endswith(".src.rpm"):
-                nvr = line.strip().rsplit(".", 2)[0]
-                nvr_list = nvr.rsplit("-", 2)
-                version = nvr_list[1] if len(nvr_list) > 1 else ""
-                release = (
-                    re.split("\.oe\d+", nvr_list[2])[0] if len(nvr_list) > 2 else ""
-                )
-        return version, release
+            return "", ""
+        return self.src_rpm_version(stdout.splitlines())
 
-    def branch_package_version(self, pkg_name, obs_branch):
+    @staticmethod
+    def src_rpm_version(binaries):
         """
-        Software package information of multiple architectures
+        version of the source rpm in the binaries of package
         Args:
-            pkg_name: pcakage name
-            obs_branch: obs project name
+            binaries: file names of the binaries
 
         Returns:
-             version: version
-             release: release
+            version: package version
+            release: package release without dist like ".oe1"
         """
         version, release = "", ""
-        for arch in self.repo_arch_map.values():
-            version, release = self.get_osc_pkg_version(pkg_name, obs_branch, arch)
-            if version:
-                return version, release
+        for binary in binaries:
+            if binary.strip().endswith(".src.rpm"):
+                nvr = binary.strip().rsplit(".", 2)[0]
+                nvr_list = nvr.rsplit("-", 2)
+                version = nvr_list[1] if len(nvr_list) > 1 else ""
+                release = (
+                    re.split("\.oe\d+", nvr_list[2])[0] if len(nvr_list) > 2 else ""
+                )
         return version, release
 
-    def arch_package_version(self, pkg_name, branch_name):
+    def obs_version_column(self, project, arch, packagenames, resolved=()):
         """
-        Obtain the binary package of the software package on OBS,
-        and obtain the version and release information of the source code package
+        versions of packages in obs project, they are read from the binary list of the whole
+        project, or listed by osc package by package if the project can not be listed
         Args:
-            pkg_name: package name
-            branch_name: branch name
+            project: obs project
+            arch: arch
+            packagenames: package names
+            resolved: packages whose version has been found in the sources of higher priority,
+                      they are not listed by osc
 
         Returns:
-            package_versions: package name version release
+            versions: list of (version, release) in the order of packagenames, ("", "") for
+                      the resolved packages when osc is used
         """
-        package_versions = {}
-        obs_branchs = self.branch_map.get(branch_name)
-        main_package_version, main_package_release = self.branch_package_version(
-            pkg_name, obs_branchs[0]
-        )
-        if main_package_version:
-            package_versions[pkg_name] = {branch_name: f"{main_package_version}-{main_package_release}"}
+        table = get_obs_binary_table().binaries(project, f"standard_{arch}", arch)
+        if table is not None:
+            return [self.src_rpm_version(table.get(pkg_name, [])) for pkg_name in packagenames]
+        unresolved = [pkg_name for pkg_name in packagenames if pkg_name not in resolved]
+        versions = dict(zip(unresolved, get_command_runner().map(
+            lambda pkg_name: self.get_osc_pkg_version(pkg_name, project, arch), unresolved
+        )))
+        return [versions.get(pkg_name, ("", "")) for pkg_name in packagenames]
 
-        else:
-            epol_package_version, epols_package_release = self.branch_package_version(
-                pkg_name, obs_branchs[1]
-            )
-            package_versions[pkg_name] = {branch_name: f"{epol_package_version}-{epols_package_release}"}
-        return package_versions
-
-    def obs_package_version(self, branch_name):
+    def compare_versions(self, branch_name, obs_projects):
         """
-        obs package version
+        compare the versions in the specs on gitee with the versions built in obs projects
         Args:
             branch_name: branch name
+            obs_projects: obs projects in the order of priority, like the main project and epol
 
         Returns:
-            packages_version: package version
+            diff: per-package diff, see VersionTable.compare
         """
-        packages_version = dict()
-        for pkg_name in self.pkglist:
-            packages_version.update(self.arch_package_version(pkg_name, branch_name))
-        return packages_version
-
-    def mutil_obs_package(self, obs_project, branch_name):
-        """
-        Multi-version software package information
-        Args:
-            obs_project: obs  project
-            branch_name: branch name
-
-        Returns:
-            mutil packages version release
-        """
-        mutil_packages_version = dict()
-        for pkg_name in self.pkglist:
-            package_versions = {}
-            package_version, package_release = self.branch_package_version(
-                pkg_name, obs_project
-            )
-            package_versions[pkg_name] = {branch_name: f"{package_version}-{package_release}"}
-            mutil_packages_version.update(package_versions)
-        return mutil_packages_version
+        table = VersionTable(self.pkglist)
+        gitee_versions = self.gitee_spec_versions(branch_name)
+        table.add_column("gitee", [gitee_versions[pkg_name] for pkg_name in table.packagenames])
+        obs_sources = []
+        # only the first found obs version of a package is compared
+        resolved = set()
+        for project in obs_projects:
+            for arch in self.repo_arch_map.values():
+                source = f"{project}/{arch}"
+                versions = self.obs_version_column(project, arch, table.packagenames, resolved)
+                table.add_column(source, versions)
+                obs_sources.append(source)
+                resolved.update(pkg_name for pkg_name, version in zip(table.packagenames, versions) if version[0])
+        return table.compare("gitee", obs_sources)
 
     @catch_majun_error
     def run(self, params):
@@ -225,7 +394,7 @@ class PackageVersion:
             params: params
 
         Returns:
-            send data to majun
+            send data to majun, the per-package diff of compare_versions is sent as detail
         """
         self.majun_id, self.pkglist, self.task_title = (
             params.id,
@@ -240,18 +409,17 @@ class PackageVersion:
             branch_name = OBS_PROJECT_MULTI_VERSION_MAP.get(obs_project)
             if not branch_name:
                 raise ValueError(f"[ERROR]: This branch {obs_project} is not supported")
-            obs_packages = self.mutil_obs_package(obs_project, branch_name)
+            obs_projects = [obs_project]
         else:
-            obs_packages = self.obs_package_version(branch_name)
-        gitee_packages = self.gitee_package_version(branch_name)
+            obs_projects = self.branch_map.get(branch_name)
+        diff = self.compare_versions(branch_name, obs_projects)
         _package_dict = dict([(pkg, []) for pkg in self.pkglist])
-        for _package, branch_and_version in gitee_packages.items():
-            _gitee_package_version = branch_and_version.get(branch_name)
-            _obs_package_version = obs_packages.get(_package, {}).get(branch_name)
-            if "unknow" not in _gitee_package_version and _gitee_package_version == _obs_package_version:
-                compare_result = "same"
-            else:
-                compare_result = "unknow"
-            _package_dict[_package] = compare_result
+        for _package, package_diff in diff.items():
+            if package_diff["result"] != VersionTable.SAME:
+                logger.info(f"version of {_package} differs: {package_diff}")
+            # the status of majun only knows same and unknow, newer and older are told by the detail
+            _package_dict[_package] = (
+                VersionTable.SAME if package_diff["result"] == VersionTable.SAME else VersionTable.UNKNOWN
+            )
 
-        return send_content_majun(_package_dict, self.majun_id)
+        return send_content_majun(_package_dict, self.majun_id, detail=diff)
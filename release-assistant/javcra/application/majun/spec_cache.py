@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from javcra.libs.config import global_config
+from javcra.libs.log import logger
+
+
+class SpecVersionCache:
+    """
+    versions parsed from the specs of packages, kept on disk between the runs of version check.
+    An entry is keyed by package and branch, and it records the ETag and the sha1 of the spec it
+    was parsed from, so that an unchanged spec costs a 304 response or a digest instead of a parse.
+    The least recently used entries are dropped when there are more than max_entries
+    """
+
+    def __init__(self, cache_file=None, max_entries=None):
+        """
+        Args:
+            cache_file: json file of the cache, empty means the cache is not kept on disk
+            max_entries: max number of entries
+        """
+        self.cache_file = global_config.SPEC_CACHE_FILE if cache_file is None else cache_file
+        self.max_entries = max_entries or global_config.SPEC_CACHE_MAX_ENTRIES
+        self.stats = {"hit": 0, "miss": 0, "evicted": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(packagename, branch_name):
+        return f"{branch_name}/{packagename}"
+
+    @staticmethod
+    def digest(spec_text):
+        """
+        sha1 of spec content
+
+        Args:
+            spec_text: content of spec
+
+        Returns:
+            hex digest
+        """
+        return hashlib.sha1(spec_text.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        """
+        read the entries from cache file, the order of the file is the order of use
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as error:
+            logger.warning(f"failed to read spec cache {self.cache_file}: {error}")
+            return
+        for key, entry in entries:
+            self._entries[key] = entry
+
+    def save(self):
+        """
+        write the entries to cache file
+        """
+        if not self.cache_file:
+            return
+        cache_folder = os.path.dirname(os.path.abspath(self.cache_file))
+        with self._lock:
+            entries = list(self._entries.items())
+        try:
+            os.makedirs(cache_folder, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=cache_folder, delete=False) as file:
+                json.dump(entries, file)
+            os.replace(file.name, self.cache_file)
+        except OSError as error:
+            logger.warning(f"failed to write spec cache {self.cache_file}: {error}")
+
+    def etag(self, packagename, branch_name):
+        """
+        ETag of the spec which the cached version is parsed from
+
+        Args:
+            packagename: package name
+            branch_name: branch name
+
+        Returns:
+            ETag, None if there is no entry or the entry has no ETag
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(packagename, branch_name))
+            return entry.get("etag") if entry else None
+
+    def lookup(self, packagename, branch_name, etag=None, spec_text=None):
+        """
+        get the cached version of spec, the spec is identified by the ETag of a 304 response
+        or by the digest of its content
+
+        Args:
+            packagename: package name
+            branch_name: branch name
+            etag: ETag which the server confirmed unchanged
+            spec_text: downloaded content of spec
+
+        Returns:
+            (version, release), None if the spec changed or it is not cached
+        """
+        key = self._key(packagename, branch_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            matched = entry is not None and (
+                (etag is not None and entry.get("etag") == etag)
+                or (spec_text is not None and entry.get("sha1") == self.digest(spec_text))
+            )
+            if not matched:
+                self.stats["miss"] += 1
+                return None
+            self.stats["hit"] += 1
+            self._entries.move_to_end(key)
+            return entry["version"], entry["release"]
+
+    def store(self, packagename, branch_name, spec_text, etag, version, release):
+        """
+        cache the version parsed from spec
+
+        Args:
+            packagename: package name
+            branch_name: branch name
+            spec_text: content of spec
+            etag: ETag of the response, None if the server did not send one
+            version: version
+            release: release
+        """
+        key = self._key(packagename, branch_name)
+        entry = {"etag": etag, "sha1": self.digest(spec_text), "version": version, "release": release}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
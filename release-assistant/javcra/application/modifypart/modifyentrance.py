@@ -20,9 +20,15 @@ import requests
 from retrying import retry
 from javcra.api.gitee_api import Issue
 from javcra.common.constant import REPO_BASE_URL, RELEASE_URL, MULTI_VERSION_BRANCHS
+from javcra.common.release_body import ReleaseBody, ReleaseBodyEdits
 from javcra.libs.log import logger
 from javcra.libs.read_excel import download_file
 
+# patterns for the body of cve issue
+EULER_SCORE_PATTERN = re.compile("openEuler评分.*?(?P<euler_score>[0-9\.]+)", flags=re.S)
+BASE_SCORE_PATTERN = re.compile("BaseScore[：:](?P<base_score>[0-9\.]+)")
+ABI_CONTENT_PATTERN = re.compile("修复是否涉及abi变化.*?(?P<abi>.*)[\\n$]", flags=re.S)
+CVE_VERSION_PATTERN = re.compile("漏洞归属的版本[：:](?P<version>.*)")
 
 class Operation(Issue):
     """
@@ -84,187 +90,6 @@ class Operation(Issue):
             table_body_str += "\n"
         return table_body_str
 
-    @staticmethod
-    def get_block_lines(issue_body_lines, start_flag, end_flag):
-        """
-        get block lines of specific part from issue body lines
-
-        Args:
-            issue_body_lines: the lines of issue body
-            start_flag: start flag of specific part, like ""## 1、CVE""
-            end_flag: end flag of specific part, like "\n"
-
-        Returns: block_lines: lines in specific part like "cve part"
-                 block_start_idx: start index of specific part
-                 block_end_idx: end index of specific part
-
-        """
-        block_start_idx = 0
-        block_end_idx = 0
-        flag = 0
-
-        # get block lines
-        for idx, line in enumerate(issue_body_lines):
-            if not flag and line.startswith(start_flag):
-                # represents the start of block
-                flag = 1
-                block_start_idx = idx
-                continue
-
-            if flag and line == end_flag:
-                block_end_idx = idx
-                break
-
-        return issue_body_lines[block_start_idx:block_end_idx], block_start_idx, block_end_idx
-
-    @staticmethod
-    def modify_block_lines(origin_lines, block_lines, block_start, block_end):
-        """
-        modify block lines for add or delete operation
-
-        Args:
-            origin_lines: list, issue body splitlines
-            block_lines: list, block str splitlines
-            block_start: start index of block
-            block_end: end index of block
-
-        Returns:
-            new lines for issue body, list
-        """
-        # to get count and then modify str "修复CVE xxx个"
-        fix_line_idx = -1
-        count = 0
-        for index, cur_line in enumerate(block_lines):
-            # demo: 修复CVE xxx个
-            if cur_line.startswith("修复"):
-                fix_line_idx = index
-
-            # demo: |#I41R53:CVE-2021-36222|krb5|
-            if cur_line.startswith("|#"):
-                count += 1
-
-        if fix_line_idx != -1:
-            block_lines[fix_line_idx] = re.sub(
-                "\d+", str(count), block_lines[fix_line_idx]
-            )
-
-        # modify block lines
-        origin_lines[block_start:block_end] = block_lines
-        return origin_lines
-
-    @staticmethod
-    def __append_info_in_specific_block(append_info, block_lines):
-        """
-        append info in specific block for add operation
-
-        Args:
-            append_info: issue info or requires info, dict
-            block_lines: lines of specific block
-
-        Returns:
-                block_lines: block lines after append
-        """
-
-        for key, value in append_info.items():
-            # if the issue to be added is already in the table, then continue
-            if any([key in line for line in block_lines]):
-                logger.info("issue {} already exists in body content.".format(key))
-                continue
-
-            # if the requires info to be added already in the table, then not add
-            value_lines = value.splitlines(keepends=True)
-            append_value_lines = []
-            for line in value_lines:
-                if line not in block_lines:
-                    append_value_lines.append(line)
-
-            value = "".join(append_value_lines)
-            block_lines.append(value)
-
-        return block_lines
-
-    @staticmethod
-    def __delete_issue_in_specific_block(delete_issue, block_lines):
-        """
-        delete issue in specific block for delete operation
-
-        Args:
-            block_lines: lines of specific block
-            delete_issue: issue to delete
-
-        Returns:
-            block_lines: block lines after delete
-        """
-        to_remove_idx = -1
-        for idx, block_line in enumerate(block_lines):
-            if delete_issue in block_line:
-                to_remove_idx = idx
-                break
-
-        if to_remove_idx != -1:
-            block_lines.pop(to_remove_idx)
-        else:
-            logger.info("The issue {} does not exist in release issue description."
-                        "".format(delete_issue))
-        return block_lines
-
-    @staticmethod
-    def __update_info_in_specific_block(update_info, block_lines):
-        """
-        update info in specific block for update operation
-        Args:
-            update_info: issue to update
-            block_lines: lines of specific block
-        Returns:
-            block_lines: new lines of specific block
-        """
-        for issue_id, issue_content in update_info.items():
-            if not issue_content:
-                continue
-            for idx, ln in enumerate(block_lines):
-                if issue_id in ln:
-                    block_lines[idx] = issue_content
-                    break
-        return block_lines
-
-    def get_new_body_lines(self, old_issue_info, append_info=None, delete_info=None,
-                           update_info=None, start_flag="", end_flag="\n"):
-        """
-        generating a new issue body by add or delete or update operation
-
-        Args:
-            old_issue_info: old issue info
-            append_info: issues to add. like {issue_id:{"repo":..,"status":...},...}
-            delete_info: issues to delete.
-            update_info: issues to update.
-            start_flag: start flag of block
-            end_flag: end flag of block.
-
-        Raises:
-            ValueError:
-                append_info、 delete_info need at least one
-
-        Returns:
-            new body lines
-        """
-        if not any((append_info, delete_info, update_info)):
-            raise ValueError("append_info or delete_info or update info need at least one")
-
-        issue_body_lines = old_issue_info.splitlines(keepends=True)
-        block_lines, block_start_idx, block_end_idx = self.get_block_lines(
-            issue_body_lines, start_flag, end_flag)
-
-        if append_info:
-            block_lines = self.__append_info_in_specific_block(append_info, block_lines)
-        elif delete_info:
-            block_lines = self.__delete_issue_in_specific_block(delete_info, block_lines)
-        else:
-            block_lines = self.__update_info_in_specific_block(update_info, block_lines)
-
-        final_lines = self.modify_block_lines(issue_body_lines, block_lines, block_start_idx,
-                                              block_end_idx)
-        return "".join(final_lines)
-
     def create_jenkins_comment(self, jenkins_result):
         """method to create issue comment
 
@@ -285,23 +110,19 @@ class Operation(Issue):
             return
         return comment_res
 
-    def add_for_specific_block(self, body_str, issues, table_head, block_name):
+    def add_for_specific_block(self, edits, issues, table_head, block_name):
         """
-        add info in specific block
+        stage adding info in specific block
 
         Args:
-            body_str: str, issue body
+            edits: ReleaseBodyEdits object
             issues: issues to be add
             table_head: list, table head
             block_name: block name
 
         Returns:
-            processed issue body str
+            edits
         """
-
-        if not body_str:
-            raise ValueError("no content of release issue body, failed to add.")
-
         issues_dict = dict()
         issues_info_list = list()
 
@@ -314,43 +135,39 @@ class Operation(Issue):
         else:
             # for other blocks, get detail issue info according to each issue id, then get the md format str
             # like "|#I41R53:CVE-2021-36222|krb5|已完成|7.5|1.18.2|否|"
-            for issue_id in issues:
-                single_issue_info = self.get_single_issue_info(issue_id, block_name)
+            batch = self.get_issues_single_info(issues, block_name)
+            for issue_id, single_issue_info in zip(issues, batch.results):
                 if single_issue_info:
                     issues_info_list.append(single_issue_info)
                     issue_info = self.convert_md_table_format(table_head, single_issue_info)
                     issues_dict.setdefault(issue_id, issue_info)
+            if batch.failed and issues_info_list:
+                logger.warning("the issues %s are not added to %s." % (",".join(batch.failed), block_name))
 
         # if all the info to be add are empty
         if not issues_info_list:
             raise ValueError("failed to add, please check whether the issues to be added exists.")
 
-        return self.get_new_body_lines(
-            body_str, append_info=issues_dict, start_flag=block_name, end_flag="\n"
-        )
+        for key, value in issues_dict.items():
+            edits.append(block_name, key, value)
+        return edits
 
-    def delete_for_specific_block(self, body_str, issues, block_name):
+    @staticmethod
+    def delete_for_specific_block(edits, issues, block_name):
         """
-        delete info in specific block
+        stage deleting info in specific block
 
         Args:
-            body_str: str, issue body
+            edits: ReleaseBodyEdits object
             issues: issues to be delete
             block_name:block name
 
         Returns:
-            processed issue body str
+            edits
         """
-        if not body_str:
-            raise ValueError("no content of release issue body, failed to delete.")
-
-        res_str = body_str
-        # delete each issue and then get new issue body lines
         for issue_id in issues:
-            res_str = self.get_new_body_lines(
-                res_str, delete_info=issue_id, start_flag=block_name, end_flag="\n"
-            )
-        return res_str
+            edits.delete(block_name, issue_id)
+        return edits
 
     @staticmethod
     def __get_score(body_str):
@@ -364,15 +181,13 @@ class Operation(Issue):
             str: score value or no score
         """
         # to match openEuler评分 for cve
-        euler_score_pattern = re.compile("openEuler评分.*?(?P<euler_score>[0-9\.]+)", flags=re.S)
-        euler_res = euler_score_pattern.search(body_str)
+        euler_res = EULER_SCORE_PATTERN.search(body_str)
 
         if euler_res:
             return euler_res["euler_score"]
         else:
             # to match BaseScore for cve
-            base_score_pattern = re.compile("BaseScore[：:](?P<base_score>[0-9\.]+)")
-            base_score = base_score_pattern.search(body_str)
+            base_score = BASE_SCORE_PATTERN.search(body_str)
             return base_score["base_score"] if base_score else "no score info"
 
     def __is_abi_change(self, body_str):
@@ -386,8 +201,7 @@ class Operation(Issue):
             "是" or "否"
         """
         # to match whether the abi has changed of specific branch
-        abi_content_pattern = re.compile("修复是否涉及abi变化.*?(?P<abi>.*)[\\n$]", flags=re.S)
-        abi_res = abi_content_pattern.search(body_str)
+        abi_res = ABI_CONTENT_PATTERN.search(body_str)
 
         if not abi_res:
             logger.error("The abi pattern did not match the info")
@@ -440,8 +254,7 @@ class Operation(Issue):
                 logger.error("empty issue body for {}, can not get the info for {} block.".format(issue_id, block_name))
                 return []
 
-            version_pattern = re.compile("漏洞归属的版本[：:](?P<version>.*)")
-            version = version_pattern.search(issue_body)
+            version = CVE_VERSION_PATTERN.search(issue_body)
             issue_info["CVE"] = "#" + issue_id
             issue_info["score"] = self.__get_score(issue_body)
             issue_info["version"] = version["version"] if version else "no version info"
@@ -449,34 +262,39 @@ class Operation(Issue):
 
         return [issue_info]
 
-    def update_for_specific_block(self, body_str, issues, table_head, block_name):
+    def get_issues_single_info(self, issues, block_name):
         """
-        Update specific table modules
+        get singe issue info of several issues in parallel for specific block
+
         Args:
-            body_str: body info
+            issues: list of issue id
+            block_name: name of block
+
+        Returns:
+            BatchResult: issue info lists in the order of issues and the failed issue ids
+        """
+        return self.batch_issue_request(issues, lambda issue_id: self.get_single_issue_info(issue_id, block_name))
+
+    def update_for_specific_block(self, edits, issues, table_head, block_name):
+        """
+        stage updating specific table modules
+        Args:
+            edits: ReleaseBodyEdits object
             issues: list of issue numbers
             table_head: table head
             block_name: block name
 
         Returns:
-            get_new_body_lines: The new issue of body
+            edits
         """
-        if not body_str:
-            raise ValueError("no content of release issue, failed to update")
-        to_update = {}
-        for issue_id in issues:
-            # latest issue status
-            single_issue_info = self.get_single_issue_info(issue_id, block_name)
-            to_update.setdefault(
-                issue_id, self.convert_md_table_format(table_head, single_issue_info)
-            )
-
-        return self.get_new_body_lines(
-            body_str, update_info=to_update, start_flag=block_name, end_flag="\n"
-        )
+        # latest issue status
+        batch = self.get_issues_single_info(issues, block_name)
+        for issue_id, single_issue_info in zip(issues, batch.results):
+            edits.update(block_name, issue_id, self.convert_md_table_format(table_head, single_issue_info))
+        return edits
 
     def operate_for_specific_block(self, table_head, block_name, table_body=None, prefix="", operate="init",
-                                   body_str=None, issues=None):
+                                   body_str=None, issues=None, edits=None):
         """
         Process init, add, delete operations for specific block
 
@@ -488,29 +306,42 @@ class Operation(Issue):
             operate: init, add, delete
             body_str: issue body, str
             issues: issue id, list
+            edits: ReleaseBodyEdits object, the add, delete and update operations are staged
+                   in it instead of being applied to body_str when it is given
 
         Raises:
             ValueError: not allowed operate
 
         Returns:
-            processed release issue body str
+            processed release issue body str, or edits when it is given
         """
         if not table_body:
             table_body = []
+        if not issues:
+            issues = []
 
         if operate == "init":
             return self.init_md_table(table_head, table_body, block_name, prefix)
-        elif operate == "add":
-            return self.add_for_specific_block(body_str, issues, table_head, block_name)
-        elif operate == "delete":
-            return self.delete_for_specific_block(body_str, issues, block_name)
-        elif operate == "update":
-            return self.update_for_specific_block(body_str, issues, table_head, block_name)
-        else:
+        if operate not in ["add", "delete", "update"]:
             raise ValueError(
                 "not allowed 'operate' value,expected in ['init','add','delete','update'],but given {}".format(operate)
             )
 
+        if edits is not None:
+            staged_edits = edits
+        elif body_str:
+            staged_edits = ReleaseBodyEdits()
+        else:
+            raise ValueError("no content of release issue body, failed to {}.".format(operate))
+
+        if operate == "add":
+            self.add_for_specific_block(staged_edits, issues, table_head, block_name)
+        elif operate == "delete":
+            self.delete_for_specific_block(staged_edits, issues, block_name)
+        else:
+            self.update_for_specific_block(staged_edits, issues, table_head, block_name)
+        return edits if edits is not None else staged_edits.apply(body_str)
+
     def init(self, *args, issues=None):
         """
         init specific block
@@ -520,7 +351,7 @@ class Operation(Issue):
         """
         return self.get_new_issue_body(operate="init", *args, issues=issues)
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         raise NotImplementedError
 
 
@@ -596,7 +427,7 @@ class CveIssue(Operation):
         cve_list = get_list()
         return cve_list
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for cve block operation
 
@@ -604,6 +435,7 @@ class CveIssue(Operation):
             operate: operate str. Defaults to "init".expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue id list.
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             new issue body str
@@ -618,14 +450,14 @@ class CveIssue(Operation):
         cve_prefix = "修复CVE {}个".format(len(cve_list))
 
         return self.operate_for_specific_block(t_head, block_name, prefix=cve_prefix, operate=operate,
-                                               table_body=cve_list, body_str=body_str, issues=issues)
+                                               table_body=cve_list, body_str=body_str, issues=issues, edits=edits)
 
 
 class BugFixIssue(Operation):
     def __init__(self, repo, token, issue_num):
         super().__init__(repo, token, issue_num)
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for bugfix block operation
 
@@ -633,6 +465,7 @@ class BugFixIssue(Operation):
             operate: operate str. Defaults to "init".expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue id list.
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             str: new issue body str
@@ -644,11 +477,13 @@ class BugFixIssue(Operation):
         block_name = "## 2、bugfix"
 
         bugfix_list = []
-        for issue_id in issues:
+        # the table body is only needed to init the block
+        if operate == "init":
             # latest issue status
-            single_issue_info = self.get_single_issue_info(issue_id, block_name)
-            if single_issue_info:
-                bugfix_list.append(single_issue_info[0])
+            batch = self.get_issues_single_info(issues, block_name)
+            for single_issue_info in batch.results:
+                if single_issue_info:
+                    bugfix_list.append(single_issue_info[0])
 
         bugfix_prefix = "修复bugfix {}个".format(len(bugfix_list))
 
@@ -660,6 +495,7 @@ class BugFixIssue(Operation):
             table_body=bugfix_list,
             body_str=body_str,
             issues=issues,
+            edits=edits,
         )
 
 
@@ -679,7 +515,7 @@ class RequiresIssue(Operation):
         # so it is assumed that the return value is []
         return []
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for requires block operation
 
@@ -687,6 +523,7 @@ class RequiresIssue(Operation):
             operate. Defaults to "init".expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue list
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             new issue body str
@@ -700,7 +537,7 @@ class RequiresIssue(Operation):
 
         issues = self.get_requires_list()
         return self.operate_for_specific_block(
-            t_head, block_name, operate=operate, body_str=body_str, issues=issues
+            t_head, block_name, operate=operate, body_str=body_str, issues=issues, edits=edits
         )
 
 
@@ -708,7 +545,7 @@ class InstallBuildIssue(Operation):
     def __init__(self, repo, token, issue_num):
         super().__init__(repo, token, issue_num)
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for install build block operation
 
@@ -716,6 +553,7 @@ class InstallBuildIssue(Operation):
             operate: operate str. expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue id list.
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             new issue body str
@@ -728,7 +566,8 @@ class InstallBuildIssue(Operation):
             block_name,
             operate=operate,
             body_str=body_str,
-            issues=issues
+            issues=issues,
+            edits=edits
         )
 
 
@@ -736,7 +575,7 @@ class RemainIssue(Operation):
     def __init__(self, repo, token, issue_num):
         super().__init__(repo, token, issue_num)
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for remain block operation
 
@@ -744,6 +583,7 @@ class RemainIssue(Operation):
             operate: operate str. expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue id list.
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             str: new issue body str
@@ -756,7 +596,8 @@ class RemainIssue(Operation):
             block_name,
             operate=operate,
             body_str=body_str,
-            issues=issues
+            issues=issues,
+            edits=edits
         )
 
 
@@ -769,6 +610,19 @@ class IssueOperation(Operation):
         self.requires_object = RequiresIssue(*args)
         self.install_build_object = InstallBuildIssue(*args)
         self.remain_object = RemainIssue(*args)
+        self.use_release_snapshot(self.release_snapshot)
+
+    def use_release_snapshot(self, snapshot):
+        """
+        share the release issue snapshot with the block objects
+
+        Args:
+            snapshot: ReleaseIssueSnapshot object
+        """
+        super().use_release_snapshot(snapshot)
+        for block_object in (self.cve_object, self.bugfix_object, self.requires_object,
+                             self.install_build_object, self.remain_object):
+            block_object.use_release_snapshot(snapshot)
 
     def init_repo_table(self):
         """
@@ -841,11 +695,12 @@ class IssueOperation(Operation):
         """
         issue_body = self.get_issue_body(self.issue_num)
         if issue_body:
-            if re.compile("1、CVE.*?\\n\\n", re.S).search(issue_body):
+            release_body = ReleaseBody.parse(issue_body)
+            if release_body.block("1、CVE"):
                 logger.error("Issue has CVE content, maybe you already have operated start update command.")
                 return None
 
-            if "代码冻结" not in issue_body:
+            if "代码冻结" not in release_body.header:
                 logger.error("the code freeze time is not in release issue body.")
                 return None
 
@@ -865,25 +720,23 @@ class IssueOperation(Operation):
             logger.error("no content of release issue body.")
             return None
 
-        date_info = re.compile("(?P<release_date>代码冻结.*?\\n\\n)", re.S).search(issue_body)
-        if not date_info:
+        release_body = ReleaseBody.parse(issue_body)
+        if "代码冻结" not in release_body.header:
             logger.error("the code freeze time is not in release issue body.")
             return None
 
-        split_date_info = re.split(r":|：", date_info["release_date"].strip())
-        try:
-            release_date = split_date_info[1].strip()
-            # The length of the date including year, month, and day is 8
-            if release_date.isdigit() and len(release_date) == 8:
-                return release_date
-
-            logger.error("The format of the code freeze date: %s does not meet the requirements." % release_date)
-            return None
-
-        except IndexError:
+        release_date = release_body.header["代码冻结"]
+        if release_date is None:
             logger.error("error in getting code freeze date.")
             return None
 
+        # The length of the date including year, month, and day is 8
+        if release_date.isdigit() and len(release_date) == 8:
+            return release_date
+
+        logger.error("The format of the code freeze date: %s does not meet the requirements." % release_date)
+        return None
+
     def get_repo(self, md_type=True):
         """
         get repo according to branch 、date and epol
@@ -922,56 +775,33 @@ class IssueOperation(Operation):
         return repos
 
     @staticmethod
-    def _process_issue_id(body):
+    def _get_block_issue_ids(release_body, block_name):
         """
-        Process the MD string to get the issue ID
+        get the issue ids in the table of block
+
         Args:
-            body (str): block body
+            release_body: ReleaseBody object
+            block_name: name of block
+
         Returns:
-            set: current block repos
+            list: issue ids, empty when the block does not exist
         """
-        content = re.compile("#[a-zA-Z0-9]+", re.S).findall(body)
-        if not content:
-            return content
-        return [con.replace("#", "") for con in content]
+        block = release_body.block(block_name)
+        return block.issue_ids() if block else []
 
     def _get_install_build_bugfix_issue_id(self, issue_body):
         """
-        Gets the corresponding block element with regular,
+        Gets the issue ids of install_build, bugfix and cve block
         Args
             issue_body: issue body str
 
         Returns:
             issue number: issue number list
         """
-
-        def update_set(res_obj):
-            # Call the _process_issue_id function to return the issue number
-            res_set = set()
-            issue_list = self._process_issue_id(res_obj)
-            res_set.update(issue_list)
-            return res_set
-
-        def update_res(issue_res, choice):
-            # If this table object exists,
-            # the final issue is fetched based on the selection
-            issues = set()
-            if issue_res:
-                issues = update_set(issue_res[choice])
-            return issues
-
-        # Installs the compiled table information object
-        install_build_res = re.compile("(?P<install_build>3、安装、自编译问题.*?\\n\\n)",
-                                       re.S).search(issue_body)
-        # Table information object for bugfix
-        bugfix_res = re.compile("(?P<bugfix>2、bugfix.*?\\n\\n)", re.S).search(issue_body)
-
-        # cve table information object
-        cve_res = re.compile("(?P<cve>1、CVE.*?\\n\\n)", re.S).search(issue_body)
-
-        install_build_issues = update_res(install_build_res, "install_build")
-        bugfix_issues = update_res(bugfix_res, "bugfix")
-        cve_issues = update_res(cve_res, "cve")
+        release_body = ReleaseBody.parse(issue_body)
+        install_build_issues = set(self._get_block_issue_ids(release_body, "3、安装、自编译问题"))
+        bugfix_issues = set(self._get_block_issue_ids(release_body, "2、bugfix"))
+        cve_issues = set(self._get_block_issue_ids(release_body, "1、CVE"))
         if not all([install_build_issues, bugfix_issues, cve_issues]):
             logger.info("Block has no related issues  install_build_issues:%s, "
                         "bugfix_issues: %s,cve_issues: %s " % (install_build_issues, bugfix_issues, cve_issues))
@@ -994,7 +824,7 @@ class IssueOperation(Operation):
             if not issue_body:
                 raise ValueError("failed to obtain the issue description")
             _, bugfix_issues, cve_issue = self._get_install_build_bugfix_issue_id(issue_body)
-            to_update = {}
+            edits = ReleaseBodyEdits()
             not_exist_issues = []
             for issue in issue_list:
                 if issue not in bugfix_issues and issue not in cve_issue:
@@ -1013,15 +843,9 @@ class IssueOperation(Operation):
                     new_con = operate_ins.get_single_issue_info(issue, block_name)[0]
                 if action == "add":
                     new_con["status"] = "遗留"
-                to_update.setdefault(
-                    issue, self.convert_md_table_format(t_head, [new_con])
-                )
-                body_str = self.get_new_body_lines(
-                    issue_body, update_info=to_update, start_flag=block_name, end_flag="\n"
-                )
-                res = self.update_issue(body=body_str)
-                if not res:
-                    raise ValueError("failed to %s action issue status,issue is %s" % (action, issue))
+                edits.update(block_name, issue, self.convert_md_table_format(t_head, [new_con]))
+            if not self.commit_body_edits(edits, issue_body):
+                raise ValueError("failed to %s action issue status,issues are %s" % (action, issue_list))
         except (ValueError, AttributeError, IndexError, TypeError, KeyError) as error:
             logger.error("In the %s operation, the reasons for the error are as follows: %s" % (action, error))
             return False
@@ -1040,12 +864,12 @@ class IssueOperation(Operation):
             logger.error("empty body of release issue.")
             return []
 
-        remain_res = re.compile("(?P<remain>4、遗留问题.*?\\n\\n)", re.S).search(issue_body)
-        if not remain_res:
+        remain_block = ReleaseBody.parse(issue_body).block("4、遗留问题")
+        if not remain_block:
             logger.error("can not find remain issues label in release issue.")
             return []
 
-        remain_issues = self._process_issue_id(remain_res["remain"])
+        remain_issues = remain_block.issue_ids()
         if not remain_issues:
             logger.info("can not find any remain issues in release issue.")
         return list(set(remain_issues))
@@ -1059,8 +883,8 @@ class IssueOperation(Operation):
         remain_issues = self.get_remain_issues()
         remain_pkgs = []
 
-        for issue_number in remain_issues:
-            issue_content = self.get_issue_info(issue_number=issue_number)
+        batch = self.get_issues_info(remain_issues)
+        for issue_number, issue_content in zip(remain_issues, batch.results):
             if not issue_content:
                 logger.error("can not get the content of issue %s, perhaps this issue not exist." % issue_number)
                 continue
@@ -1085,14 +909,17 @@ class IssueOperation(Operation):
             # get the bugfix and the issue number under the install_build and cve table headers
             install_build_issues, bugfix_issues, _ = self._get_install_build_bugfix_issue_id(body)
             remain_issues = self.get_remain_issues()
+            # stage the status updates of both blocks and send them in one request
+            edits = ReleaseBodyEdits()
             if install_build_issues:
                 install_build_issues = [issue for issue in install_build_issues if issue not in remain_issues]
-                self.operate_release_issue(operation="update", operate_block="install_build",
-                                           issues=install_build_issues)
+                self.get_new_issue_body("install_build", operate="update", issues=install_build_issues,
+                                        edits=edits)
             if bugfix_issues:
                 bugfix_issues = [issue for issue in bugfix_issues if issue not in remain_issues]
-                self.operate_release_issue(operation="update", operate_block="bugfix",
-                                           issues=bugfix_issues)
+                self.get_new_issue_body("bugfix", operate="update", issues=bugfix_issues, edits=edits)
+            if not self.commit_body_edits(edits, body):
+                raise ValueError("failed to update the release issue description")
         except (ValueError, TypeError, KeyError, AttributeError) as error:
             logger.error("failed to update the status of the issue, the specific reason is %s" % error)
             return False
@@ -1130,7 +957,7 @@ class IssueOperation(Operation):
 
         return True if self.update_issue(body=body_str) else False
 
-    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None):
+    def get_new_issue_body(self, *args, operate="init", body_str=None, issues=None, edits=None):
         """
         get new issue body for specific operation
 
@@ -1138,19 +965,23 @@ class IssueOperation(Operation):
             operate: operate str. Defaults to "init".expected [init,add,delete]
             body_str: gitee issue body str.
             issues: issue id list.
+            edits: ReleaseBodyEdits object to stage add, delete and update operations in
 
         Returns:
             new issue body str
         """
+        update_block = args[0]
+        # get the block object, like cve block object, and then call
+        # "get_new_issue_body" for this block
+        operate_object = getattr(self, update_block + "_object")
+        if edits is not None:
+            return operate_object.get_new_issue_body(operate=operate, issues=issues, edits=edits)
+
         old_body_str = self.get_issue_body(self.issue_num)
         if not old_body_str:
             logger.error("The current issue has no content, please start first.")
             return False
 
-        update_block = args[0]
-        # get the block object, like cve block object, and then call
-        # "get_new_issue_body" for this block
-        operate_object = getattr(self, update_block + "_object")
         body_str = operate_object.get_new_issue_body(
             operate=operate, body_str=old_body_str, issues=issues)
         return body_str
@@ -1176,14 +1007,8 @@ class IssueOperation(Operation):
                 "The current issue has no content, please start first.")
             return False
 
-        body_str = self.get_new_issue_body(update_block, operate=operate, issues=issues)
-
-        if not body_str:
-            logger.error(
-                "after update issue description, got empty new release issue body.")
-            return False
-
-        return True if self.update_issue(body=body_str) else False
+        edits = self.get_new_issue_body(update_block, operate=operate, issues=issues, edits=ReleaseBodyEdits())
+        return True if self.commit_body_edits(edits, old_body_str) else False
 
     def count_issue_status(self):
         """
@@ -1194,6 +1019,8 @@ class IssueOperation(Operation):
         """
         try:
             body = self.get_issue_body(self.issue_num)
+            if not body:
+                raise ValueError("failed to get issue description information")
             # obtain the issue number under installation, compilation and bugfix
             install_build_issues, bugfix_issues, _ = self._get_install_build_bugfix_issue_id(body)
             issues = install_build_issues + bugfix_issues
@@ -1202,13 +1029,14 @@ class IssueOperation(Operation):
                 logger.info("no issue in install_build and bugfix block.")
                 return True
 
-            # traverse all issues, get the status of the issue,
+            # get the status of all issues in parallel,
             # and add the unfinished ones to the unfinished list
-            for issue_number in issues:
-                issue_content = self.get_issue_info(issue_number)
-                if not issue_content:
-                    logger.error("failed to get the issue info of %s. " % issue_number)
-                    continue
+            batch = self.get_issues_info(issues)
+            if batch.failed:
+                # an issue whose status can not be read is not known to be completed
+                logger.error("failed to get the issue info of %s. " % ",".join(batch.failed))
+                return False
+            for issue_number, issue_content in zip(issues, batch.results):
                 if issue_content.get("issue_state") != "已完成":
                     unfinished_issues.append(issue_number)
             if unfinished_issues:
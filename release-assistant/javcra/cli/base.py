@@ -19,6 +19,9 @@ import argparse
 from collections import namedtuple
 from abc import abstractmethod
 
+from javcra.libs.http_base import pooled_session_stats
+from javcra.libs.log import logger
+
 
 class BaseCommand():
     """
@@ -162,7 +165,11 @@ class BaseCommand():
 
         """
         args = cls.parser.parse_args()
-        args.func(args)
+        try:
+            args.func(args)
+        finally:
+            # the connections opened and reused by all the http requests of the command
+            logger.info("http connections of the command: %s" % pooled_session_stats())
 
     @abstractmethod
     def do_command(self, params):
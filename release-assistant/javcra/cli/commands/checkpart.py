@@ -16,7 +16,6 @@ Class:CheckCommand
 """
 import os
 import stat
-import uuid
 
 from javcra.api.jenkins_api import JenkinsJob
 from javcra.application.checkpart.checkentrance import CheckEntrance
@@ -30,6 +29,7 @@ from javcra.common import constant
 from javcra.common.constant import (
     GITEE_REPO,
     MAX_PARAL_NUM,
+    PKG_LOG_TAIL_LINES,
     REALSE_TOOLS_BUCKET_NAME,
     REALSE_TOOLS_SERVER,
     X86_FRAME,
@@ -145,16 +145,19 @@ class CheckCommand(BaseCommand):
         return issue
 
     @staticmethod
-    def check_issue(params):
+    def check_issue(params, release_snapshot=None):
         """
         Description: to get check_issue object
         Args:
             params: Command line parameters
+            release_snapshot: release issue snapshot shared with other issue objects
 
         Returns:
             check_issue object
         """
         check_issue = CheckEntrance(GITEE_REPO, params.token, params.releaseIssueID)
+        if release_snapshot:
+            check_issue.use_release_snapshot(release_snapshot)
         return check_issue
 
     def judge_cve_bugfix_comment(self, issue, params):
@@ -231,7 +234,7 @@ class CheckCommand(BaseCommand):
             ValueError: throw an exception when the function call returns false
         """
         issue = self.issue(params)
-        check_issue = self.check_issue(params)
+        check_issue = self.check_issue(params, issue.release_snapshot)
 
         # check whether all the issue status is incomplete
         status_res = issue.check_issue_state()
@@ -252,36 +255,25 @@ class CheckCommand(BaseCommand):
             return
         print("[INFO] successfully to send repo info.")
 
-    def read_log_data(self, cloud_server, pkg_log, tem_pkg_log_path, pkg_name):
+    def read_log_data(self, cloud_server, pkg_log, pkg_name):
         """
-        read pkg log data
+        read the last lines of pkg log, only the tail of log is downloaded
         Args:
             cloud_server: cloud_server
             pkg_log: pkg log
-            tem_pkg_log_path: tem_pkg_log_path
             pkg_name: pkg_name
 
         Returns:
-            None
+            pkg_log_data: the last lines of log, empty str if failed to read
         """
-        try:
-            resp = cloud_server.down_load_file(pkg_log, tem_pkg_log_path)
-            if not resp:
-                logger.error("failed to download archived %s package "
-                             "compilation log" % pkg_name)
-                return ""
-            with open(tem_pkg_log_path, "r", encoding="utf-8") as file:
-                pkg_log_data = file.readlines()
-                return "".join(pkg_log_data[-50:])
-        except (OSError, IOError, IndexError) as error:
-            logger.error("failed to extract archived %s package "
-                         "compilation information,because %s" % (pkg_name, error))
+        pkg_log_data = cloud_server.tail_lines(pkg_log, PKG_LOG_TAIL_LINES)
+        if pkg_log_data is None:
+            logger.error("failed to download archived %s package "
+                         "compilation log" % pkg_name)
             return ""
-        finally:
-            if os.path.exists(tem_pkg_log_path):
-                os.remove(tem_pkg_log_path)
+        return pkg_log_data
 
-    def download_pkg_log(self, pkg_name, install_or_build, branch_name, cloud_server):
+    def download_pkg_log(self, pkg_name, install_or_build, branch_name, cloud_server, log_index=None):
         """
         download the archived information and read the last 50 lines of log information
         Args:
@@ -289,20 +281,18 @@ class CheckCommand(BaseCommand):
             install_or_build: install_or_build
             branch_name: branch_name
             cloud_server: cloud_server
+            log_index: ResultLogIndex of branch, it is built if not given
 
         Returns:
             part_log_data: part log data
         """
         choose_dict = {"build_list": "build_result", "install_list": "check_result"}
-        pkg_logs = cloud_server.bucket_list(
-            "install_build_log/{}".format(branch_name)
-        )
-        for pkg_log in pkg_logs:
-            if pkg_name in pkg_log and choose_dict.get(install_or_build) in pkg_log:
-                tem_pkg_log_path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
-                                                "{}_{}_{}_{}".format(branch_name, install_or_build, pkg_name,
-                                                                     str(uuid.uuid1().hex)))
-                return self.read_log_data(cloud_server, pkg_log, tem_pkg_log_path, pkg_name)
+        if log_index is None:
+            log_index = cloud_server.result_log_index(branch_name)
+        pkg_logs = log_index.logs(branch_name, choose_dict.get(install_or_build), pkg_name)
+        if pkg_logs:
+            return self.read_log_data(cloud_server, pkg_logs[0], pkg_name)
+        return None
 
     def versions_operation(self, params):
         """
@@ -358,11 +348,7 @@ class CheckCommand(BaseCommand):
             verify selfbuild for update pkg_list
 
             """
-            jenkins_server.delete_jenkins_job(
-                constant.JENKINS_PATH_PREFIX
-                + "/"
-                + branch_name
-            )
+            # the existing jobs of the branch are reused, only the changed jobs are created or updated
             created_res = jenkins_server.create_selfbuild_jenkins_jobs(update_pkgs)
             if not created_res:
                 raise ValueError("failed to create selfbuild jenkins job.")
@@ -395,7 +381,7 @@ class CheckCommand(BaseCommand):
             install_or_build_dict = {"build_list": "build", "install_list": "install"}
             for pkg in pkgs:
                 log_data = self.download_pkg_log(
-                    pkg, install_or_build, branch_name, cloud_server
+                    pkg, install_or_build, branch_name, cloud_server, log_index
                 )
                 issue_id = issue.create_install_build_issue(
                     install_or_build_dict.get(install_or_build), pkg, log_data)
@@ -415,7 +401,7 @@ class CheckCommand(BaseCommand):
         if not judege_res:
             return
 
-        check_issue = self.check_issue(params)
+        check_issue = self.check_issue(params, issue.release_snapshot)
         branch_name, update_pkgs, release_date = self.get_release_info(issue)
 
         standard_list, epol_list = issue.get_standard_epol_list(branch_name, update_pkgs)
@@ -482,8 +468,10 @@ class CheckCommand(BaseCommand):
             epol_install_res = verify_install("true", epol_list)
             self.create_comment("epol install jenkins res", epol_install_res, issue)
 
-        # obtain and analyze the self-build installation results from file server
-        parsed_install_build_res = cloud_server.parse_install_build_content(branch_name)
+        # obtain and analyze the self-build installation results from file server,
+        # the index of archived logs is shared by the parsing and the write back
+        log_index = cloud_server.result_log_index(branch_name)
+        parsed_install_build_res = cloud_server.parse_install_build_content(branch_name, log_index=log_index)
 
         # If the selfbuild or install fails, create issue and then write the issue_id back to the release issue
         for issue_type, pkg_list in parsed_install_build_res.items():
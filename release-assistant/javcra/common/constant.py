@@ -138,6 +138,9 @@ REALSE_TOOLS_SERVER = "obs.cn-north-4.myhuaweicloud.com"
 # max parallel jenkins num
 MAX_PARAL_NUM = 5
 
+# number of lines at the end of failed log written to the install or build issue
+PKG_LOG_TAIL_LINES = 50
+
 # obs_project
 OBS_PRJ = "openEuler:20.09"
 
@@ -305,6 +308,21 @@ ISO_BUILD_JOB_MAP = {
 MIN_JENKINS_BUILD_WAIT_TIME = 5
 MAX_ISO_BUILD_WAIT_TIME = 1200
 ISO_BUILD_WAIT_NUMBER = 6
+# polling of the release_iso pointers of dailybuild after the iso build is triggered, the
+# interval grows exponentially between the two delays; after the build job succeeds the
+# pointers are still polled for the grace time before giving up
+ISO_WATCH_MIN_DELAY = 30
+ISO_WATCH_MAX_DELAY = 300
+ISO_PUBLISH_GRACE_TIME = 600
+# polling of jenkins builds, the interval shrinks towards the estimated duration of
+# the build and then grows exponentially, every interval is randomized by the jitter
+MAX_JENKINS_BUILD_WAIT_TIME = 60
+JENKINS_WAIT_ESTIMATE_RATIO = 0.5
+JENKINS_WAIT_BACKOFF_FACTOR = 2
+JENKINS_WAIT_JITTER = 0.2
+JENKINS_QUEUE_WAIT_TIME = 1
+# seconds to read the console output of a running build before giving up
+JENKINS_CONSOLE_TIMEOUT = 2 * 3600
 # staff
 VERSION_MANAGER = "@gitee-cmd @zhangtao2020"
 DEVELOPER = "@gitee-cmd @zhangtao2020 @caodongxia @yaoxin"
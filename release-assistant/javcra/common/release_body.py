@@ -0,0 +1,368 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: document model of the release issue body
+Class: ReleaseRow, ReleaseBlock, ReleaseBody, ReleaseBodyEdits
+"""
+import re
+
+from javcra.libs.log import logger
+
+# demo: |#I41R53:CVE-2021-36222|krb5|, the issue id is I41R53
+ISSUE_ID_PATTERN = re.compile("#(?P<issue_id>[a-zA-Z0-9]+)")
+# demo: |-|-|-|
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|(-+\|)+\s*$")
+# demo: 代码冻结：20210420
+HEADER_FIELD_PATTERN = re.compile("[:：]")
+COUNTER_DIGIT_PATTERN = re.compile(r"\d+")
+# demo: 修复CVE xxx个
+COUNTER_PREFIX = "修复"
+ISSUE_ROW_PREFIX = "|#"
+
+
+class ReleaseRow:
+    """
+    a row of the markdown table in release issue body
+    """
+
+    def __init__(self, line):
+        self.line = line
+        self.parts = line.rstrip("\r\n").split("|")
+        first_cell = self.parts[1].strip() if len(self.parts) > 1 else ""
+        issue_res = ISSUE_ID_PATTERN.match(first_cell)
+        self.issue_id = issue_res["issue_id"] if issue_res else None
+        # rows of issue tables are keyed by issue id, rows of other tables by the first cell
+        self.key = self.issue_id or first_cell
+
+    def column(self, index):
+        """
+        get the cell of the row
+
+        Args:
+            index: index of column, starting from 0
+
+        Raises:
+            IndexError: the row has no such column
+
+        Returns:
+            str: cell content
+        """
+        return self.parts[index + 1]
+
+
+class ReleaseBlock:
+    """
+    a block of release issue body, from the title line to the line before the blank line
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.rows = dict()
+        self.counter_idx = None
+        self.table_head = []
+        self._index()
+
+    @property
+    def title(self):
+        """
+        title of block, like "## 1、CVE"
+        """
+        return self.lines[0].strip() if self.lines else ""
+
+    def _index(self):
+        """
+        index the counter line, the table head and the rows of block in one pass
+        """
+        self.rows.clear()
+        self.counter_idx = None
+        self.table_head = []
+        in_table_body = False
+        for idx, line in enumerate(self.lines[1:], 1):
+            if line.startswith(COUNTER_PREFIX):
+                self.counter_idx = idx
+            elif not line.startswith("|"):
+                continue
+            elif in_table_body:
+                self.rows.setdefault(ReleaseRow(line).key, idx)
+            elif TABLE_SEPARATOR_PATTERN.match(line):
+                in_table_body = True
+            else:
+                self.table_head = [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+    def row(self, key):
+        """
+        get row by issue id or by the first cell for tables without issue id
+
+        Args:
+            key: issue id or first cell
+
+        Returns:
+            ReleaseRow or None
+        """
+        idx = self.rows.get(key)
+        return ReleaseRow(self.lines[idx]) if idx is not None else None
+
+    def data_rows(self):
+        """
+        Returns:
+            list: all the rows in table body
+        """
+        return [ReleaseRow(self.lines[idx]) for idx in sorted(self.rows.values())]
+
+    def issue_ids(self):
+        """
+        Returns:
+            list: issue ids in table body
+        """
+        return [row.issue_id for row in self.data_rows() if row.issue_id]
+
+    def append(self, key, rows_str):
+        """
+        append rows to the table, rows already in the table are skipped
+
+        Args:
+            key: issue id of the rows
+            rows_str: md format rows like "|#I3AQ2G|krb5|已完成|\n"
+
+        Returns:
+            True if any row is appended
+        """
+        if key in self.rows:
+            logger.info("issue {} already exists in body content.".format(key))
+            return False
+
+        exist_lines = set(self.lines)
+        new_lines = [line for line in rows_str.splitlines(keepends=True) if line not in exist_lines]
+        for line in new_lines:
+            self.lines.append(line)
+            self.rows.setdefault(ReleaseRow(line).key, len(self.lines) - 1)
+        self.refresh_counter()
+        return bool(new_lines)
+
+    def delete(self, key):
+        """
+        delete the row of key
+
+        Args:
+            key: issue id or first cell
+
+        Returns:
+            True if the row is deleted
+        """
+        idx = self.rows.get(key)
+        if idx is None:
+            logger.info("The issue {} does not exist in release issue description.".format(key))
+            return False
+
+        self.lines.pop(idx)
+        self._index()
+        self.refresh_counter()
+        return True
+
+    def update(self, key, row_str):
+        """
+        replace the row of key
+
+        Args:
+            key: issue id or first cell
+            row_str: md format row
+
+        Returns:
+            True if the row is replaced
+        """
+        idx = self.rows.get(key)
+        if not row_str or idx is None:
+            return False
+
+        self.lines[idx] = row_str
+        self.refresh_counter()
+        return True
+
+    def replace(self, block_str):
+        """
+        replace the whole block
+
+        Args:
+            block_str: md format block str
+        """
+        self.lines[:] = block_str.splitlines(keepends=True)
+        self._index()
+        self.refresh_counter()
+
+    def refresh_counter(self):
+        """
+        refresh the number in counter line like "修复CVE xxx个" by the issue rows
+        """
+        if self.counter_idx is None:
+            return
+        count = sum(1 for line in self.lines if line.startswith(ISSUE_ROW_PREFIX))
+        self.lines[self.counter_idx] = COUNTER_DIGIT_PATTERN.sub(str(count), self.lines[self.counter_idx])
+
+
+class ReleaseBody:
+    """
+    document model of release issue body, it keeps every line of the body so that
+    the serialized markdown is the same as the parsed one until it is modified
+    """
+
+    def __init__(self, segments):
+        # segments are ReleaseBlock objects or lists of lines between blocks
+        self.segments = segments
+        self.blocks = [segment for segment in segments if isinstance(segment, ReleaseBlock)]
+        self.header = dict()
+        if segments and not isinstance(segments[0], ReleaseBlock):
+            self.header = self.parse_header(segments[0])
+
+    @classmethod
+    def parse(cls, body):
+        """
+        tokenize release issue body in one pass, a block starts at a markdown title
+        and ends before the blank line or the next title
+
+        Args:
+            body: release issue body str
+
+        Returns:
+            ReleaseBody
+        """
+        segments = []
+        text_lines = []
+        block_lines = None
+        for line in (body or "").splitlines(keepends=True):
+            if line.startswith("#"):
+                if block_lines is None and text_lines:
+                    segments.append(text_lines)
+                    text_lines = []
+                elif block_lines is not None:
+                    segments.append(ReleaseBlock(block_lines))
+                block_lines = [line]
+            elif block_lines is not None and line.strip():
+                block_lines.append(line)
+            else:
+                if block_lines is not None:
+                    segments.append(ReleaseBlock(block_lines))
+                    block_lines = None
+                text_lines.append(line)
+
+        if block_lines is not None:
+            segments.append(ReleaseBlock(block_lines))
+        elif text_lines:
+            segments.append(text_lines)
+        return cls(segments)
+
+    @staticmethod
+    def parse_header(lines):
+        """
+        parse header fields like "代码冻结：20210420"
+
+        Args:
+            lines: lines before the first block
+
+        Returns:
+            dict: field name and value, value is None when the line has no separator
+        """
+        fields = dict()
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            field = HEADER_FIELD_PATTERN.split(line, maxsplit=1)
+            fields.setdefault(field[0].strip(), field[1].strip() if len(field) > 1 else None)
+        return fields
+
+    def block(self, block_name):
+        """
+        get block by name
+
+        Args:
+            block_name: name of block, like "## 1、CVE" or "1、CVE"
+
+        Returns:
+            ReleaseBlock or None
+        """
+        for block in self.blocks:
+            if block_name.strip() in block.title:
+                return block
+        return None
+
+    def to_markdown(self):
+        """
+        serialize the document to markdown
+
+        Returns:
+            str: release issue body
+        """
+        lines = []
+        for segment in self.segments:
+            lines.extend(segment.lines if isinstance(segment, ReleaseBlock) else segment)
+        return "".join(lines)
+
+    __str__ = to_markdown
+
+
+class ReleaseBodyEdits:
+    """
+    edits of release issue body staged across blocks, they are applied in one pass
+    so that the body is parsed and serialized only once
+    """
+
+    def __init__(self):
+        self.edits = []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def append(self, block_name, key, rows_str):
+        """
+        stage appending rows to the table of block, see ReleaseBlock.append
+        """
+        self.edits.append((block_name, "append", (key, rows_str)))
+
+    def delete(self, block_name, key):
+        """
+        stage deleting the row of key from block, see ReleaseBlock.delete
+        """
+        self.edits.append((block_name, "delete", (key,)))
+
+    def update(self, block_name, key, row_str):
+        """
+        stage replacing the row of key in block, see ReleaseBlock.update
+        """
+        self.edits.append((block_name, "update", (key, row_str)))
+
+    def replace(self, block_name, block_str):
+        """
+        stage replacing the whole block, see ReleaseBlock.replace
+        """
+        self.edits.append((block_name, "replace", (block_str,)))
+
+    def apply(self, body):
+        """
+        apply the staged edits in order
+
+        Args:
+            body: release issue body str
+
+        Raises:
+            ValueError: the block of an edit does not exist in body
+
+        Returns:
+            str: new release issue body
+        """
+        release_body = ReleaseBody.parse(body)
+        for block_name, action, args in self.edits:
+            block = release_body.block(block_name)
+            if not block:
+                raise ValueError("can not find block {} in release issue body.".format(block_name))
+            getattr(block, action)(*args)
+        return release_body.to_markdown()
@@ -68,4 +68,76 @@ USER_AGENT_JSON = f'{LIBS_CONFIG_FOLDER}/user-agent.json'
 # gitee api config
 GITEE_API_CONFIG = f'{LIBS_CONFIG_FOLDER}/gitee_api_config.yaml'
 # gitee memebers id
-GITEE_OPENEULER_MEMBERS_ID_YAML = f'{LIBS_CONFIG_FOLDER}/oe_memebers_id.yaml'
\ No newline at end of file
+GITEE_OPENEULER_MEMBERS_ID_YAML = f'{LIBS_CONFIG_FOLDER}/oe_memebers_id.yaml'
+
+# pooled http session
+# number of per-host connection pools kept by the process-wide session
+HTTP_POOL_CONNECTIONS = int(os.getenv("JAVCRA_HTTP_POOL_CONNECTIONS", "10"))
+# max number of keep-alive connections kept for a single host
+HTTP_POOL_MAXSIZE = int(os.getenv("JAVCRA_HTTP_POOL_MAXSIZE", "20"))
+# whether to block when all connections of a host are in use
+HTTP_POOL_BLOCK = os.getenv("JAVCRA_HTTP_POOL_BLOCK", "true").lower() == "true"
+# max number of requests sent to the same host at the same time
+HTTP_HOST_CONCURRENCY = int(os.getenv("JAVCRA_HTTP_HOST_CONCURRENCY", "8"))
+# number of threads used to fetch a batch of gitee issues
+GITEE_BATCH_WORKERS = int(os.getenv("JAVCRA_GITEE_BATCH_WORKERS", "8"))
+# number of threads used to poll the jenkins builds which are due in the same tick
+JENKINS_WAIT_WORKERS = int(os.getenv("JAVCRA_JENKINS_WAIT_WORKERS", "8"))
+
+# repodata index of yum repos
+# folder to cache the package names parsed from repodata, the cache of a repo is
+# refreshed when the revision in its repomd.xml changes
+REPODATA_CACHE_DIR = os.getenv("JAVCRA_REPODATA_CACHE_DIR",
+                               os.path.join(os.path.expanduser("~"), ".cache", "javcra", "repodata"))
+# value of $basearch in the baseurl of repos
+REPODATA_BASEARCH = os.getenv("JAVCRA_REPODATA_BASEARCH", "aarch64")
+# timeout in seconds of downloading repodata
+REPODATA_TIMEOUT = int(os.getenv("JAVCRA_REPODATA_TIMEOUT", "60"))
+
+# bulk binary listing of obs projects
+# api url of obs, the apiurl in oscrc is used if it is empty, it can be a local server standing in for obs
+OBS_API_URL = os.getenv("JAVCRA_OBS_API_URL", "")
+# folder to cache the binary lists of obs projects
+OBS_BINARY_CACHE_DIR = os.getenv("JAVCRA_OBS_BINARY_CACHE_DIR",
+                                 os.path.join(os.path.expanduser("~"), ".cache", "javcra", "obs_binaries"))
+# seconds that a cached binary list is used before it is listed from obs again
+OBS_BINARY_CACHE_TTL = int(os.getenv("JAVCRA_OBS_BINARY_CACHE_TTL", "600"))
+# timeout in seconds of listing the binaries of an obs project
+OBS_BINARY_TIMEOUT = int(os.getenv("JAVCRA_OBS_BINARY_TIMEOUT", "120"))
+
+# shell commands
+# max number of shell commands like osc and dnf running at the same time
+SHELL_CMD_WORKERS = int(os.getenv("JAVCRA_SHELL_CMD_WORKERS", str(os.cpu_count() or 4)))
+# timeout in seconds of a shell command
+SHELL_CMD_TIMEOUT = int(os.getenv("JAVCRA_SHELL_CMD_TIMEOUT", "600"))
+# max bytes of the output of a shell command, the rest is dropped
+SHELL_CMD_MAX_OUTPUT = int(os.getenv("JAVCRA_SHELL_CMD_MAX_OUTPUT", str(64 * 1024 * 1024)))
+
+# spec version check of packages
+# number of threads used to download the spec files of packages
+SPEC_FETCH_WORKERS = int(os.getenv("JAVCRA_SPEC_FETCH_WORKERS", "8"))
+# timeout in seconds of downloading a spec file
+SPEC_FETCH_TIMEOUT = int(os.getenv("JAVCRA_SPEC_FETCH_TIMEOUT", "30"))
+# number of processes used to parse the spec files, 0 means parsing them in the calling process
+SPEC_PARSE_WORKERS = int(os.getenv("JAVCRA_SPEC_PARSE_WORKERS", str(os.cpu_count() or 4)))
+# json file to cache the versions parsed from specs between runs, empty means no cache on disk
+SPEC_CACHE_FILE = os.getenv("JAVCRA_SPEC_CACHE_FILE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "javcra", "spec_versions.json"))
+# max number of cached spec versions, the least recently used ones are dropped
+SPEC_CACHE_MAX_ENTRIES = int(os.getenv("JAVCRA_SPEC_CACHE_MAX_ENTRIES", "50000"))
+
+# iso build check of majun
+# timeout in seconds of reading the release_iso pointer of an arch on dailybuild
+ISO_PROBE_TIMEOUT = int(os.getenv("JAVCRA_ISO_PROBE_TIMEOUT", "30"))
+
+# callbacks to majun
+# sqlite database of the callbacks which are written before they are sent to majun
+MAJUN_OUTBOX_FILE = os.getenv("JAVCRA_MAJUN_OUTBOX_FILE",
+                              os.path.join(os.path.expanduser("~"), ".cache", "javcra", "majun_outbox.sqlite"))
+# timeout in seconds of sending callbacks to majun
+MAJUN_CALLBACK_TIMEOUT = int(os.getenv("JAVCRA_MAJUN_CALLBACK_TIMEOUT", "30"))
+# times to send a callback before it is dead, a dead callback is kept in the outbox but not sent again
+MAJUN_CALLBACK_MAX_ATTEMPTS = int(os.getenv("JAVCRA_MAJUN_CALLBACK_MAX_ATTEMPTS", "10"))
+# the delay before retrying a failed callback doubles from the min delay up to the max delay
+MAJUN_CALLBACK_MIN_DELAY = int(os.getenv("JAVCRA_MAJUN_CALLBACK_MIN_DELAY", "2"))
+MAJUN_CALLBACK_MAX_DELAY = int(os.getenv("JAVCRA_MAJUN_CALLBACK_MAX_DELAY", "600"))
@@ -14,6 +14,7 @@
 # ******************************************************************************/
 
 import subprocess
+from javcra.libs.config.global_config import SHELL_CMD_TIMEOUT
 from javcra.libs.log import logger
 
 
@@ -43,20 +44,22 @@ class ExecuteCmd(object):
         return ret.returncode
 
     @classmethod
-    def cmd_output(cls, command):
+    def cmd_output(cls, command, time_out=SHELL_CMD_TIMEOUT):
         """
         Execute the command and return the output
 
         Args:
             command: shell command to be executed
+            time_out: time out
 
         Returns:
             subprocess.check_output(xxx)
         """
         
         try:
-            subp = subprocess.check_output(command, shell=False, stderr=subprocess.STDOUT, encoding="utf-8")
+            subp = subprocess.check_output(command, shell=False, stderr=subprocess.STDOUT, encoding="utf-8",
+                                           timeout=time_out)
             return subp
-        except subprocess.CalledProcessError as err:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as err:
             logger.error(f"{command}:{err}")
             return None
\ No newline at end of file
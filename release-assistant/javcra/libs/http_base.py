@@ -15,13 +15,109 @@
 # Create: 2022-03-17
 # ******************************************************************************/
 
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.sessions import Session
 from retrying import retry
 from fake_useragent import UserAgent
 from javcra.libs.log import logger
 from javcra.libs.config import global_config
 
+_POOLED_SESSION = None
+_POOLED_SESSION_LOCK = threading.Lock()
+_HOST_SEMAPHORES = dict()
+_HOST_SEMAPHORES_LOCK = threading.Lock()
+
+
+def get_pooled_session(pool_connections=None, pool_maxsize=None, pool_block=None):
+    """
+    get the process-wide keep-alive session, the session is created on the first call
+    and the pool settings of later calls are ignored until reset_pooled_session is called
+
+    Args:
+        pool_connections: number of per-host connection pools to cache
+        pool_maxsize: max number of connections kept for a single host
+        pool_block: whether to block when all connections of a host are in use
+
+    Returns:
+        session: requests session shared by the whole process
+    """
+    global _POOLED_SESSION
+    if _POOLED_SESSION is not None:
+        return _POOLED_SESSION
+
+    with _POOLED_SESSION_LOCK:
+        if _POOLED_SESSION is None:
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections or global_config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize or global_config.HTTP_POOL_MAXSIZE,
+                pool_block=global_config.HTTP_POOL_BLOCK if pool_block is None else pool_block,
+            )
+            session = Session()
+            session.headers.update({"Connection": "keep-alive"})
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _POOLED_SESSION = session
+    return _POOLED_SESSION
+
+
+def reset_pooled_session():
+    """
+    close the process-wide session, the next get_pooled_session call creates a new one
+    """
+    global _POOLED_SESSION
+    with _POOLED_SESSION_LOCK:
+        if _POOLED_SESSION is not None:
+            _POOLED_SESSION.close()
+        _POOLED_SESSION = None
+
+
+def pooled_session_stats():
+    """
+    count the connections of the process-wide session
+
+    Returns:
+        dict: like {"opened": 2, "reused": 30, "requests": 32}
+    """
+    stats = {"opened": 0, "reused": 0, "requests": 0}
+    if _POOLED_SESSION is None:
+        return stats
+
+    adapters = {id(adapter): adapter for adapter in _POOLED_SESSION.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            stats["opened"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+    stats["reused"] = max(stats["requests"] - stats["opened"], 0)
+    return stats
+
+
+@contextmanager
+def host_slot(url):
+    """
+    hold one of the request slots of the host of url, at most HTTP_HOST_CONCURRENCY
+    requests of the process are sent to the same host at the same time
+
+    Args:
+        url: request url
+    """
+    host = urlparse(url).netloc
+    with _HOST_SEMAPHORES_LOCK:
+        semaphore = _HOST_SEMAPHORES.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(global_config.HTTP_HOST_CONCURRENCY)
+            _HOST_SEMAPHORES[host] = semaphore
+    with semaphore:
+        yield
+
 
 class http:
     """
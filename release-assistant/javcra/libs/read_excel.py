@@ -76,13 +76,15 @@ def download_file(now_time, file_name, obs_ak, obs_sk):
     try:
         obs_client = ObsCloud(obs_ak, obs_sk, CVE_MANAGE_SERVER, CVE_MANAGE_BUCKET_NAME)
         # Determine whether the file to be downloaded is in the object of the bucket
-        files = obs_client.bucket_list("{}/{}".format(CVE_UPDATE_INFO, now_time))
-        logger.info(f"The current files on the cloud are {files}")
+        object_key = "{CVE_UPDATE_INFO}/{date}/{title}".format(
+            CVE_UPDATE_INFO=CVE_UPDATE_INFO, date=now_time, title=file_name)
         file_object = ""
-        for file in files:
-            if "{CVE_UPDATE_INFO}/{date}/{title}".format(
-                    CVE_UPDATE_INFO=CVE_UPDATE_INFO, date=now_time, title=file_name) == file:
+        # only the objects starting with the key of the file are listed
+        for file in obs_client.iter_objects(object_key):
+            if object_key == file:
                 file_object = file
+                break
+        logger.info(f"The file to be downloaded on the cloud is {file_object}")
         if not file_object:
             logger.error("The object does not exist in the bucket")
             return []
@@ -13,14 +13,20 @@
 """
 The test base class contains some public methods
 """
+import os
 import sys
+import shutil
+import tempfile
 import argparse
 import json
+import subprocess
 import unittest
 from unittest.mock import PropertyMock
-from io import StringIO
+from io import BytesIO, StringIO
 from unittest import mock
 from pathlib import Path
+from javcra.application.checkpart.check_requires.obs_binary_api import reset_obs_binary_table
+from javcra.application.checkpart.check_requires.shell_api_tool import reset_command_runner
 from javcra.cli.base import BaseCommand
 import requests
 
@@ -36,6 +42,35 @@ class MakeObject(object):
         self.__dict__.update(dict_)
 
 
+class MockPopen(object):
+    """
+    Popen whose output is the return value of the mocked subprocess.check_output,
+    so that the commands run by Popen and by check_output share the mocked outputs
+    """
+
+    def __init__(self, args, stdout=None, stderr=None, **kwargs):
+        self.args = args
+        self.returncode = None
+        try:
+            output = subprocess.check_output(args, stderr=stderr, **kwargs)
+            self._exit_code = 0
+        except subprocess.CalledProcessError as error:
+            output = error.output
+            self._exit_code = error.returncode
+        if isinstance(output, str):
+            output = output.encode("utf-8")
+        self.stdout = BytesIO(output or b"")
+
+    def kill(self):
+        """kill"""
+        self._exit_code = -9
+
+    def wait(self, timeout=None):
+        """wait"""
+        self.returncode = self._exit_code
+        return self.returncode
+
+
 def dict_2_object(content):
     """
     dict to object
@@ -135,6 +170,29 @@ class TestMixin(TestBase):
     The base class that sends HTTP requests
     """
 
+    def setUp(self) -> None:
+        super().setUp()
+        # repodata and obs binaries are not downloaded unless the test mocks them, the packages
+        # are classified by the mocked dnf and osc, and they are cached in a temporary folder
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self._create_patch("javcra.application.checkpart.check_requires.repodata_api.REPODATA_CACHE_DIR",
+                           new=os.path.join(self.cache_dir, "repodata"))
+        self._create_patch("javcra.libs.config.global_config.OBS_BINARY_CACHE_DIR",
+                           new=os.path.join(self.cache_dir, "obs_binaries"))
+        reset_obs_binary_table()
+        # the callbacks to majun are kept in a temporary outbox, which is not drained again at exit
+        self._create_patch("javcra.libs.config.global_config.MAJUN_OUTBOX_FILE",
+                           new=os.path.join(self.cache_dir, "majun_outbox.sqlite"))
+        self._create_patch("javcra.application.majun.drain_at_exit")
+        self._create_patch("javcra.libs.config.global_config.SPEC_CACHE_FILE",
+                           new=os.path.join(self.cache_dir, "spec_versions.json"))
+        # the mocked commands return their outputs in the order they are called, so they run one by one
+        self._create_patch("javcra.libs.config.global_config.SHELL_CMD_WORKERS", new=1)
+        reset_command_runner()
+        self.mock_repodata_fetch(return_value=None)
+        self.mock_obs_binary_fetch(return_value=None)
+
     def client_request(self, url=None, method="GET", data=None):
         """
         Send the HTTP request and return the response
@@ -286,7 +344,7 @@ class TestMixin(TestBase):
     def mock_request(self, **kwargs):
         """mock_request"""
         self._to_update_kw_and_make_mock(
-            "requests.request",
+            "requests.Session.request",
             **kwargs,
         )
 
@@ -318,6 +376,13 @@ class TestMixin(TestBase):
             **kwargs,
         )
 
+    def mock_obs_cloud_get_object_metadata(self, **kwargs):
+        """mock_obs_cloud_getObjectMetadata"""
+        self._to_update_kw_and_make_mock(
+            "obs.ObsClient.getObjectMetadata",
+            **kwargs,
+        )
+
     def mock_obs_cloud_head_bucket(self, **kwargs):
         """mock_obs_cloud_headBucket"""
         self._to_update_kw_and_make_mock(
@@ -332,6 +397,13 @@ class TestMixin(TestBase):
             **kwargs,
         )
 
+    def mock_obs_cloud_delete_objects(self, **kwargs):
+        """mock_obs_cloud_deleteObjects"""
+        self._to_update_kw_and_make_mock(
+            "obs.ObsClient.deleteObjects",
+            **kwargs,
+        )
+
     def mock_obs_cloud_put_file(self, **kwargs):
         """mock_obs_cloud_putFile"""
         self._to_update_kw_and_make_mock(
@@ -381,6 +453,13 @@ class TestMixin(TestBase):
             **kwargs,
         )
 
+    def mock_jenkins_jenkins_request(self, **kwargs):
+        """mock_jenkins_jenkins_request"""
+        self._to_update_kw_and_make_mock(
+            "jenkins.Jenkins.jenkins_request",
+            **kwargs,
+        )
+
     def mock_jenkins_get_queue_item(self, **kwargs):
         """mock_jenkins_get_queue_item"""
         self._to_update_kw_and_make_mock(
@@ -424,11 +503,26 @@ class TestMixin(TestBase):
         )
 
     def mock_subprocess_check_output(self, **kwargs):
-        """mock_subprocess_check_output"""
+        """mock_subprocess_check_output, the commands run by Popen get the same outputs"""
         self._to_update_kw_and_make_mock(
             "subprocess.check_output",
             **kwargs,
         )
+        self._create_patch("subprocess.Popen", new=MockPopen)
+
+    def mock_repodata_fetch(self, **kwargs):
+        """mock_repodata_fetch"""
+        self._to_update_kw_and_make_mock(
+            "javcra.application.checkpart.check_requires.repodata_api.RepodataIndex.fetch",
+            **kwargs,
+        )
+
+    def mock_obs_binary_fetch(self, **kwargs):
+        """mock_obs_binary_fetch"""
+        self._to_update_kw_and_make_mock(
+            "javcra.application.checkpart.check_requires.obs_binary_api.ObsBinaryTable.fetch",
+            **kwargs,
+        )
 
     def mock_osc_call_subprocess(self, **kwargs):
         """mock_osc_call_subprocess"""
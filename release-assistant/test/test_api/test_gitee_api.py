@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestIssue
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from requests import ConnectionError as RequestsConnectionError
+
+from test.base.basetest import TestMixin
+from javcra.api.gitee_api import Issue
+from javcra.application.modifypart.modifyentrance import IssueOperation
+from javcra.common.release_body import ReleaseBodyEdits
+from javcra.libs.http_base import get_pooled_session, pooled_session_stats, reset_pooled_session
+
+CVE_ROW = "|#I3V9IG|mariadb|已完成|9.0|10.3.9|否|\n"
+NEW_CVE_ROW = "|#I41R53|krb5|已完成|7.5|1.18.2|否|\n"
+BUGFIX_ROW = "|#I3AQ2G|kernel|已完成|\n"
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    http/1.1 handler answering every GET with an empty json, the connection is kept open
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestIssue(TestMixin):
+    """
+    class for test Issue
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.issue = Issue("openeuler", "token", "I42WFW")
+        self.issue_info = self.read_file_content("releasepart.txt")
+        self.requests = []
+
+    def gitee_server(self, *bodies):
+        """
+        mock gitee server, the GET requests return the issue with the bodies in order,
+        the PATCH requests are recorded
+        """
+        bodies = list(bodies)
+
+        def request(method, url, params=None, data=None, headers=None):
+            self.requests.append((method, data))
+            if method == "get":
+                return self.make_object_data(200, json.dumps(dict(self.issue_info, body=bodies.pop(0))))
+            return self.make_object_data(200, json.dumps(dict(self.issue_info, body=data["body"])))
+
+        self.mock_request(side_effect=request)
+
+    def test_commit_body_edits(self):
+        """
+        test the edits are applied on the body read right before the update
+        """
+        base_body = self.issue_info["body"]
+        self.gitee_server(base_body)
+        edits = ReleaseBodyEdits()
+        edits.append("1、CVE", "I41R53", NEW_CVE_ROW)
+
+        self.assertTrue(self.issue.commit_body_edits(edits, base_body))
+        self.assertEqual(["get", "patch"], [method for method, _ in self.requests])
+        new_body = self.requests[-1][1]["body"]
+        self.assertIn(CVE_ROW + NEW_CVE_ROW, new_body)
+        self.assertIn("修复CVE 2个", new_body)
+
+    def test_commit_body_edits_conflict(self):
+        """
+        test the body changed by others after base_body was read is kept
+        """
+        base_body = self.issue_info["body"]
+        latest_body = base_body.replace("|issue|仓库|status|\n|-|-|-|\n", "|issue|仓库|status|\n|-|-|-|\n" + BUGFIX_ROW, 1)
+        self.gitee_server(latest_body)
+        edits = ReleaseBodyEdits()
+        edits.delete("1、CVE", "I3V9IG")
+
+        self.assertTrue(self.issue.commit_body_edits(edits, base_body))
+        new_body = self.requests[-1][1]["body"]
+        self.assertNotIn(CVE_ROW, new_body)
+        self.assertIn("修复CVE 0个", new_body)
+        self.assertIn(BUGFIX_ROW, new_body)
+
+    def test_commit_body_edits_refetch_after_cached(self):
+        """
+        test the cached release issue is not used as the base of the update
+        """
+        base_body = self.issue_info["body"]
+        latest_body = base_body.replace("|#I3SZRJ|qemu|遗留|自定义|\n", "")
+        self.gitee_server(base_body, latest_body)
+        self.assertEqual(base_body, self.issue.get_issue_body("I42WFW"))
+        edits = ReleaseBodyEdits()
+        edits.append("1、CVE", "I41R53", NEW_CVE_ROW)
+
+        self.assertTrue(self.issue.commit_body_edits(edits, base_body))
+        self.assertEqual(["get", "get", "patch"], [method for method, _ in self.requests])
+        self.assertNotIn("I3SZRJ", self.requests[-1][1]["body"])
+
+    def test_commit_body_edits_nothing(self):
+        """
+        test no request is sent when there is no edit
+        """
+        self.gitee_server()
+        self.assertTrue(self.issue.commit_body_edits(ReleaseBodyEdits(), self.issue_info["body"]))
+        self.assertEqual([], self.requests)
+
+    def test_commit_body_edits_missing_block(self):
+        """
+        test the edit of a block removed from the latest body raises ValueError and nothing is updated
+        """
+        base_body = self.issue_info["body"]
+        self.gitee_server(base_body.split("## 3、requires")[0])
+        edits = ReleaseBodyEdits()
+        edits.append("3、requires", "openssl", "|openssl|升级|\n")
+
+        self.assertRaises(ValueError, self.issue.commit_body_edits, edits, base_body)
+        self.assertEqual(["get"], [method for method, _ in self.requests])
+
+    def test_batch_issue_request(self):
+        """
+        test the results keep the order of issues whatever order they finish in, and
+        the empty results and the errors are reported as failed
+        """
+        def handler(issue_number):
+            # the first issues finish last
+            time.sleep(0.01 * (6 - int(issue_number[1:])))
+            if issue_number == "I2":
+                raise RequestsConnectionError("reset")
+            if issue_number == "I4":
+                return {}
+            return {"number": issue_number}
+
+        issue_numbers = ["I1", "I2", "I3", "I4", "I5"]
+        batch = Issue.batch_issue_request(issue_numbers, handler, max_workers=5)
+
+        self.assertEqual([{"number": "I1"}, None, {"number": "I3"}, None, {"number": "I5"}], batch.results)
+        self.assertEqual(["I2", "I4"], batch.failed)
+        sequential = Issue.batch_issue_request(issue_numbers, handler, max_workers=1)
+        self.assertEqual(batch, sequential)
+        self.assertEqual(([], []), tuple(Issue.batch_issue_request([], handler)))
+
+    def test_count_issue_status_failed_issue(self):
+        """
+        test the issues are not counted as completed when the status of an issue can not be read
+        """
+        issue_operation = IssueOperation("openeuler", "token", "I42WFW")
+        body = self.issue_info["body"].replace("|issue|仓库|status|\n|-|-|-|\n", "|issue|仓库|status|\n|-|-|-|\n" + BUGFIX_ROW, 1)
+        issues = {"I42WFW": dict(self.issue_info, body=body), "I3AQ2G": None}
+        with mock.patch.object(IssueOperation, "get_issue_info", side_effect=lambda number, owner=None: issues[number]):
+            self.assertFalse(issue_operation.count_issue_status())
+            issues["I3AQ2G"] = {"issue_state": "已完成"}
+            self.assertTrue(issue_operation.count_issue_status())
+
+    def test_gitee_requests_share_pooled_session(self):
+        """
+        test the requests of different issues are sent by one session and reuse its connection
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        reset_pooled_session()
+        self.addCleanup(reset_pooled_session)
+        url = "http://127.0.0.1:%s/api/v5/repos/openeuler/issues" % server.server_port
+
+        session = get_pooled_session()
+        with mock.patch.object(session, "request", wraps=session.request) as request:
+            self.assertIsNotNone(Issue("openeuler", "token", "I42WFW").gitee_api_request("get", url))
+            self.assertIsNotNone(Issue("openeuler", "token", "I3AQ2G").gitee_api_request("get", url))
+
+        self.assertEqual(2, request.call_count)
+        self.assertIs(session, get_pooled_session())
+        self.assertEqual({"opened": 1, "reused": 1, "requests": 2}, pooled_session_stats())
+
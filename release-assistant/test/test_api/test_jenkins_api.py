@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestJenkinsJob
+"""
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+import jenkins
+
+from test.base.basetest import TestMixin
+from javcra.api.jenkins_api import JenkinsJob, get_config_hash
+from javcra.common.constant import AARCH64_TM_JOB, TRIGGER_TM_JOB, X86_TM_JOB
+
+BASE_PATH = "function-item/release-manager/release_tools/openEuler-22.03-LTS"
+TRIGGER_JOB = BASE_PATH + "/trigger"
+AARCH64_JOBS = [BASE_PATH + "/aarch64/selfbuild_1", BASE_PATH + "/aarch64/selfbuild_2"]
+X86_JOBS = [BASE_PATH + "/x86_64/selfbuild_1", BASE_PATH + "/x86_64/selfbuild_2"]
+TRIGGER_TEMPLATE = "<project><definition><script>node {\nparallel(\n)\n}</script></definition></project>"
+PARAL_TEMPLATE = "<project><assignedNode>k8s</assignedNode><properties>" \
+                 "<hudson.model.ParametersDefinitionProperty><parameterDefinitions>" \
+                 "<hudson.model.StringParameterDefinition><name>PKG_NAME</name><defaultValue/>" \
+                 "</hudson.model.StringParameterDefinition>" \
+                 "</parameterDefinitions></hudson.model.ParametersDefinitionProperty></properties></project>"
+
+
+class FakeJenkinsServer:
+    """
+    jenkins server keeping the jobs in memory, a folder is a job without config
+    """
+
+    def __init__(self, jobs):
+        self.jobs = dict(jobs)
+        self.created = []
+        self.reconfigured = []
+        self.deleted = []
+
+    def create_folder(self, folder_name, ignore_failures=False):
+        self.jobs.setdefault(folder_name, None)
+
+    def job_exists(self, name):
+        return name in self.jobs
+
+    def get_job_info(self, name):
+        if name not in self.jobs:
+            raise jenkins.JenkinsException("job[%s] does not exist" % name)
+        children = {job[len(name) + 1:].split("/")[0] for job in self.jobs if job.startswith(name + "/")}
+        return {"jobs": [{"name": child} for child in sorted(children)]}
+
+    def get_job_config(self, name):
+        return self.jobs[name]
+
+    def create_job(self, name, config_xml):
+        self.created.append(name)
+        self.jobs[name] = config_xml
+
+    def reconfig_job(self, name, config_xml):
+        self.reconfigured.append(name)
+        self.jobs[name] = config_xml
+
+    def delete_job(self, name):
+        self.deleted.append(name)
+        for job in [job for job in self.jobs if job == name or job.startswith(name + "/")]:
+            del self.jobs[job]
+
+
+class TestJenkinsJob(TestMixin):
+    """
+    class for test JenkinsJob
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.jenkins = JenkinsJob("https://jenkins.example.com/", "mary", "marykey", 2,
+                                   "openEuler-22.03-LTS", "20221013")
+        patcher = mock.patch("javcra.api.jenkins_api.time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_progressive_text(self, text, start, more_data):
+        """
+        response of the progressive text api
+        """
+        resp = self.make_object_data(200, text)
+        resp.headers = {"X-Text-Size": str(start + len(text.encode("utf-8")))}
+        if more_data:
+            resp.headers["X-More-Data"] = "true"
+        return resp
+
+    def test_get_selfbuild_job_comment(self):
+        """
+        test the parallel builds are read from the progressive console output of trigger,
+        a line split by two reads is joined
+        """
+        first = "Started by user mary\nStarting building: function-item » release-manager » " \
+                "openeuler-20221013 » aarch64 » 1-2 #14\nStarting build"
+        second = "ing: function-item » release-manager » openeuler-20221013 » x86 » 1-2 #15\nFinished: SUCCESS\n"
+        self.mock_jenkins_jenkins_request(side_effect=[
+            self.make_progressive_text("", 0, True),
+            self.make_progressive_text(first, 0, True),
+            self.make_progressive_text(second, len(first.encode("utf-8")), False),
+        ])
+        self.mock_jenkins_get_build_info(side_effect=lambda job_name, build_id: {
+            "result": "FAILURE" if job_name.endswith("x86/1-2") else "SUCCESS"})
+        with mock.patch.object(JenkinsJob, "build_specific_job", return_value=7) as build_specific_job:
+            job_status_list = self.jenkins.get_selfbuild_job_comment()
+        build_specific_job.assert_called_once_with(TRIGGER_JOB)
+
+        self.assertEqual(
+            [("function-item/release-manager/openeuler-20221013/aarch64/1-2", "SUCCESS"),
+             ("function-item/release-manager/openeuler-20221013/x86/1-2", "FAILURE")],
+            [(job_status["name"], job_status["status"]) for job_status in job_status_list],
+        )
+        requests = [call.args[0] for call in self.jenkins.server.jenkins_request.call_args_list]
+        self.assertTrue(requests[0].url.endswith("/job/trigger/7/logText/progressiveText"))
+        self.assertEqual([0, 0, len(first.encode("utf-8"))], [request.params["start"] for request in requests])
+
+    def test_get_selfbuild_job_comment_completed_in_console(self):
+        """
+        test the results written by trigger when the parallel builds complete are taken without a poll
+        """
+        text = "Starting building: function-item » release-manager » openeuler-20221013 » aarch64 » 1-2 #14\n" \
+               "Starting building: function-item » release-manager » openeuler-20221013 » x86 » 1-2 #15\n" \
+               "Build function-item » release-manager » openeuler-20221013 » aarch64 » 1-2 #14 completed: FAILURE\n" \
+               "Build function-item » release-manager » openeuler-20221013 » x86 » 1-2 #15 completed: SUCCESS\n" \
+               "Finished: SUCCESS\n"
+        self.mock_jenkins_jenkins_request(return_value=self.make_progressive_text(text, 0, False))
+        self.mock_jenkins_get_build_info(return_value={"result": "SUCCESS"})
+        with mock.patch.object(JenkinsJob, "build_specific_job", return_value=7):
+            job_status_list = self.jenkins.get_selfbuild_job_comment()
+
+        self.assertEqual(["FAILURE", "SUCCESS"], [job_status["status"] for job_status in job_status_list])
+        # only the trigger is polled
+        self.jenkins.server.get_build_info.assert_called_once_with(TRIGGER_JOB, 7)
+
+    def test_get_selfbuild_job_comment_without_trigger(self):
+        """
+        test no job is built when there is no trigger job
+        """
+        with mock.patch.object(JenkinsJob, "get_jobs_to_create", return_value=[]), \
+                mock.patch.object(JenkinsJob, "build_specific_job") as build_specific_job:
+            self.assertEqual([], self.jenkins.get_selfbuild_job_comment())
+        build_specific_job.assert_not_called()
+
+    def test_console_lines_timeout(self):
+        """
+        test the console output of a build which never finishes is read until the timeout
+        """
+        self.mock_jenkins_jenkins_request(return_value=self.make_progressive_text("still running\n", 0, True))
+        lines = list(self.jenkins.iter_console_lines("trigger", 7, timeout=0))
+        self.assertEqual(["still running"], lines)
+        self.sleep.assert_not_called()
+
+    def test_get_template_config(self):
+        """
+        test the template config is downloaded and parsed once for all the jobs created from it
+        """
+        self.mock_jenkins_job_exists(return_value=True)
+        self.mock_jenkins_get_job_config(return_value="<?xml version='1.1' encoding='UTF-8'?>\n"
+                                                      "<project><description>trigger</description></project>")
+        root = self.jenkins.get_template_config("trigger_template")
+        self.assertIs(root, self.jenkins.get_template_config("trigger_template"))
+        self.assertEqual("trigger", root.find("description").text)
+        self.jenkins.server.get_job_config.assert_called_once_with("trigger_template")
+
+    def test_get_template_config_not_found(self):
+        """
+        test a missing template job raises NotFoundException and is not cached
+        """
+        self.mock_jenkins_job_exists(side_effect=[False, True])
+        self.mock_jenkins_get_job_config(return_value="<project/>")
+        self.assertRaises(jenkins.NotFoundException, self.jenkins.get_template_config, "trigger_template")
+        self.assertEqual("project", self.jenkins.get_template_config("trigger_template").tag)
+
+    def new_server(self, jobs):
+        """
+        in-memory jenkins server with the template jobs and jobs
+        """
+        templates = {TRIGGER_TM_JOB: TRIGGER_TEMPLATE, AARCH64_TM_JOB: PARAL_TEMPLATE, X86_TM_JOB: PARAL_TEMPLATE}
+        self.jenkins.server = FakeJenkinsServer(dict(templates, **jobs))
+        return self.jenkins.server
+
+    def desired_config(self, job, packages):
+        """
+        config of job created from its template, with the xml declaration written by jenkins
+        """
+        template_xml = TRIGGER_TEMPLATE if job.endswith("/trigger") else PARAL_TEMPLATE
+        config_xml = self.jenkins.update_config(job, ET.fromstring(template_xml), packages)
+        return "<?xml version='1.1' encoding='UTF-8'?>\n" + config_xml
+
+    def existing_jobs(self, packages):
+        """
+        jobs left by an earlier run with more parallel jobs, aarch64/selfbuild_2 builds other packages
+        """
+        return {
+            BASE_PATH: None,
+            BASE_PATH + "/aarch64": None,
+            BASE_PATH + "/x86_64": None,
+            TRIGGER_JOB: self.desired_config(TRIGGER_JOB, packages),
+            AARCH64_JOBS[0]: self.desired_config(AARCH64_JOBS[0], packages),
+            AARCH64_JOBS[1]: self.desired_config(AARCH64_JOBS[1], ["zlib", "vim"]),
+            BASE_PATH + "/aarch64/selfbuild_3": PARAL_TEMPLATE,
+        }
+
+    def test_create_selfbuild_jobs_reconcile(self):
+        """
+        test the jobs up to date are not touched, the changed ones are reconfigured, the missing ones
+        are created and the self-build jobs beyond the parallel number are deleted
+        """
+        packages = ["vim", "gcc", "zlib"]
+        server = self.new_server(self.existing_jobs(packages))
+        self.assertTrue(self.jenkins.create_selfbuild_jenkins_jobs(packages))
+
+        self.assertEqual(X86_JOBS, sorted(server.created))
+        self.assertEqual([AARCH64_JOBS[1]], server.reconfigured)
+        self.assertEqual([BASE_PATH + "/aarch64/selfbuild_3"], server.deleted)
+        self.assertEqual(get_config_hash(self.desired_config(AARCH64_JOBS[1], packages)),
+                         get_config_hash(server.jobs[AARCH64_JOBS[1]]))
+        # the arch folders in the folder of trigger are not self-build jobs
+        self.assertIn(BASE_PATH + "/aarch64", server.jobs)
+        self.assertIn(BASE_PATH + "/x86_64", server.jobs)
+
+    def test_create_selfbuild_jobs_without_reconcile(self):
+        """
+        test the folder of the branch is deleted and all the jobs are created again
+        """
+        packages = ["vim", "gcc", "zlib"]
+        server = self.new_server(self.existing_jobs(packages))
+        self.assertTrue(self.jenkins.create_selfbuild_jenkins_jobs(packages, reconcile=False))
+
+        self.assertEqual([BASE_PATH], server.deleted)
+        self.assertEqual(sorted([TRIGGER_JOB] + AARCH64_JOBS + X86_JOBS), sorted(server.created))
+        self.assertEqual([], server.reconfigured)
+        self.assertNotIn(BASE_PATH + "/aarch64/selfbuild_3", server.jobs)
+
+    def test_get_folder_jobs(self):
+        """
+        test a missing folder has no job and the error of reading an existing folder is raised
+        """
+        server = self.new_server(self.existing_jobs(["vim", "gcc"]))
+        self.assertEqual({TRIGGER_JOB, BASE_PATH + "/aarch64", BASE_PATH + "/x86_64"},
+                         self.jenkins.get_folder_jobs(BASE_PATH))
+        self.assertEqual(set(), self.jenkins.get_folder_jobs(BASE_PATH + "/riscv64"))
+
+        server.get_job_info = mock.Mock(side_effect=jenkins.JenkinsException("Server Error"))
+        self.assertRaises(jenkins.JenkinsException, self.jenkins.get_folder_jobs, BASE_PATH)
+        # the existing jobs are not taken as missing ones
+        self.assertFalse(self.jenkins.create_selfbuild_jenkins_jobs(["vim"]))
+        self.assertEqual([], server.created)
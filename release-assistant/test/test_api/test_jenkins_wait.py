@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestBackoffPolicy, TestBuildWaiter
+"""
+import threading
+from unittest import mock
+
+import jenkins
+from requests import ConnectionError as RequestsConnectionError
+
+from test.base.basetest import TestMixin
+from javcra.api.jenkins_wait import BackoffPolicy, BuildWaiter, BUILD_TIMEOUT_RESULT
+
+
+class TestBackoffPolicy(TestMixin):
+    """
+    class for test BackoffPolicy
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.policy = BackoffPolicy(min_delay=10, max_delay=300, factor=2, jitter=0, estimate_ratio=0.5)
+
+    def test_before_estimated(self):
+        """
+        test the delay is a ratio of the remaining time before the estimated duration
+        """
+        self.assertEqual(100, self.policy.next_delay(400, estimated=600))
+        self.assertEqual(10, self.policy.next_delay(595, estimated=600))
+        self.assertEqual(300, self.policy.next_delay(0, estimated=6000))
+
+    def test_exponential_after_estimated(self):
+        """
+        test the delay grows from min delay to max delay after the estimated duration or without it
+        """
+        delays = [self.policy.next_delay(700, estimated=600, overdue_polls=polls) for polls in range(7)]
+        self.assertEqual([10, 20, 40, 80, 160, 300, 300], delays)
+        self.assertEqual(40, self.policy.next_delay(5, overdue_polls=2))
+
+    def test_jitter(self):
+        """
+        test the jitter spreads the delay but never exceeds max delay
+        """
+        policy = BackoffPolicy(min_delay=10, max_delay=300, factor=2, jitter=0.2)
+        for _ in range(100):
+            self.assertTrue(8 <= policy.next_delay(0, overdue_polls=1) <= 24)
+            self.assertTrue(240 <= policy.next_delay(0, overdue_polls=10) <= 300)
+
+    def test_max_delay_not_below_min_delay(self):
+        """
+        test max delay is raised to min delay
+        """
+        policy = BackoffPolicy(min_delay=10, max_delay=5, jitter=0)
+        self.assertEqual(10, policy.next_delay(0))
+
+
+class TestBuildWaiter(TestMixin):
+    """
+    class for test BuildWaiter
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.server = mock.Mock()
+        self.completed = []
+        self.policy = BackoffPolicy(min_delay=0.01, max_delay=0.02, jitter=0)
+
+    def new_waiter(self, timeout=None):
+        """
+        waiter of the mocked server which records the completed builds
+        """
+        return BuildWaiter(self.server, policy=self.policy, timeout=timeout, max_workers=2,
+                           on_complete=lambda job_name, build_id, result: self.completed.append(
+                               (job_name, build_id, result)))
+
+    def test_complete_by_poll(self):
+        """
+        test the builds finish when the polls return the results
+        """
+        polls = {("aarch64", 14): [{"result": None}, {"result": None}, {"result": "SUCCESS"}],
+                 ("x86", 15): [{"result": None, "estimatedDuration": 10}, {"result": "FAILURE"}],
+                 ("riscv", 16): [{"result": "ABORTED"}]}
+        self.server.get_build_info.side_effect = lambda job_name, build_id: polls[(job_name, build_id)].pop(0)
+        waiter = self.new_waiter()
+        for job_name, build_id in polls:
+            waiter.watch(job_name, str(build_id))
+        waiter.watch("aarch64", 14)
+
+        self.assertEqual({("aarch64", 14): "SUCCESS", ("x86", 15): "FAILURE", ("riscv", 16): "ABORTED"},
+                         waiter.wait())
+        self.assertEqual(6, self.server.get_build_info.call_count)
+        self.assertEqual(("riscv", 16, "ABORTED"), self.completed[0])
+        self.assertEqual(3, len(self.completed))
+
+    def test_complete_by_notify(self):
+        """
+        test a notified build finishes without a poll, the result of a build not watched is dropped
+        """
+        self.server.get_build_info.return_value = {"result": None}
+        waiter = self.new_waiter()
+        waiter.watch("aarch64", 14)
+        waiter.notify("x86", 15, "SUCCESS")
+        self.assertEqual(1, waiter.poll())
+
+        waiter.notify("aarch64", "14", "FAILURE")
+        self.assertEqual({("aarch64", 14): "FAILURE"}, waiter.wait())
+        self.assertEqual(1, self.server.get_build_info.call_count)
+
+    def test_notify_wakes_up_wait(self):
+        """
+        test the waiting loop wakes up at once when a result is notified
+        """
+        self.policy = BackoffPolicy(min_delay=60, max_delay=60, jitter=0)
+        self.server.get_build_info.return_value = {"result": None}
+        waiter = self.new_waiter(timeout=30)
+        waiter.watch("aarch64", 14)
+        timer = threading.Timer(0.05, waiter.notify, ("aarch64", 14, "SUCCESS"))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertEqual({("aarch64", 14): "SUCCESS"}, waiter.wait())
+
+    def test_poll_error(self):
+        """
+        test the error of polling one build does not stop waiting for the others
+        """
+        polls = {("aarch64", 14): [jenkins.JenkinsException("Server Error"), RequestsConnectionError("reset"),
+                                   {"result": "SUCCESS"}],
+                 ("x86", 15): [{"result": "FAILURE"}]}
+
+        def get_build_info(job_name, build_id):
+            result = polls[(job_name, build_id)].pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.server.get_build_info.side_effect = get_build_info
+        waiter = self.new_waiter()
+        waiter.watch("aarch64", 14)
+        waiter.watch("x86", 15)
+
+        self.assertEqual({("aarch64", 14): "SUCCESS", ("x86", 15): "FAILURE"}, waiter.wait())
+
+    def test_timeout(self):
+        """
+        test the builds still building at the timeout get the timeout result
+        """
+        self.server.get_build_info.return_value = {"result": None}
+        waiter = self.new_waiter(timeout=0.05)
+        waiter.watch("aarch64", 14)
+
+        self.assertEqual({("aarch64", 14): BUILD_TIMEOUT_RESULT}, waiter.wait())
+        self.assertEqual([("aarch64", 14, BUILD_TIMEOUT_RESULT)], self.completed)
@@ -0,0 +1,291 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestObsCloud
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from test.base.basetest import TestMixin
+from javcra.api.obscloud import ObsCloud, ResultLogIndex, file_md5
+
+
+class TestObsCloud(TestMixin):
+    """
+    class for test ObsCloud
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.obs_cloud = ObsCloud("forexample", "forexample", "obs.example.com", "release-tools")
+        self.local_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.local_path, True)
+
+    def write_logs(self, *names):
+        """
+        write the build logs of packages under local path
+        """
+        for name in names:
+            log_dir = os.path.join(self.local_path, "build_result", "failed_log", name)
+            os.makedirs(log_dir, exist_ok=True)
+            with open(os.path.join(log_dir, "self_build_res"), "w", encoding="utf-8") as file:
+                file.write(f"build log of {name}\n")
+
+    def test_unchanged_logs_not_uploaded_again(self):
+        """
+        test the second archive of an unchanged tree uploads nothing, the md5 saved in
+        the object metadata by the first archive is compared with the local file
+        """
+        self.write_logs("vim", "gcc")
+        uploaded = dict()
+
+        def put_file(bucket, object_key, path, metadata=None, headers=None):
+            uploaded[object_key] = metadata["md5"]
+            return self.make_obs_cloud_data(200, {})
+
+        def get_object_metadata(bucket, object_key):
+            if object_key not in uploaded:
+                return self.make_obs_cloud_data(404, {})
+            resp = self.make_obs_cloud_data(200, {"etag": '"0123-2"'})
+            resp.header = [("md5", uploaded[object_key])]
+            return resp
+
+        self.mock_obs_cloud_head_bucket(return_value=self.make_obs_cloud_data(200, {}))
+        self.mock_obs_cloud_get_object_metadata(side_effect=get_object_metadata)
+        self.mock_obs_cloud_put_file(side_effect=put_file)
+        self.assertTrue(self.obs_cloud.run("openEuler-22.03-LTS", "build_result", self.local_path))
+        self.assertEqual(2, len(uploaded))
+        log_path = os.path.join(self.local_path, "build_result", "failed_log", "vim", "self_build_res")
+        self.assertEqual(
+            file_md5(log_path),
+            uploaded["install_build_log/openEuler-22.03-LTS/build_result/failed_log/vim/self_build_res"],
+        )
+
+        self.mock_obs_cloud_put_file(side_effect=AssertionError("unchanged log is uploaded"))
+        self.assertTrue(self.obs_cloud.run("openEuler-22.03-LTS", "build_result", self.local_path))
+
+    def test_single_part_etag_compared(self):
+        """
+        test the etag of an object uploaded without md5 metadata is compared, unless it is multipart
+        """
+        self.write_logs("vim")
+        log_path = os.path.join(self.local_path, "build_result", "failed_log", "vim", "self_build_res")
+        self.mock_obs_cloud_get_object_metadata(
+            return_value=self.make_obs_cloud_data(200, {"etag": '"%s"' % file_md5(log_path)}))
+        self.assertEqual(file_md5(log_path), self.obs_cloud.object_md5("vim/self_build_res"))
+
+        self.mock_obs_cloud_get_object_metadata(return_value=self.make_obs_cloud_data(200, {"etag": '"0123-2"'}))
+        self.assertIsNone(self.obs_cloud.object_md5("vim/self_build_res"))
+
+    def test_upload_retried_on_connection_error(self):
+        """
+        test the upload is retried when the connection fails
+        """
+        self.write_logs("vim")
+        self.mock_obs_cloud_head_bucket(return_value=self.make_obs_cloud_data(200, {}))
+        self.mock_obs_cloud_get_object_metadata(return_value=self.make_obs_cloud_data(404, {}))
+        self.mock_obs_cloud_put_file(side_effect=[ConnectionResetError("reset"), self.make_obs_cloud_data(200, {})])
+        self.assertTrue(self.obs_cloud.run("openEuler-22.03-LTS", "build_result", self.local_path))
+
+    def list_objects(self, keys, page_size=10):
+        """
+        mock listObjects of a bucket holding keys, the objects are listed page by page by the marker
+        """
+        keys = sorted(keys)
+
+        def list_objects(bucket, prefix=None, marker=None, max_keys=None, delimiter=None):
+            matched = [key for key in keys if key.startswith(prefix) and (marker is None or key > marker)]
+            page = matched[:page_size]
+            return self.make_obs_cloud_data(
+                200, {"contents": [{"key": key} for key in page], "is_truncated": len(matched) > page_size})
+
+        self.mock_obs_cloud_list_objects(side_effect=list_objects)
+
+    def test_bulk_delete(self):
+        """
+        test the objects are deleted in quiet mode by batches, and at most max_workers
+        batches are deleted at the same time
+        """
+        keys = ["install_build_log/openEuler-22.03-LTS/log_%02d" % index for index in range(23)]
+        self.list_objects(keys)
+        batches = []
+        running = [0, 0]
+        lock = threading.Lock()
+
+        def delete_objects(bucket, delete_request):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            self.assertTrue(delete_request.quiet)
+            time.sleep(0.01)
+            with lock:
+                batches.append([obj.key for obj in delete_request.objects])
+                running[0] -= 1
+            return self.make_obs_cloud_data(200, {})
+
+        self.mock_obs_cloud_delete_objects(side_effect=delete_objects)
+        fails = self.obs_cloud.bulk_delete("install_build_log/openEuler-22.03-LTS/", batch_size=4, max_workers=2)
+
+        self.assertEqual({}, fails)
+        self.assertEqual([4, 4, 4, 4, 4, 3], sorted((len(batch) for batch in batches), reverse=True))
+        self.assertEqual(keys, sorted(key for batch in batches for key in batch))
+        self.assertLessEqual(running[1], 2)
+
+    def test_bulk_delete_failed_keys(self):
+        """
+        test the keys returned by the quiet deletion and all the keys of a failed request are reported
+        """
+        keys = ["install_build_log/openEuler-22.03-LTS/log_%02d" % index for index in range(6)]
+        self.list_objects(keys)
+
+        def delete_objects(bucket, delete_request):
+            batch = [obj.key for obj in delete_request.objects]
+            if keys[0] in batch:
+                return self.make_obs_cloud_data(200, {"error": [
+                    {"key": keys[1], "code": "AccessDenied", "message": "Access Denied"},
+                    {"key": keys[2], "code": "InternalError", "message": None},
+                ]})
+            return self.make_obs_cloud_data(503, {})
+
+        self.mock_obs_cloud_delete_objects(side_effect=delete_objects)
+        fails = self.obs_cloud.bulk_delete("install_build_log/openEuler-22.03-LTS/", batch_size=3, max_workers=2)
+
+        self.assertEqual(
+            {keys[1]: "Access Denied", keys[2]: "InternalError",
+             keys[3]: "status code 503", keys[4]: "status code 503", keys[5]: "status code 503"},
+            fails,
+        )
+        self.assertFalse(self.obs_cloud.delete_dir("install_build_log/openEuler-22.03-LTS/"))
+
+    def store_object(self, content):
+        """
+        mock getObjectMetadata and the range reads of getObject of one object, the range past
+        the end of object is cut at the end like obs does
+
+        Returns:
+            list: the ranges read
+        """
+        ranges = []
+
+        def get_object(bucket, object_key, headers=None, loadStreamInMemory=False):
+            start, end = map(int, headers.range.split("-"))
+            ranges.append((start, end))
+            return self.make_obs_cloud_data(200, {"buffer": None}) if start >= len(content) else \
+                self.make_obs_cloud_response(content[start:end + 1])
+
+        self.mock_obs_cloud_get_object_metadata(
+            return_value=self.make_obs_cloud_data(200, {"contentLength": len(content)}))
+        self.mock_obs_cloud_get_objects(side_effect=get_object)
+        return ranges
+
+    def make_obs_cloud_response(self, buffer):
+        """
+        response of getObject whose body holds the bytes read
+        """
+        resp = self.make_obs_cloud_data(200, {})
+        resp.body.buffer = buffer
+        return resp
+
+    def test_read_range_past_end(self):
+        """
+        test the range past the end of object returns the bytes to the end
+        """
+        self.store_object(b"0123456789")
+        self.assertEqual(b"56789", self.obs_cloud.read_range("log", 5, 1000))
+        self.assertEqual(b"", self.obs_cloud.read_range("log", 20, 30))
+
+    def test_tail_lines_partial_first_line(self):
+        """
+        test the line cut by the first range read is not returned, and the ranges are read backwards
+        """
+        content = "".join("line %02d of the build log\n" % index for index in range(20)).encode("utf-8")
+        ranges = self.store_object(content)
+
+        tail = self.obs_cloud.tail_lines("log", 3, chunk_size=40)
+        self.assertEqual("line 17 of the build log\nline 18 of the build log\nline 19 of the build log\n", tail)
+        self.assertEqual([(len(content) - 40 * (index + 1), len(content) - 40 * index - 1) for index in range(2)],
+                         ranges)
+
+    def test_tail_lines_small_object(self):
+        """
+        test an object smaller than the window is read by one range, and all of its lines are returned
+        """
+        ranges = self.store_object("第一行\nsecond line without line break".encode("utf-8"))
+
+        self.assertEqual("第一行\nsecond line without line break", self.obs_cloud.tail_lines("log", 50))
+        self.assertEqual([(0, len("第一行\nsecond line without line break".encode("utf-8")) - 1)], ranges)
+
+    def test_tail_lines_empty_or_unreadable(self):
+        """
+        test an empty object has no lines and an object which can not be read returns None
+        """
+        ranges = self.store_object(b"")
+        self.assertEqual("", self.obs_cloud.tail_lines("log", 5))
+        self.assertEqual([], ranges)
+
+        self.mock_obs_cloud_get_object_metadata(return_value=self.make_obs_cloud_data(404, {}))
+        self.assertIsNone(self.obs_cloud.tail_lines("log", 5))
+
+        self.store_object(b"a\nb\n")
+        self.mock_obs_cloud_get_objects(return_value=self.make_obs_cloud_data(500, {}))
+        self.assertIsNone(self.obs_cloud.tail_lines("log", 5))
+
+    def test_result_log_index(self):
+        """
+        test the logs are indexed by branch, result type and the exact package name, the keys
+        which are not package logs are skipped
+        """
+        index = ResultLogIndex()
+        branch_prefix = "install_build_log/openEuler-22.03-LTS/"
+        self.assertTrue(index.add(branch_prefix + "build_result/failed_log/vim/self_build_res"))
+        self.assertTrue(index.add(branch_prefix + "build_result/failed_log/vim/build.log"))
+        self.assertTrue(index.add(branch_prefix + "build_result/failed_log/vim-plugin/self_build_res"))
+        self.assertTrue(index.add(branch_prefix + "check_result/failed_log/gcc/install.log"))
+        self.assertTrue(index.add("install_build_log/openEuler-20.03-LTS-SP3/build_result/failed_log/gcc/build.log"))
+        self.assertFalse(index.add(branch_prefix + "build_result/failed_log//self_build_res"))
+        self.assertFalse(index.add(branch_prefix + "build_result/success_log/vim/self_build_res"))
+        self.assertFalse(index.add(branch_prefix + "build_result/failed_log"))
+
+        self.assertEqual(
+            [branch_prefix + "build_result/failed_log/vim/self_build_res",
+             branch_prefix + "build_result/failed_log/vim/build.log"],
+            index.logs("openEuler-22.03-LTS", "build_result", "vim"),
+        )
+        self.assertEqual({"vim", "vim-plugin"}, index.packages("openEuler-22.03-LTS", "build_result"))
+        self.assertEqual({"gcc"}, index.packages("openEuler-22.03-LTS", "check_result"))
+        self.assertEqual([], index.logs("openEuler-22.03-LTS", "build_result", "gcc"))
+        self.assertEqual(set(), index.packages("openEuler-22.03-LTS-SP1", "build_result"))
+        # the results are copies, they do not change the index
+        index.packages("openEuler-22.03-LTS", "check_result").add("kernel")
+        index.logs("openEuler-22.03-LTS", "build_result", "vim").clear()
+        self.assertEqual({"gcc"}, index.packages("openEuler-22.03-LTS", "check_result"))
+        self.assertEqual(2, len(index.logs("openEuler-22.03-LTS", "build_result", "vim")))
+
+    def test_parse_install_build_content(self):
+        """
+        test the packages with failed logs are found by one paged listing of the branch
+        """
+        branch_prefix = "install_build_log/openEuler-22.03-LTS/"
+        keys = [branch_prefix + "build_result/failed_log/pkg%02d/self_build_res" % index for index in range(15)]
+        keys.append(branch_prefix + "check_result/failed_log/gcc/install.log")
+        keys.append("install_build_log/openEuler-22.03-LTS-SP1/build_result/failed_log/vim/self_build_res")
+        self.list_objects(keys, page_size=4)
+
+        content = self.obs_cloud.parse_install_build_content("openEuler-22.03-LTS")
+        self.assertEqual({"pkg%02d" % index for index in range(15)}, content["build_list"])
+        self.assertEqual({"gcc"}, content["install_list"])
+        self.assertEqual(4, self.obs_cloud.obs_client.listObjects.call_count)
@@ -50,9 +50,8 @@ class TestCheck(TestMixin):
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         self.mock_requests_post(return_value=mock_post_data)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         mock_check_r, resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp,
-                         mock_repo_list_data, resp])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, resp, mock_install_r, mock_bugfix_r,
+                         mock_repo_list_data])
         self.assert_result()
 
     def test_check_status_failed(self):
@@ -66,7 +65,7 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_request(
-            side_effect=[resp, resp, RequestException])
+            side_effect=[resp, RequestException])
         self.assert_result()
 
     def test_count_issue_status_failed(self):
@@ -80,13 +79,10 @@ during the operation status, a failure occurred, and the cause of the error was
         self.command_params = ["--giteeid=Mary", "--token=example", "--type=status", "--jenkinsuser=mary",
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
-        mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_abnormal_r = self.make_need_content('mock_abnormal_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, RequestException, mock_abnormal_r])
+            side_effect=[resp, resp, resp, resp, resp, mock_check_r, resp, resp, RequestException, mock_abnormal_r])
         self.assert_result()
 
     def test_send_repo_info_requests_post_failed(self):
@@ -102,14 +98,13 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
         mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         self.mock_requests_post(return_value=None)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp, mock_repo_list_data, resp])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, mock_install_r, resp, resp, resp, resp,
+                         mock_repo_list_data, resp])
         self.assert_result()
 
     def test_send_repo_info_request_exception(self):
@@ -125,14 +120,13 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
         mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         self.mock_requests_post(side_effect=[RequestException])
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp, mock_repo_list_data, resp])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, mock_install_r, resp, resp, resp, resp,
+                         mock_repo_list_data, resp])
         self.assert_result()
 
     def test_send_repo_info_error_code_400(self):
@@ -148,15 +142,14 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
         mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         mock_post_data = self.make_need_content('mock_error_post_data.txt', MOCK_DATA_FILE)
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         self.mock_requests_post(return_value=mock_post_data)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp, mock_repo_list_data, resp])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, mock_install_r, resp, resp, resp, resp,
+                         mock_repo_list_data, resp])
         self.assert_result()
 
     def test_send_repo_info_request_repo_url_failed(self):
@@ -172,12 +165,11 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
         mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp, RequestException, resp])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, mock_install_r, resp, resp, resp, resp,
+                         RequestException, resp])
         self.assert_result()
 
     def test_send_repo_info_get_update_list_failed(self):
@@ -193,14 +185,12 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
-        mock_bugfix_r = self.make_need_content('mock_bugfix_issue.txt', MOCK_DATA_FILE)
         mock_install_r = self.make_need_content('mock_install_issue.txt', MOCK_DATA_FILE)
         mock_check_r = self.make_need_content('check_status_success.txt', MOCK_DATA_FILE)
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, resp, resp, mock_install_r, resp, resp, resp, mock_bugfix_r, mock_check_r,
-                         resp, resp, mock_install_r, mock_bugfix_r, resp, resp, resp, resp, mock_repo_list_data,
-                         RequestException])
+            side_effect=[resp, resp, resp, mock_check_r, resp, resp, mock_install_r, resp, resp, resp, resp,
+                         mock_repo_list_data, RequestException])
         self.assert_result()
 
     def test_block_has_no_related_issues(self):
@@ -218,8 +208,7 @@ during the operation status, a failure occurred, and the cause of the error was
         self.mock_subprocess_check_output(return_value=b"published-everything-src")
         mock_no_related_issues_r = self.make_need_content('mock_no_related_issues.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_no_related_issues_r, mock_no_related_issues_r, mock_no_related_issues_r,
-                         RequestException])
+            side_effect=[resp, mock_no_related_issues_r, RequestException])
         self.assert_result()
 
     def test_people_review_success(self):
@@ -234,7 +223,7 @@ during the operation status, a failure occurred, and the cause of the error was
         resp = self.make_expect_data(200, 'checkpart.txt')
         mock_comment_r = self.make_need_content('mock_issue_comment.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp, mock_comment_r, mock_cve_bigfix_comment])
+        self.mock_request(side_effect=[resp, resp, mock_comment_r, mock_cve_bigfix_comment])
         self.assert_result()
 
     def test_create_issue_comment_failed(self):
@@ -247,7 +236,7 @@ during the operation status, a failure occurred, and the cause of the error was
         self.command_params = ["--giteeid=Mary", "--token=example", "--type=test", "--jenkinsuser=mary",
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
-        self.mock_request(side_effect=[resp, resp, resp, RequestException])
+        self.mock_request(side_effect=[resp, resp, RequestException])
         self.assert_result()
 
     def test_empty_related_personnel_information(self):
@@ -261,7 +250,7 @@ during the operation status, a failure occurred, and the cause of the error was
                                "--jenkinskey=marykey", "--ak=forexample", "--sk=forexample", "I40769", "--buildcheck"]
         resp = self.make_expect_data(200, 'checkpart.txt')
         mock_empty_related_personnel_r = self.make_need_content('mock_empty_related_personnel.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, mock_empty_related_personnel_r])
+        self.mock_request(side_effect=[resp, mock_empty_related_personnel_r])
         self.assert_result()
 
     def test_parameter_validation_failed(self):
@@ -317,13 +306,13 @@ Parameter validation failed
         mock_checkpart_add_install = self.make_need_content('checkpart_add_install_success.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_repo_list_data, mock_create_jenkins_comment, mock_create_jenkins_comment, resp, resp,
-                         resp, resp, mock_add_repo_r, mock_create_build_jenkins_comment,
-                         mock_create_install_jenkins_comment, mock_create_install_jenkins_comment, resp, resp,
-                         mock_exist_issues, mock_create_build_issue, resp, resp, mock_create_build_issue,
-                         mock_checkpart_add_build, resp, resp, mock_exist_issues, mock_create_install_issue, resp, resp,
-                         resp, mock_create_install_issue, mock_checkpart_add_install])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_repo_list_data,
+                         mock_create_jenkins_comment, mock_create_jenkins_comment, mock_add_repo_r,
+                         mock_create_build_jenkins_comment, mock_create_install_jenkins_comment,
+                         mock_create_install_jenkins_comment, resp, resp, mock_exist_issues, mock_create_build_issue,
+                         resp, resp, mock_create_build_issue, mock_checkpart_add_build, resp, resp, mock_exist_issues,
+                         mock_create_install_issue, resp, resp, resp, mock_create_install_issue,
+                         mock_checkpart_add_install])
         self.assert_result()
 
     def test_get_require_delete_file_failed(self):
@@ -338,7 +327,7 @@ Parameter validation failed
         self.prepare_obs_data(delete_status_code=400)
         resp = self.make_expect_data(200, 'checkpart.txt')
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp])
+        self.mock_request(side_effect=[resp, mock_cve_bigfix_comment, resp, resp])
         self.assert_result()
 
     def test_get_repo_in_table_failed(self):
@@ -356,8 +345,8 @@ Parameter validation failed
         resp = self.make_expect_data(200, 'checkpart.txt')
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_create_jenkins_comment, resp, resp, resp, resp, RequestException])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_create_jenkins_comment,
+                         RequestException])
         self.assert_result()
 
     def test_create_jenkins_comment_and_build_comment_and_install_comment_failed(self):
@@ -380,11 +369,11 @@ Parameter validation failed
         mock_checkpart_add_install = self.make_need_content('checkpart_add_install_success.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         RequestException, resp, resp, resp, resp, mock_add_repo_r, RequestException, RequestException,
-                         resp, resp, mock_exist_issues, mock_create_build_issue, resp, resp, mock_create_build_issue,
-                         mock_checkpart_add_build, resp, resp, mock_exist_issues, mock_create_install_issue, resp, resp,
-                         mock_create_install_issue, mock_checkpart_add_install])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, RequestException, resp,
+                         mock_add_repo_r, RequestException, RequestException, resp, mock_exist_issues,
+                         mock_create_build_issue, mock_create_build_issue, resp, mock_checkpart_add_build, resp,
+                         mock_exist_issues, mock_create_install_issue, mock_create_install_issue, resp,
+                         mock_checkpart_add_install])
         self.assert_result()
 
     def test_check_requires_epol_list_failed(self):
@@ -404,8 +393,8 @@ Parameter validation failed
         mock_create_jenkins_comment = self.make_need_content('create_jenkins_comments_success.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_create_jenkins_comment, resp, resp, resp, resp, RequestException])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_create_jenkins_comment, resp,
+                         resp, RequestException])
         self.assert_result()
 
     def test_get_update_issue_branch_and_get_update_list_failed(self):
@@ -420,7 +409,8 @@ during the operation requires, a failure occurred, and the cause of the error wa
         resp = self.make_expect_data(200, 'checkpart.txt')
         branch_abnormal_r = self.make_need_content('check_branch_abnormal.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, mock_cve_bigfix_comment, branch_abnormal_r, branch_abnormal_r, RequestException])
+        self.mock_request(side_effect=[resp, mock_cve_bigfix_comment, branch_abnormal_r, branch_abnormal_r,
+                                       RequestException])
         self.assert_result()
 
     def test_branch_name_is_none_and_get_update_list_failed(self):
@@ -436,7 +426,7 @@ during the operation requires, a failure occurred, and the cause of the error wa
         branch_abnormal_r = self.make_need_content('branch_name_is_none.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, branch_abnormal_r, branch_abnormal_r, RequestException])
+            side_effect=[resp, mock_cve_bigfix_comment, branch_abnormal_r, branch_abnormal_r, RequestException])
         self.assert_result()
 
     def test_create_jenkins_comment_failed(self):
@@ -457,8 +447,7 @@ during the operation requires, a failure occurred, and the cause of the error wa
         mock_repo_list_data = self.make_need_content('repo_list_data.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp,
-                         mock_repo_list_data])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data])
         self.assert_result()
 
     def test_download_pkg_log_write_back_create_install_build_issue_failed(self):
@@ -484,10 +473,9 @@ during the operation requires, a failure occurred, and the cause of the error wa
         mock_create_build_issue = self.make_need_content('create_build_issue_success.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_create_jenkins_comment, resp, resp, resp, resp, mock_add_repo_r,
-                         mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp, resp,
-                         mock_exist_issues, mock_issue_comment, mock_create_build_issue, RequestException,
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_create_jenkins_comment,
+                         mock_add_repo_r, mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp,
+                         resp, mock_exist_issues, mock_issue_comment, mock_create_build_issue, RequestException,
                          RequestException])
         self.assert_result()
 
@@ -512,10 +500,9 @@ during the operation requires, a failure occurred, and the cause of the error wa
                                                                    MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_create_jenkins_comment, resp, resp, resp, resp, mock_add_repo_r,
-                         mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp, resp,
-                         mock_exist_issues, RequestException, RequestException])
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_create_jenkins_comment,
+                         mock_add_repo_r, mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp,
+                         resp, mock_exist_issues, RequestException, RequestException])
         self.assert_result()
 
     def test_write_back_operate_release_issue_failed(self):
@@ -541,10 +528,9 @@ during the operation requires, a failure occurred, and the cause of the error wa
         mock_create_install_issue = self.make_need_content('create_install_issue_success.txt', MOCK_DATA_FILE)
         mock_cve_bigfix_comment = self.make_need_content('mock_cve_bugfix_comment.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, mock_cve_bigfix_comment, resp, resp, resp, resp, resp, resp, resp, resp, mock_repo_list_data,
-                         mock_create_jenkins_comment, resp, resp, resp, resp, mock_add_repo_r,
-                         mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp, resp,
-                         mock_exist_issues, mock_create_build_issue, resp, resp, mock_create_build_issue,
+            side_effect=[resp, mock_cve_bigfix_comment, resp, mock_repo_list_data, mock_create_jenkins_comment,
+                         mock_add_repo_r, mock_create_build_jenkins_comment, mock_create_install_jenkins_comment, resp,
+                         resp, mock_exist_issues, mock_create_build_issue, resp, resp, mock_create_build_issue,
                          RequestException, resp, resp, mock_exist_issues, mock_create_install_issue, resp,
                          mock_create_install_issue, RequestException])
         self.assert_result()
@@ -571,12 +557,11 @@ during the operation requires, a failure occurred, and the cause of the error wa
         aarch64_config = self.read_file_content('test_template_config_aarch64.xml', folder=MOCK_DATA_FILE,
                                                 is_json=False)
         x86_64_config = self.read_file_content('test_template_config_x86.xml', folder=MOCK_DATA_FILE, is_json=False)
-        self.mock_jenkins_get_job_config(
-            side_effect=[trigger_config, aarch64_config, aarch64_config, aarch64_config, aarch64_config, aarch64_config,
-                         x86_64_config, x86_64_config, x86_64_config, x86_64_config, x86_64_config])
+        self.mock_jenkins_get_job_config(side_effect=[trigger_config, aarch64_config, x86_64_config])
         self.mock_jenkins_create_job(return_value=True)
-        self.mock_jenkins_get_build_console_output(
-            return_value=self.read_file_content('get_build_console_output.txt', folder=MOCK_DATA_FILE, is_json=False))
+        console_r = self.make_need_content('get_build_console_output.txt', MOCK_DATA_FILE)
+        console_r.headers = {"X-Text-Size": str(len(console_r.text.encode("utf-8")))}
+        self.mock_jenkins_jenkins_request(return_value=console_r)
 
     def prepare_obs_data(self, file_name='mock_obs_data.json', list_status_code=200, delete_status_code=200,
                          get_objects_status_code=200):
@@ -585,7 +570,11 @@ during the operation requires, a failure occurred, and the cause of the error wa
         """
         mock_obs_list_objects_r = self.make_need_obs_cloud_data(file_name, MOCK_DATA_FILE, list_status_code)
         mock_obs_delete_objects_r = self.make_need_obs_cloud_data(file_name, MOCK_DATA_FILE, delete_status_code)
-        mock_getobjects_r = self.make_object_data(get_objects_status_code)
+        log_data = b"".join(b"line %d of build log\n" % line for line in range(100))
+        mock_metadata_r = self.make_obs_cloud_data(get_objects_status_code, {"contentLength": len(log_data)})
+        mock_getobjects_r = self.make_obs_cloud_data(get_objects_status_code, {})
+        mock_getobjects_r.body.buffer = log_data
+        self.mock_obs_cloud_get_object_metadata(return_value=mock_metadata_r)
         self.mock_obs_cloud_get_objects(return_value=mock_getobjects_r)
         self.mock_obs_cloud_list_objects(return_value=mock_obs_list_objects_r)
-        self.mock_obs_cloud_delete_object(return_value=mock_obs_delete_objects_r)
+        self.mock_obs_cloud_delete_objects(return_value=mock_obs_delete_objects_r)
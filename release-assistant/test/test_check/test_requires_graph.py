@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestRequiresGraph
+"""
+import gzip
+import os
+
+from test.base.basetest import TestMixin
+from javcra.application.checkpart.check_requires.get_effected_rpms import get_update_install, get_whatrequires
+from javcra.application.checkpart.check_requires.repodata_api import RepodataIndex
+from javcra.application.checkpart.check_requires.requires_graph import RequiresGraph, parse_capabilities
+
+MOCK_DATA_FILE = os.path.join(os.path.abspath(os.path.dirname(__file__)), "mock_data")
+PRIMARY_LOCATION = "repodata/6b7d1a4e4f0d6a1f6e2c1d1b0d3c2f6e2a6b4e1d9b3f0c7a2e5d8c1b4a7f0e3d-primary.xml"
+REPOS = {
+    "everything": ("http://repo.example.com/everything/", "published_primary.xml"),
+    "dev": ("http://obs.example.com/dev/", "dev_primary.xml"),
+}
+
+
+class TestRequiresGraph(TestMixin):
+    """
+    class for test the requires graph built from primary metadata
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.repo_file = os.path.join(self.cache_dir, "test.repo")
+        with open(self.repo_file, "w", encoding="utf-8") as file:
+            for repo_id, (baseurl, _) in REPOS.items():
+                file.write(f"[{repo_id}]\nname={repo_id}\nbaseurl={baseurl}\nenabled=1\n")
+        self.mock_repodata_fetch(side_effect=self.fetch)
+
+    @staticmethod
+    def read_mock_data(file_name):
+        """
+        read mock data as bytes
+        """
+        with open(os.path.join(MOCK_DATA_FILE, file_name), "rb") as file:
+            return file.read()
+
+    def fetch(self, url):
+        """
+        content of the repodata of the mocked repos
+        """
+        for baseurl, primary in REPOS.values():
+            if url == baseurl + "repodata/repomd.xml":
+                return self.read_mock_data("requires_repomd.xml")
+            if url == baseurl + PRIMARY_LOCATION:
+                return self.read_mock_data(primary)
+        return None
+
+    def test_parse_capabilities(self):
+        """
+        test the capabilities of plain and rich dependencies
+        """
+        self.assertEqual(["perl(Foo::Bar)"], parse_capabilities("perl(Foo::Bar)"))
+        self.assertEqual([], parse_capabilities("rpmlib(CompressedFileNames)"))
+        self.assertEqual(["python3dist(foo)", "python3"], parse_capabilities("(python3dist(foo) if python3)"))
+        self.assertEqual(["perl(Foo::Bar)", "bar"], parse_capabilities("(perl(Foo::Bar) >= 1 or bar)"))
+        self.assertEqual(
+            ["foo", "bar(x86-64)", "baz"],
+            parse_capabilities("((foo >= 1.0 with foo < 2.0) or (bar(x86-64) = 1:2-3 unless baz))"),
+        )
+
+    def test_parse_primary_deps(self):
+        """
+        test the dependencies of binary packages are parsed from plain and compressed primary.xml
+        """
+        content = self.read_mock_data("published_primary.xml")
+        packages = RepodataIndex.parse_primary_deps(content, "repodata/primary.xml")
+        self.assertEqual(
+            ["glibc", "openssl-libs", "curl", "git", "python3-urllib3", "python3-requests", "perl-Foo", "app"],
+            [package[0] for package in packages],
+        )
+        self.assertIn(
+            ["curl", "curl", ["curl"], ["libssl.so.1.1()(64bit)", "libc.so.6()(64bit)"], ["/usr/bin/curl"]],
+            packages,
+        )
+        self.assertEqual(packages, RepodataIndex.parse_primary_deps(gzip.compress(content), "repodata/primary.xml.gz"))
+
+    def test_graph_affected(self):
+        """
+        test the packages affected by an update through sonames, files and rich dependencies
+        """
+        graph = RequiresGraph(RepodataIndex.parse_primary_deps(self.read_mock_data("published_primary.xml"),
+                                                               PRIMARY_LOCATION))
+        self.assertEqual({"curl": ["curl"], "git": ["git"]}, graph.affected(["openssl"]))
+        self.assertEqual({"curl": ["curl"]}, graph.affected(["openssl"], max_depth=1))
+        self.assertEqual({"python-requests": ["python3-requests"]}, graph.affected(["python-urllib3"]))
+        self.assertEqual({"app": ["app"]}, graph.affected(["perl-Foo"]))
+        self.assertEqual({}, graph.affected(["git"]))
+        self.assertEqual({}, graph.affected(["not-exist"]))
+
+    def test_get_whatrequires(self):
+        """
+        test the requirers are found in the published and develop repos of repo file
+        """
+        self.assertEqual(
+            {"curl": ["curl"], "git": ["git"]},
+            get_whatrequires(["openssl"], ["everything"], ["dev"], repo_file=self.repo_file),
+        )
+        self.assertEqual(
+            {"curl": ["curl"]},
+            get_whatrequires(["openssl"], ["everything"], ["dev"], repo_file=self.repo_file, max_depth=1),
+        )
+        # the repodata of a repo which can not be loaded
+        self.assertEqual({}, get_whatrequires(["openssl"], ["everything", "not-exist"], [],
+                                              repo_file=self.repo_file))
+
+    def test_get_update_install(self):
+        """
+        test the develop packages which provide the new requires of updated packages
+        """
+        self.assertEqual(
+            {"crypto-policies": ["crypto-policies"]},
+            get_update_install(["openssl"], ["everything"], ["dev"], repo_file=self.repo_file),
+        )
+        self.assertEqual({}, get_update_install(["curl"], ["everything"], ["dev"], repo_file=self.repo_file))
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestCommandRunner, TestRpmNameParser
+"""
+import sys
+import threading
+import time
+
+from test.base.basetest import TestMixin
+from javcra.application.checkpart.check_requires.shell_api_tool import CommandRunner, RpmNameParser
+
+
+class TestCommandRunner(TestMixin):
+    """
+    class for test CommandRunner, the commands are real python processes
+    """
+
+    @staticmethod
+    def python_cmd(code):
+        """
+        command running python code
+        """
+        return [sys.executable, "-c", code]
+
+    def test_output_cut_while_reading(self):
+        """
+        test a command writing endless output is killed once the output reaches the cap
+        """
+        runner = CommandRunner(max_workers=1, timeout=30, max_output=100)
+        start = time.time()
+        output = runner.run(self.python_cmd("while True: print('x' * 1000)"))
+        self.assertEqual("x" * 100, output)
+        self.assertLess(time.time() - start, 10)
+
+    def test_timeout_and_failure(self):
+        """
+        test the output is empty when the command times out or exits with non-zero code
+        """
+        runner = CommandRunner(max_workers=1, timeout=30)
+        self.assertEqual("", runner.run(self.python_cmd("import time; print('x'); time.sleep(30)"), timeout=1))
+        self.assertEqual("", runner.run(self.python_cmd("import sys; print('x'); sys.exit(1)")))
+        self.assertEqual("x\n", runner.run(self.python_cmd("print('x')")))
+        self.assertEqual("err\n", runner.run(self.python_cmd("import sys; sys.stderr.write('err\\n')"), rt_err=True))
+
+    def test_map_with_several_workers(self):
+        """
+        test the commands of map run at the same time, bounded by max_workers, and the results keep the order
+        """
+        runner = CommandRunner(max_workers=3, timeout=30)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def run(index):
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            output = runner.run(self.python_cmd(f"import time; time.sleep(0.5); print({index})"))
+            with lock:
+                running[0] -= 1
+            return output.strip()
+
+        start = time.time()
+        self.assertEqual([str(index) for index in range(6)], runner.map(run, range(6)))
+        self.assertEqual(3, running[1])
+        # 6 commands of 0.5s in 3 workers
+        self.assertLess(time.time() - start, 2.5)
+
+
+class TestRpmNameParser(TestMixin):
+    """
+    class for test the version comparison of RpmNameParser, the expected results are the ones of rpmvercmp
+    """
+
+    def assert_compare(self, expected, ver_a, ver_b):
+        """
+        assert the result of comparing ver_a with ver_b, and the opposite result the other way round
+        """
+        self.assertEqual(expected, RpmNameParser.compare_version(ver_a, ver_b), f"{ver_a} vs {ver_b}")
+        self.assertEqual(-expected, RpmNameParser.compare_version(ver_b, ver_a), f"{ver_b} vs {ver_a}")
+
+    def test_numeric_segments(self):
+        """
+        test the digit segments are compared as numbers and the leading zeros are ignored
+        """
+        self.assert_compare(1, "1.10", "1.9")
+        self.assert_compare(0, "1.01", "1.1")
+        self.assert_compare(0, "1.001", "1.0001")
+        self.assert_compare(1, "1.010", "1.9")
+        self.assert_compare(1, "2.0.1", "2.0")
+        self.assert_compare(0, "1.0", "1_0")
+
+    def test_alpha_segments(self):
+        """
+        test the alpha segments are compared as strings and are older than the digit segments
+        """
+        self.assert_compare(1, "1.0b", "1.0a")
+        self.assert_compare(1, "1.0a", "1.0")
+        self.assert_compare(1, "2.1", "2.a")
+        self.assert_compare(1, "1.0.1", "1.0a")
+        self.assert_compare(1, "1.0a", "1.0A")
+
+    def test_tilde(self):
+        """
+        test "~" sorts before anything, even the end of version
+        """
+        self.assert_compare(-1, "1.0~rc1", "1.0")
+        self.assert_compare(-1, "1.0~rc1", "1.0~rc2")
+        self.assert_compare(-1, "1.0~~", "1.0~")
+        self.assert_compare(-1, "1.0~rc1", "1.0a")
+
+    def test_caret(self):
+        """
+        test "^" sorts after the end of version but before any other segment
+        """
+        self.assert_compare(1, "1.0^git1", "1.0")
+        self.assert_compare(-1, "1.0^git1", "1.0.1")
+        self.assert_compare(-1, "1.0^git1", "1.0^git2")
+        self.assert_compare(1, "1.0^", "1.0~")
+
+    def test_compare_evr(self):
+        """
+        test the epoch is compared first, an empty epoch is 0, then version and release
+        """
+        self.assertEqual(1, RpmNameParser.compare_evr(["1", "1.0", "1"], ["", "2.0", "1"]))
+        self.assertEqual(-1, RpmNameParser.compare_evr(["", "9.0", "1"], ["2", "1.0", "1"]))
+        self.assertEqual(0, RpmNameParser.compare_evr(["", "1.0", "1"], ["0", "1.0", "1"]))
+        self.assertEqual(-1, RpmNameParser.compare_evr(["0", "1.0", "2"], ["0", "1.0", "10"]))
+        self.assertEqual(1, RpmNameParser.compare_evr(["0", "1.0.1", "1"], ["0", "1.0", "9"]))
+        self.assertEqual(
+            1, RpmNameParser.compare_evr(RpmNameParser.parse_rpm_evr("1:1.0-1"), RpmNameParser.parse_rpm_evr("2.0-1"))
+        )
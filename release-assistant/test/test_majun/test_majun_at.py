@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestIsoFreshnessWatcher
+"""
+import datetime
+from unittest import mock
+
+from test.base.basetest import TestMixin
+from javcra.api.jenkins_wait import BackoffPolicy, BuildWaiter
+from javcra.application.majun.majun_at import IsoFreshnessWatcher, MaJunAt, probe_all_arch
+from javcra.common.constant import DAYLIBUILD_URL
+
+BRANCH = "openEuler-22.03-LTS"
+OLD_ISO = "http://121.36.84.172/dailybuild/openEuler-22.03-LTS/openeuler-2022-10-13-10-20-30/"
+NEW_ISO = "http://121.36.84.172/dailybuild/openEuler-22.03-LTS/openeuler-2022-10-14-08-00-00/"
+
+
+class FakeClock:
+    """
+    monotonic clock which is advanced by sleep
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestIsoFreshnessWatcher(TestMixin):
+    """
+    class for test IsoFreshnessWatcher and the iso build watching of MaJunAt, the dailybuild
+    server is mocked by the pooled session
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.clock = FakeClock()
+        self._create_patch("javcra.application.majun.majun_at.time", new=self.clock)
+        # {arch url: time when the new iso is published}, the arch not in it is never updated
+        self.published = {"openeuler_ARM64": 0, "openeuler_X86": 90}
+        self.broken_arch = set()
+        self.requested = []
+        self.mock_request(side_effect=self.dailybuild)
+        self.baseline = {
+            arch_name: dict(iso_build_url=OLD_ISO, iso_build_time=datetime.datetime(2022, 10, 13, 10, 20, 30))
+            for arch_name in ("ARM64", "X86")
+        }
+        self.policy = BackoffPolicy(min_delay=30, max_delay=300, factor=2, jitter=0)
+
+    def dailybuild(self, method, url, **kwargs):
+        """
+        response of the release_iso pointer of arch
+        """
+        arch_url = url[len(f"{DAYLIBUILD_URL}{BRANCH}/"):-len("/release_iso")]
+        self.requested.append((self.clock.now, arch_url))
+        if arch_url in self.broken_arch:
+            return self.make_object_data(500, "")
+        published = self.published.get(arch_url)
+        updated = published is not None and self.clock.now >= published
+        return self.make_object_data(200, (NEW_ISO if updated else OLD_ISO) + "\n")
+
+    def new_watcher(self):
+        """
+        watcher of all the arch
+        """
+        return IsoFreshnessWatcher(BRANCH, self.baseline, policy=self.policy)
+
+    def test_probe_all_arch(self):
+        """
+        test the arch are probed at the same time and the results keep the arch names
+        """
+        results = probe_all_arch(lambda arch_url: arch_url.upper(), {"ARM64": "arm", "X86": "x86"})
+        self.assertEqual({"ARM64": "ARM", "X86": "X86"}, results)
+        self.assertEqual({}, probe_all_arch(lambda arch_url: arch_url, {}))
+
+    def test_wait_until_all_updated(self):
+        """
+        test the updated arch is not probed again and the polls back off until all the arch are updated
+        """
+        watcher = self.new_watcher()
+        self.assertTrue(watcher.wait(timeout=3600))
+
+        self.assertEqual([30, 60], self.clock.sleeps)
+        self.assertEqual(
+            [(0, "openeuler_ARM64"), (0, "openeuler_X86"), (30, "openeuler_X86"), (90, "openeuler_X86")],
+            sorted(self.requested),
+        )
+        self.assertEqual(
+            {arch_name: dict(iso_build_url=NEW_ISO.rstrip(), iso_build_time=datetime.datetime(2022, 10, 14, 8))
+             for arch_name in ("ARM64", "X86")},
+            watcher.updated,
+        )
+
+    def test_probe_failure_retried(self):
+        """
+        test an arch which can not be read is probed again by the next poll
+        """
+        self.broken_arch.add("openeuler_ARM64")
+        watcher = self.new_watcher()
+        self.assertEqual(2, watcher.poll())
+        self.broken_arch.clear()
+        self.assertEqual(1, watcher.poll())
+        self.assertEqual(["ARM64"], list(watcher.updated))
+
+    def test_timeout(self):
+        """
+        test the waiting ends at the timeout when an arch is never updated
+        """
+        self.published.pop("openeuler_X86")
+        watcher = self.new_watcher()
+        self.assertFalse(watcher.wait(timeout=100))
+
+        self.assertEqual([30, 60, 10], self.clock.sleeps)
+        self.assertEqual(["X86"], list(watcher.pending))
+
+    def test_grace_deadline(self):
+        """
+        test the waiting ends at the grace time after the build is not running any more
+        """
+        self.published.pop("openeuler_X86")
+        is_building = mock.Mock(side_effect=[True, False])
+        watcher = self.new_watcher()
+        self.assertFalse(watcher.wait(is_building=is_building, grace=100))
+
+        # the build stops at 30, the grace deadline is 130
+        self.assertEqual([30, 60, 40], self.clock.sleeps)
+        self.assertEqual(2, is_building.call_count)
+
+    def test_updated_in_grace_time(self):
+        """
+        test the isos published in the grace time after the build finished are taken
+        """
+        watcher = self.new_watcher()
+        self.assertTrue(watcher.wait(is_building=mock.Mock(return_value=False), grace=100))
+        self.assertEqual(["ARM64", "X86"], sorted(watcher.updated))
+
+    def new_majun_at(self, build_results):
+        """
+        MaJunAt with a mocked jenkins server, the polls of the iso build return build_results in order
+        """
+        jenkins_server = mock.Mock()
+        jenkins_server.get_build_info.side_effect = [{"result": result} for result in build_results]
+        waiter_policy = BackoffPolicy(min_delay=0, max_delay=0, jitter=0)
+        majun_at = MaJunAt()
+        majun_at.iso_build_first_info = self.baseline
+        majun_at.jenkins_server_obj = mock.Mock()
+        majun_at.jenkins_server_obj.build_specific_job.return_value = 7
+        majun_at.jenkins_server_obj.new_build_waiter.side_effect = lambda *args: BuildWaiter(
+            jenkins_server, policy=waiter_policy)
+        return majun_at
+
+    def test_watch_iso_build(self):
+        """
+        test the updated isos are returned once they are published after the build
+        """
+        majun_at = self.new_majun_at([None, None, "SUCCESS"])
+        updated = majun_at.watch_iso_build(BRANCH, "iso_build", {"make_iso": 1})
+
+        self.assertEqual(["ARM64", "X86"], sorted(updated))
+        majun_at.jenkins_server_obj.build_specific_job.assert_called_once_with("iso_build", {"make_iso": 1})
+
+    def test_watch_iso_build_failed(self):
+        """
+        test the waiting is aborted at once when the iso build fails
+        """
+        self.published.pop("openeuler_X86")
+        majun_at = self.new_majun_at([None, "FAILURE"])
+        self.assertRaises(ValueError, majun_at.watch_iso_build, BRANCH, "iso_build", {})
+        self.assertEqual(1, len(self.clock.sleeps))
+
+    def test_watch_iso_build_not_started(self):
+        """
+        test the isos are not watched when the iso build can not be started
+        """
+        majun_at = self.new_majun_at([])
+        majun_at.jenkins_server_obj.build_specific_job.return_value = None
+        self.assertRaises(ValueError, majun_at.watch_iso_build, BRANCH, "iso_build", {})
+        self.assertEqual([], self.requested)
+
+    def test_watch_iso_build_not_published(self):
+        """
+        test the waiting fails when the isos are not published in the grace time after the build
+        """
+        self.published.pop("openeuler_X86")
+        majun_at = self.new_majun_at(["SUCCESS"])
+        self.assertRaises(ValueError, majun_at.watch_iso_build, BRANCH, "iso_build", {})
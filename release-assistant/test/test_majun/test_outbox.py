@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestMajunOutbox
+"""
+import json
+import time
+
+import requests
+from requests import ConnectionError as RequestsConnectionError
+from test.base.basetest import TestMixin
+from javcra.application.majun import send_content_majun
+from javcra.application.majun.outbox import MajunOutbox, MajunSender
+from javcra.libs.config import global_config
+
+
+class TestMajunOutbox(TestMixin):
+    """
+    class for test the outbox of majun callbacks
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_patch("javcra.libs.config.global_config.MAJUN_CALLBACK_MIN_DELAY", new=2)
+        self._create_patch("javcra.libs.config.global_config.MAJUN_CALLBACK_MAX_DELAY", new=10)
+        self._create_patch("javcra.libs.config.global_config.MAJUN_CALLBACK_MAX_ATTEMPTS", new=3)
+        self.outbox = MajunOutbox()
+
+    def make_due(self, majun_id):
+        """
+        make the next attempt of callback due at once
+        """
+        with self.outbox._connect() as conn:
+            conn.execute("UPDATE callbacks SET next_attempt = 0 WHERE majun_id = ?", (majun_id,))
+
+    def next_attempt(self, majun_id):
+        """
+        next attempt time of callback
+        """
+        with self.outbox._connect() as conn:
+            return conn.execute("SELECT next_attempt FROM callbacks WHERE majun_id = ?", (majun_id,)).fetchone()[0]
+
+    def test_put_and_dedup(self):
+        """
+        test an undelivered callback is replaced, and the delivered one is not stored again
+        """
+        self.assertTrue(self.outbox.put("1", {"data": "old"}))
+        self.assertTrue(self.outbox.put("1", {"data": "new"}))
+        self.assertEqual([("1", {"data": "new"}, 0)], self.outbox.claim(10, 60))
+        self.outbox.mark_delivered(["1"])
+        self.assertFalse(self.outbox.put("1", {"data": "new"}))
+        self.assertIsNotNone(self.outbox.status("1")[0])
+        # a different callback of the same id is sent again
+        self.assertTrue(self.outbox.put("1", {"data": "newer"}))
+        self.assertIsNone(self.outbox.status("1")[0])
+        self.assertIsNone(self.outbox.status("2"))
+
+    def test_claim_lease(self):
+        """
+        test the claimed callbacks are not claimed again during the lease, and claim keeps the limit
+        """
+        for majun_id in ("1", "2", "3"):
+            self.outbox.put(majun_id, {"id": majun_id})
+        self.assertEqual(["1", "2"], [majun_id for majun_id, _, _ in self.outbox.claim(2, 60)])
+        self.assertEqual(["3"], [majun_id for majun_id, _, _ in self.outbox.claim(2, 60)])
+        self.assertEqual([], self.outbox.claim(2, 60))
+        self.assertGreater(self.next_attempt("1"), time.time() + 50)
+        # the lease expires
+        self.make_due("2")
+        self.assertEqual(["2"], [majun_id for majun_id, _, _ in self.outbox.claim(2, 60)])
+
+    def test_mark_failed_backoff_and_dead_letter(self):
+        """
+        test the delay of retry doubles up to the max delay, and the callback is dead after max attempts
+        """
+        self._create_patch("javcra.libs.config.global_config.MAJUN_CALLBACK_MAX_ATTEMPTS", new=5)
+        self.outbox.put("1", {"id": "1"})
+        delays = []
+        for _ in range(4):
+            start = time.time()
+            self.assertEqual([], self.outbox.mark_failed(["1"], "status code is 500"))
+            delays.append(round(self.next_attempt("1") - start))
+        self.assertEqual([2, 4, 8, 10], delays)
+        self.assertEqual(["1"], self.outbox.mark_failed(["1"], "status code is 500"))
+        self.make_due("1")
+        self.assertEqual([], self.outbox.claim(10, 60))
+        self.assertEqual([("1", 5, "status code is 500")], self.outbox.dead_letters())
+        # a new callback of the id is alive again
+        self.outbox.put("1", {"id": "1", "code": "200"})
+        self.assertEqual(1, len(self.outbox.claim(10, 60)))
+
+    def test_sender_does_not_wait_for_backoff(self):
+        """
+        test a failed callback is left for the next drain instead of waiting for its backoff
+        """
+        ok_resp = self.make_object_data(200, "")
+        self.mock_request(side_effect=[RequestsConnectionError("refused"), ok_resp, ok_resp])
+        start = time.time()
+        self.assertFalse(send_content_majun(["CVE-2022-0001"], "1"))
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(1, self.outbox.status("1")[2])
+
+        # the next run sends the callback left by the last one together with its own
+        self.make_due("1")
+        self.assertTrue(send_content_majun(["CVE-2022-0002"], "2"))
+        self.assertIsNotNone(self.outbox.status("1")[0])
+        self.assertIsNotNone(self.outbox.status("2")[0])
+        posted = [json.loads(call.kwargs["data"])["id"] for call in requests.Session.request.call_args_list]
+        self.assertEqual(["1", "1", "2"], posted)
+
+    def test_dead_callback_not_sent(self):
+        """
+        test the sender gives up a callback after max attempts
+        """
+        self.mock_request(side_effect=RequestsConnectionError("refused"))
+        self.outbox.put("1", {"id": "1"})
+        sender = MajunSender(self.outbox)
+        for _ in range(global_config.MAJUN_CALLBACK_MAX_ATTEMPTS):
+            self.make_due("1")
+            sender.drain()
+        self.make_due("1")
+        self.assertEqual(0, sender.send_due())
+        self.assertIsNotNone(self.outbox.status("1")[1])
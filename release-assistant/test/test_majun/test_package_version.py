@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestPackageVersion
+"""
+from unittest import mock
+
+import requests
+from test.base.basetest import TestMixin
+from javcra.application.majun import package_version
+from javcra.application.majun.package_version import PackageVersion
+
+SPEC_TEMPLATE = """%global major {major}
+Name:           {name}
+Version:        %{{major}}.1
+Release:        {release}
+Summary:        {name}
+License:        MulanPSL-2.0
+
+%description
+{name}
+"""
+
+
+class TestPackageVersion(TestMixin):
+    """
+    class for test PackageVersion
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.specs = {
+            "vim": SPEC_TEMPLATE.format(name="vim", major="9", release="3"),
+            "gcc": SPEC_TEMPLATE.format(name="gcc", major="10", release="1"),
+            "broken": "Name: broken\n%if\n",
+        }
+        self.etags = dict()
+        self.requested = []
+        self.mock_request(side_effect=self.request)
+        self.package_version = PackageVersion()
+        self.package_version.pkglist = ["vim", "gcc", "vim", "broken", "missing"]
+
+    def request(self, method, url, **kwargs):
+        """
+        response of the spec of package on gitee
+        """
+        packagename = url.rsplit("/", 1)[-1][:-len(".spec")]
+        self.requested.append(packagename)
+        etag = self.etags.get(packagename)
+        if packagename not in self.specs:
+            resp = self.make_object_data(404, "")
+        elif etag and kwargs.get("headers", {}).get("If-None-Match") == etag:
+            resp = self.make_object_data(304, "")
+        else:
+            resp = self.make_object_data(200, self.specs[packagename])
+        resp.headers = {"ETag": etag} if etag else {}
+        return resp
+
+    def assert_versions(self):
+        """
+        assert the versions of the specs
+        """
+        versions = self.package_version.gitee_spec_versions("openEuler-22.03-LTS")
+        self.assertEqual(
+            {"vim": ("9.1", "3"), "gcc": ("10.1", "1"), "broken": ("", ""), "missing": ("", "")},
+            versions,
+        )
+        self.assertEqual(["broken", "gcc", "missing", "vim"], sorted(self.requested))
+
+    def test_specs_parsed_by_process_pool(self):
+        """
+        test the downloaded specs are parsed by the worker processes
+        """
+        self._create_patch("javcra.libs.config.global_config.SPEC_PARSE_WORKERS", new=2)
+        self.assert_versions()
+
+    def test_specs_parsed_in_process_when_pool_fails(self):
+        """
+        test the specs are parsed in the current process when the process pool can not start
+        """
+        self._create_patch("javcra.libs.config.global_config.SPEC_PARSE_WORKERS", new=2)
+        self._create_patch("javcra.application.majun.package_version.ProcessPoolExecutor",
+                           side_effect=OSError("no semaphore"))
+        self.assert_versions()
+
+    def test_run_sends_diff_as_detail(self):
+        """
+        test the status sent to majun is same or unknow and the per-package diff of the gitee
+        specs and the obs versions is sent as detail
+        """
+        self._create_patch("javcra.libs.config.global_config.SPEC_PARSE_WORKERS", new=1)
+        obs_versions = {"vim": ("9.0", "1"), "gcc": ("10.1", "1"), "broken": ("1.0", "1")}
+        self._create_patch("javcra.application.majun.package_version.PackageVersion.get_osc_pkg_version",
+                           side_effect=lambda pkg_name, project, arch: obs_versions.get(pkg_name, ("", "")))
+        env_patcher = mock.patch.dict("os.environ", {"majun_access_token": "token"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        send_content_majun = mock.Mock(return_value=True)
+        self._create_patch("javcra.application.majun.package_version.send_content_majun", new=send_content_majun)
+        params = mock.Mock(id="majun-1", pkglist=["vim", "gcc", "broken", "missing"],
+                           task_title="openEuler-22.03-LTS_update20221014")
+
+        self.assertTrue(self.package_version.run(params))
+        status, majun_id = send_content_majun.call_args.args
+        detail = send_content_majun.call_args.kwargs["detail"]
+        self.assertEqual("majun-1", majun_id)
+        self.assertEqual({"vim": "unknow", "gcc": "same", "broken": "unknow", "missing": "unknow"}, status)
+        self.assertEqual({"vim": "newer", "gcc": "same", "broken": "unknow", "missing": "unknow"},
+                         {pkg_name: package_diff["result"] for pkg_name, package_diff in detail.items()})
+        self.assertEqual(("9.1-3", "9.0-1"), (detail["vim"]["base"], detail["vim"]["version"]))
+
+    def test_unchanged_spec_reused_by_etag(self):
+        """
+        test the version of a spec answered by 304 is taken from the cache without parsing
+        """
+        self._create_patch("javcra.libs.config.global_config.SPEC_PARSE_WORKERS", new=1)
+        self.etags = {"vim": '"etag-vim-1"', "gcc": '"etag-gcc-1"'}
+        self.package_version.pkglist = ["vim", "gcc"]
+        self.package_version.gitee_spec_versions("openEuler-22.03-LTS")
+
+        self._create_patch("javcra.application.majun.package_version.parse_spec_text",
+                           side_effect=AssertionError("unchanged spec is parsed"))
+        requests_before = len(requests.Session.request.call_args_list)
+        self.assertEqual(
+            {"vim": ("9.1", "3"), "gcc": ("10.1", "1")},
+            self.package_version.gitee_spec_versions("openEuler-22.03-LTS"),
+        )
+        second_run = requests.Session.request.call_args_list[requests_before:]
+        self.assertEqual(
+            ['"etag-gcc-1"', '"etag-vim-1"'],
+            sorted(call.kwargs["headers"]["If-None-Match"] for call in second_run),
+        )
+
+    def test_unchanged_spec_reused_by_digest(self):
+        """
+        test the version of a spec downloaded again with the same content is taken from the cache
+        """
+        self._create_patch("javcra.libs.config.global_config.SPEC_PARSE_WORKERS", new=1)
+        self.package_version.pkglist = ["vim", "gcc"]
+        self.package_version.gitee_spec_versions("openEuler-22.03-LTS")
+
+        self.specs["gcc"] = SPEC_TEMPLATE.format(name="gcc", major="12", release="2")
+        parsed = []
+        parse_spec_text = package_version.parse_spec_text
+
+        def parse(spec_text):
+            parsed.append(spec_text)
+            return parse_spec_text(spec_text)
+
+        self._create_patch("javcra.application.majun.package_version.parse_spec_text", side_effect=parse)
+        self.assertEqual(
+            {"vim": ("9.1", "3"), "gcc": ("12.1", "2")},
+            self.package_version.gitee_spec_versions("openEuler-22.03-LTS"),
+        )
+        self.assertEqual([self.specs["gcc"]], parsed)
+
+    def test_compare_versions_by_osc(self):
+        """
+        test osc lists only the packages not found in the obs sources of higher priority
+        when the binary lists of the projects can not be read
+        """
+        obs_versions = {
+            ("openEuler:22.03:LTS", "aarch64"): {"vim": ("9.1", "3")},
+            ("openEuler:22.03:LTS", "x86_64"): {"vim": ("9.1", "3"), "gcc": ("10.1", "1")},
+            ("openEuler:22.03:LTS:Epol", "aarch64"): {"gcc": ("10.0", "1"), "broken": ("1.0", "1")},
+        }
+        osc_calls = []
+
+        def get_osc_pkg_version(pkg_name, project, arch):
+            osc_calls.append((project, arch, pkg_name))
+            return obs_versions.get((project, arch), {}).get(pkg_name, ("", ""))
+
+        self._create_patch("javcra.application.majun.package_version.PackageVersion.get_osc_pkg_version",
+                           side_effect=get_osc_pkg_version)
+        diff = self.package_version.compare_versions(
+            "openEuler-22.03-LTS", ["openEuler:22.03:LTS", "openEuler:22.03:LTS:Epol"])
+
+        self.assertEqual(
+            [("openEuler:22.03:LTS", "aarch64", name) for name in ("vim", "gcc", "broken", "missing")]
+            + [("openEuler:22.03:LTS", "x86_64", name) for name in ("gcc", "broken", "missing")]
+            + [("openEuler:22.03:LTS:Epol", "aarch64", name) for name in ("broken", "missing")]
+            + [("openEuler:22.03:LTS:Epol", "x86_64", "missing")],
+            osc_calls,
+        )
+        self.assertEqual(("same", "openEuler:22.03:LTS/aarch64"), (diff["vim"]["result"], diff["vim"]["source"]))
+        self.assertEqual(("same", "openEuler:22.03:LTS/x86_64"), (diff["gcc"]["result"], diff["gcc"]["source"]))
+        self.assertEqual(("unknow", "openEuler:22.03:LTS:Epol/aarch64"),
+                         (diff["broken"]["result"], diff["broken"]["source"]))
+        self.assertEqual(("unknow", ""), (diff["missing"]["result"], diff["missing"]["source"]))
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestSpecVersionCache
+"""
+import os
+
+from test.base.basetest import TestMixin
+from javcra.application.majun.spec_cache import SpecVersionCache
+from javcra.libs.config import global_config
+
+BRANCH = "openEuler-22.03-LTS"
+
+
+class TestSpecVersionCache(TestMixin):
+    """
+    class for test SpecVersionCache
+    """
+
+    def test_cache_file_in_temporary_folder(self):
+        """
+        test the cache of tests is not written to the home folder
+        """
+        cache = SpecVersionCache()
+        self.assertTrue(cache.cache_file.startswith(self.cache_dir))
+        cache.store("vim", BRANCH, "spec of vim", '"etag-vim"', "9.0", "1")
+        cache.save()
+        self.assertTrue(os.path.exists(global_config.SPEC_CACHE_FILE))
+
+    def test_lookup_by_etag_and_digest(self):
+        """
+        test an entry is matched by the ETag of a 304 response or by the digest of a 200 response
+        """
+        cache = SpecVersionCache()
+        cache.store("vim", BRANCH, "spec of vim", '"etag-vim"', "9.0", "1")
+        self.assertEqual('"etag-vim"', cache.etag("vim", BRANCH))
+        self.assertIsNone(cache.etag("vim", "master"))
+        self.assertEqual(("9.0", "1"), cache.lookup("vim", BRANCH, etag='"etag-vim"'))
+        self.assertEqual(("9.0", "1"), cache.lookup("vim", BRANCH, spec_text="spec of vim"))
+        self.assertIsNone(cache.lookup("vim", BRANCH, etag='"etag-other"'))
+        self.assertIsNone(cache.lookup("vim", BRANCH, spec_text="changed spec of vim"))
+        self.assertIsNone(cache.lookup("vim", "master", spec_text="spec of vim"))
+        self.assertEqual({"hit": 2, "miss": 3, "evicted": 0}, cache.stats)
+
+    def test_lru_eviction(self):
+        """
+        test the least recently used entries are evicted, a lookup makes an entry recently used
+        """
+        cache = SpecVersionCache(max_entries=2)
+        cache.store("vim", BRANCH, "spec of vim", None, "9.0", "1")
+        cache.store("gcc", BRANCH, "spec of gcc", None, "10.3", "1")
+        self.assertIsNotNone(cache.lookup("vim", BRANCH, spec_text="spec of vim"))
+        cache.store("zlib", BRANCH, "spec of zlib", None, "1.2", "1")
+        self.assertEqual(1, cache.stats["evicted"])
+        self.assertIsNone(cache.lookup("gcc", BRANCH, spec_text="spec of gcc"))
+        self.assertIsNotNone(cache.lookup("vim", BRANCH, spec_text="spec of vim"))
+        self.assertIsNotNone(cache.lookup("zlib", BRANCH, spec_text="spec of zlib"))
+
+    def test_save_and_load_keep_order(self):
+        """
+        test the entries and their order of use are kept by the cache file
+        """
+        cache = SpecVersionCache(max_entries=2)
+        cache.store("vim", BRANCH, "spec of vim", '"etag-vim"', "9.0", "1")
+        cache.store("gcc", BRANCH, "spec of gcc", '"etag-gcc"', "10.3", "1")
+        cache.lookup("vim", BRANCH, etag='"etag-vim"')
+        cache.save()
+
+        loaded = SpecVersionCache(max_entries=2)
+        loaded.store("zlib", BRANCH, "spec of zlib", None, "1.2", "1")
+        self.assertIsNone(loaded.etag("gcc", BRANCH))
+        self.assertEqual(("9.0", "1"), loaded.lookup("vim", BRANCH, etag='"etag-vim"'))
+
+    def test_broken_cache_file(self):
+        """
+        test a broken cache file is ignored
+        """
+        with open(global_config.SPEC_CACHE_FILE, "w", encoding="utf-8") as file:
+            file.write('[["openEuler-22.03-LTS/vim", {"etag"')
+        cache = SpecVersionCache()
+        self.assertIsNone(cache.lookup("vim", BRANCH, etag='"etag-vim"'))
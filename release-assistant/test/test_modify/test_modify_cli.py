@@ -39,7 +39,7 @@ class TestModify(TestMixin):
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_cve_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp, mock_r, mock_r, mock_final_r, mock_final_r])
+        self.mock_request(side_effect=[resp, resp, mock_r, mock_final_r, resp, mock_final_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=cve", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -53,7 +53,7 @@ class TestModify(TestMixin):
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_bugfix_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp, resp, mock_r, mock_final_r, mock_final_r])
+        self.mock_request(side_effect=[resp, resp, mock_r, resp, mock_final_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=bugfix", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -70,7 +70,7 @@ update remain issues successfully.
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_remain_success.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp,resp, mock_r, mock_r, resp, resp, resp, mock_r, mock_r, mock_final_r])
+            side_effect=[resp, resp, mock_r, resp, resp, resp, resp, mock_r, resp, mock_r, mock_final_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=remain", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -83,7 +83,7 @@ update remain issues successfully.
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp,resp, mock_r, mock_r, resp, RequestException])
+        self.mock_request(side_effect=[resp, resp, mock_r, resp, resp, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=cve", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -96,8 +96,7 @@ update remain issues successfully.
 [ERROR] failed to add I3AQ2G in bugfix.
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
-        mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp,resp, mock_r, mock_r, RequestException])
+        self.mock_request(side_effect=[resp, resp, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=bugfix", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -113,7 +112,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp,mock_r, mock_r, RequestException, RequestException])
+            side_effect=[resp, resp, mock_r, RequestException, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=remain", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -130,7 +129,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_remain_not_in_cve_and_bugfix.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp,mock_r, mock_r, resp, resp, resp, mock_r, mock_r, mock_final_r])
+            side_effect=[resp, resp, mock_r, resp, resp, resp, resp, mock_r, mock_r, mock_final_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--add=remain", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -144,7 +143,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('delete_cve_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp,resp, mock_r])
+        self.mock_request(side_effect=[resp, resp, resp, mock_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=cve", "--token=example", "--id=I3V9IG"]
         self.assert_result()
 
@@ -158,7 +157,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('delete_bugfix_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp, resp, resp, mock_r])
+        self.mock_request(side_effect=[resp, resp, resp, mock_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=bugfix", "--token=example", "--id=I3J655"]
         self.assert_result()
 
@@ -175,7 +174,8 @@ update remain issues successfully.
         mock_r = self.make_need_content('delete_remain_success.txt', MOCK_DATA_FILE)
         mock_issue_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('delete_update_remain_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp,resp, mock_r, mock_r, mock_issue_r, mock_issue_r, mock_final_r])
+        self.mock_request(side_effect=[resp, resp, mock_r, mock_r, mock_r, mock_issue_r, mock_r, mock_issue_r,
+                                       mock_final_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=remain", "--token=example", "--id=I3SZRJ"]
         self.assert_result()
 
@@ -188,7 +188,7 @@ update remain issues successfully.
 [ERROR] failed to delete I3V9IG in cve.
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
-        self.mock_request(side_effect=[resp, resp, resp, resp,RequestException])
+        self.mock_request(side_effect=[resp, resp, resp, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=cve", "--token=example", "--id=I3V9IG"]
         self.assert_result()
 
@@ -201,7 +201,7 @@ update remain issues successfully.
 [ERROR] failed to delete I3J655 in bugfix.
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
-        self.mock_request(side_effect=[resp, resp, resp, resp, resp, RequestException])
+        self.mock_request(side_effect=[resp, resp, resp, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=bugfix", "--token=example", "--id=I3J655"]
         self.assert_result()
 
@@ -216,7 +216,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         self.mock_request(
-            side_effect=[resp, resp, resp, resp,RequestException, RequestException])
+            side_effect=[resp, resp, RequestException, RequestException])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=remain", "--token=example", "--id=I3SZRJ"]
         self.assert_result()
 
@@ -266,7 +266,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('add_issue_info.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp,resp, mock_r, mock_r, resp, resp, RequestException])
+        self.mock_request(side_effect=[resp, resp, resp, mock_r, mock_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=remain", "--token=example", "--id=I3AQ2G"]
         self.assert_result()
 
@@ -280,7 +280,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('delete_multiple_cve_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp,resp, mock_r])
+        self.mock_request(side_effect=[resp, resp, resp, mock_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=cve", "--token=example", "--id", "I3V9IG",
                                "I3AQ2G"]
         self.assert_result()
@@ -295,7 +295,7 @@ failed to update remain issues, please check whether the issue exist in cve and
         """
         resp = self.make_expect_data(200, 'modifypart.txt')
         mock_r = self.make_need_content('delete_multiple_bugfix_success.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, resp, resp, resp, resp, mock_r])
+        self.mock_request(side_effect=[resp, resp, resp, mock_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=bugfix", "--token=example", "--id", "I3J655",
                                "I3AHLY"]
         self.assert_result()
@@ -316,8 +316,8 @@ update remain issues successfully.
         mock_issue_1_r = self.make_need_content('mock_remain_issue_1_data.txt', MOCK_DATA_FILE)
         mock_issue_2_r = self.make_need_content('mock_remain_issue_2_data.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp,resp, mock_r, mock_r, mock_issue_1_r, mock_issue_1_r, mock_final_1_r, mock_r,
-                         mock_issue_2_r, mock_issue_2_r, mock_final_2_r])
+            side_effect=[resp, resp, mock_r, mock_r, mock_r, mock_issue_1_r, mock_final_1_r, mock_r, mock_r,
+                         mock_issue_1_r, mock_issue_2_r, mock_final_2_r])
         self.command_params = ["I40769", "--giteeid=Mary", "--delete=remain", "--token=example", "--id", "I3SZRJ",
                                "I3OC6A"]
         self.assert_result()
@@ -359,7 +359,7 @@ update remain issues successfully.
         mock_cve_basescore_r = self.make_need_content('mock_issue_basescore.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_cve_success.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, mock_cve_basescore_r, mock_cve_basescore_r, mock_final_r, mock_final_r])
+            side_effect=[resp, resp, mock_cve_basescore_r, mock_final_r, resp, mock_final_r])
         self.assert_result()
 
     def test_cve_no_score(self):
@@ -374,7 +374,7 @@ update remain issues successfully.
         mock_cve_no_core_r = self.make_need_content('mock_issue_no_score.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_cve_no_score.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, mock_cve_no_core_r, mock_cve_no_core_r, mock_final_r, mock_final_r])
+            side_effect=[resp, resp, mock_cve_no_core_r, mock_final_r, resp, mock_final_r])
         self.assert_result()
 
     def test_cve_abi_yes(self):
@@ -389,7 +389,7 @@ update remain issues successfully.
         mock_cve_abi_r = self.make_need_content('mock_issue_abi.txt', MOCK_DATA_FILE)
         mock_final_r = self.make_need_content('add_cve_abi_success.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, resp, mock_cve_abi_r, mock_cve_abi_r, mock_final_r, mock_final_r])
+            side_effect=[resp, resp, mock_cve_abi_r, mock_final_r, resp, mock_final_r])
         self.assert_result()
 
     def test_verify_start_update_failed(self):
@@ -400,7 +400,6 @@ update remain issues successfully.
 [ERROR] not allowed operation, please start release issue first.
         """
         self.command_params = ["I40769", "--giteeid=Mary", "--add=cve", "--token=example", "--id=I3AQ2G"]
-        resp = self.make_expect_data(200, 'modifypart.txt')
         mock_verify_start_update_data = self.make_need_content('verify_start_update_failed.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, mock_verify_start_update_data])
+        self.mock_request(side_effect=[mock_verify_start_update_data])
         self.assert_result()
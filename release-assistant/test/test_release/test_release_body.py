@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+TestReleaseBody
+"""
+import os
+
+from test.base.basetest import TestMixin
+from javcra.common.release_body import ReleaseBody, ReleaseBodyEdits
+
+MOCK_DATA_FILE = os.path.join(os.path.abspath(os.path.dirname(__file__)), "mock_data")
+RELEASEPART_BODIES = [
+    "releasepart_abnormal_date_info.txt",
+    "releasepart_date_info_index_error.txt",
+    "releasepart_not_exist_date_info.txt",
+    "releasepart_not_exist_remain_issue.txt",
+]
+CVE_ROW = "|#I3V9IG|mariadb|已完成|9.0|10.3.9|否|\n"
+NEW_CVE_ROW = "|#I41R53|krb5|已完成|7.5|1.18.2|否|\n"
+BUGFIX_ROW = "|#I3AQ2G|kernel|已完成|\n"
+
+
+class TestReleaseBody(TestMixin):
+    """
+    class for test ReleaseBody and ReleaseBodyEdits
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.bodies = [self.read_file_content(name, folder=MOCK_DATA_FILE)["body"] for name in RELEASEPART_BODIES]
+        self.body = self.bodies[0]
+
+    def test_round_trip(self):
+        """
+        test the parsed body is serialized to the same markdown
+        """
+        for body in self.bodies:
+            self.assertEqual(body, ReleaseBody.parse(body).to_markdown())
+            self.assertEqual(body, ReleaseBodyEdits().apply(body))
+        self.assertEqual("", ReleaseBody.parse(None).to_markdown())
+
+    def test_header(self):
+        """
+        test the fields before the first block
+        """
+        header = ReleaseBody.parse(self.body).header
+        self.assertEqual("openEuler-20.03-LTS-SP1", header["版本"])
+        self.assertEqual("20210420", header["例行CVE冻结"])
+        self.assertIsNone(header["版本发布负责人"])
+
+    def test_block_lookup(self):
+        """
+        test the blocks are found by name with or without the title marks
+        """
+        release_body = ReleaseBody.parse(self.body)
+        cve_block = release_body.block("1、CVE")
+        self.assertIs(cve_block, release_body.block("## 1、CVE"))
+        self.assertEqual(["CVE", "仓库", "status", "score", "version", "abi是否变化"], cve_block.table_head)
+        self.assertEqual(["I3V9IG"], cve_block.issue_ids())
+        self.assertEqual("mariadb", cve_block.row("I3V9IG").column(1))
+        self.assertEqual([], release_body.block("2、bugfix").issue_ids())
+        self.assertIsNone(release_body.block("5、not exist"))
+
+    def test_append(self):
+        """
+        test appending rows refreshes the counter and keeps the other blocks
+        """
+        edits = ReleaseBodyEdits()
+        edits.append("1、CVE", "I41R53", NEW_CVE_ROW)
+        edits.append("1、CVE", "I3V9IG", CVE_ROW)
+        edits.append("2、bugfix", "I3AQ2G", BUGFIX_ROW)
+        new_body = edits.apply(self.body)
+
+        release_body = ReleaseBody.parse(new_body)
+        self.assertEqual(["I3V9IG", "I41R53"], release_body.block("1、CVE").issue_ids())
+        self.assertIn("修复CVE 2个\n", new_body)
+        self.assertIn("|-|-|-|\n" + BUGFIX_ROW + "\n", new_body)
+        self.assertEqual(self.body.split("# 2、测试repo源")[1], new_body.split("# 2、测试repo源")[1])
+
+    def test_delete_and_update(self):
+        """
+        test deleting and replacing rows by issue id
+        """
+        edits = ReleaseBodyEdits()
+        edits.append("1、CVE", "I41R53", NEW_CVE_ROW)
+        edits.update("1、CVE", "I41R53", NEW_CVE_ROW.replace("已完成", "待修复"))
+        edits.delete("1、CVE", "I3V9IG")
+        edits.delete("1、CVE", "I3V9IG")
+        new_body = edits.apply(self.body)
+
+        self.assertNotIn(CVE_ROW, new_body)
+        self.assertIn("修复CVE 1个\n", new_body)
+        self.assertEqual("待修复", ReleaseBody.parse(new_body).block("1、CVE").row("I41R53").column(2))
+
+    def test_replace(self):
+        """
+        test replacing a whole block re-indexes its rows and counter
+        """
+        edits = ReleaseBodyEdits()
+        edits.replace("1、CVE", "## 1、CVE\n修复CVE 1个\n|CVE|仓库|\n|-|-|\n|#I41R53|krb5|\n|#I3SZRJ|qemu|\n")
+        edits.delete("1、CVE", "I41R53")
+        new_body = edits.apply(self.body)
+
+        cve_block = ReleaseBody.parse(new_body).block("1、CVE")
+        self.assertEqual(["I3SZRJ"], cve_block.issue_ids())
+        self.assertEqual("修复CVE 1个\n", cve_block.lines[1])
+        self.assertEqual(["CVE", "仓库"], cve_block.table_head)
+
+    def test_missing_block(self):
+        """
+        test the edit of a block not in body raises ValueError
+        """
+        edits = ReleaseBodyEdits()
+        edits.append("5、not exist", "I41R53", NEW_CVE_ROW)
+        self.assertRaises(ValueError, edits.apply, self.body)
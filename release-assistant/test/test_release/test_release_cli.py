@@ -53,9 +53,82 @@ remain issues exists, need to delete rpms for repo.
         mock_publish_epol_comment = self.make_need_content('publish_epol_comments_success.txt', MOCK_DATA_FILE)
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
         self.mock_request(
-            side_effect=[resp, resp, test_comment_data, resp, resp, resp, resp, mock_remain_issue_data,
-                         mock_delete_remain_standard_comment, mock_delete_remain_epol_comment,
-                         mock_publish_standard_comment, mock_publish_epol_comment])
+            side_effect=[resp, test_comment_data, resp, mock_remain_issue_data, mock_delete_remain_standard_comment,
+                         mock_delete_remain_epol_comment, mock_publish_standard_comment, mock_publish_epol_comment])
+        self.assert_result()
+
+    def test_checkok_classify_by_repodata_success(self):
+        """
+        test checkok success, the packages are classified by the repodata instead of dnf
+        """
+        self.expect_str = """
+remain issues exists, need to delete rpms for repo.
+[INFO] successfully create del_pkg_rpm standard rpm jenkins res
+[INFO] successfully create del_pkg_rpm epol rpm jenkins res
+[INFO] successfully create release standard rpm jenkins res
+[INFO] successfully create release epol rpm jenkins res
+        """
+        self.command_params = ["--giteeid=Mary", "--token=example", "--type=checkok", "--jenkinsuser=mary",
+                               "--jenkinskey=marykey", "--publishuser=tom", "--publishkey=tomkey", "I40769"]
+        repomd = self.read_file_content("repomd.xml", folder=MOCK_DATA_FILE, is_json=False).encode("utf-8")
+        standard_primary = self.read_file_content("standard_primary.xml", folder=MOCK_DATA_FILE,
+                                                  is_json=False).encode("utf-8")
+        epol_primary = self.read_file_content("epol_primary.xml", folder=MOCK_DATA_FILE,
+                                              is_json=False).encode("utf-8")
+
+        def fetch_repodata(url):
+            if url.endswith("repomd.xml"):
+                return repomd
+            return epol_primary if "/EPOL/" in url else standard_primary
+
+        self.mock_repodata_fetch(side_effect=fetch_repodata)
+        resp = self.make_expect_data(200, 'releasepart.txt')
+        self.prepare_jenkins_data()
+        self.mock_osc_call_subprocess(return_value="test-1.7-1.oe2309.src.rpm\n")
+        self.mock_subprocess_check_output(side_effect=AssertionError("dnf is not expected to be called"))
+        mock_remain_issue_data = self.make_need_content('mock_remain_issue.txt', MOCK_DATA_FILE)
+        mock_delete_remain_standard_comment = self.make_need_content('delete_remain_standard_comments_success.txt',
+                                                                     MOCK_DATA_FILE)
+        mock_delete_remain_epol_comment = self.make_need_content('delete_remain_epol_comments_success.txt',
+                                                                 MOCK_DATA_FILE)
+        mock_publish_standard_comment = self.make_need_content('publish_standard_comments_success.txt', MOCK_DATA_FILE)
+        mock_publish_epol_comment = self.make_need_content('publish_epol_comments_success.txt', MOCK_DATA_FILE)
+        test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
+        self.mock_request(
+            side_effect=[resp, test_comment_data, resp, mock_remain_issue_data, mock_delete_remain_standard_comment,
+                         mock_delete_remain_epol_comment, mock_publish_standard_comment, mock_publish_epol_comment])
+        self.assert_result()
+
+    def test_checkok_list_obs_binaries_success(self):
+        """
+        test checkok success, the rpm names are read from the binary list of obs project instead of osc
+        """
+        self.expect_str = """
+remain issues exists, need to delete rpms for repo.
+[INFO] successfully create del_pkg_rpm standard rpm jenkins res
+[INFO] successfully create del_pkg_rpm epol rpm jenkins res
+[INFO] successfully create release standard rpm jenkins res
+[INFO] successfully create release epol rpm jenkins res
+        """
+        self.command_params = ["--giteeid=Mary", "--token=example", "--type=checkok", "--jenkinsuser=mary",
+                               "--jenkinskey=marykey", "--publishuser=tom", "--publishkey=tomkey", "I40769"]
+        binarylist = self.read_file_content("obs_binarylist.xml", folder=MOCK_DATA_FILE, is_json=False)
+        self.mock_obs_binary_fetch(return_value=binarylist.encode("utf-8"))
+        resp = self.make_expect_data(200, 'releasepart.txt')
+        self.prepare_jenkins_data()
+        self.mock_osc_call_subprocess(side_effect=AssertionError("osc is not expected to be called"))
+        self.mock_subprocess_check_output(return_value=b'published-Epol-src')
+        mock_remain_issue_data = self.make_need_content('mock_remain_issue.txt', MOCK_DATA_FILE)
+        mock_delete_remain_standard_comment = self.make_need_content('delete_remain_standard_comments_success.txt',
+                                                                     MOCK_DATA_FILE)
+        mock_delete_remain_epol_comment = self.make_need_content('delete_remain_epol_comments_success.txt',
+                                                                 MOCK_DATA_FILE)
+        mock_publish_standard_comment = self.make_need_content('publish_standard_comments_success.txt', MOCK_DATA_FILE)
+        mock_publish_epol_comment = self.make_need_content('publish_epol_comments_success.txt', MOCK_DATA_FILE)
+        test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
+        self.mock_request(
+            side_effect=[resp, test_comment_data, resp, mock_remain_issue_data, mock_delete_remain_standard_comment,
+                         mock_delete_remain_epol_comment, mock_publish_standard_comment, mock_publish_epol_comment])
         self.assert_result()
 
     def test_checkok_failed(self):
@@ -73,7 +146,7 @@ during the operation checkok, a failure occurred, and the cause of the error was
         self.mock_subprocess_check_output(return_value=b'published-Epol-src')
         mock_remain_issue_data = self.make_need_content('mock_remain_issue.txt', MOCK_DATA_FILE)
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data, resp, resp, resp, resp, mock_remain_issue_data])
+        self.mock_request(side_effect=[resp, test_comment_data, resp, mock_remain_issue_data])
         self.assert_result()
 
     def test_checkok_date_info_not_in_issue_body(self):
@@ -91,7 +164,7 @@ during the operation checkok, a failure occurred, and the cause of the error was
         self.mock_jenkins_build_job(return_value=0)
         self.mock_subprocess_check_output(return_value=b'published-Epol-src')
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data, resp, resp, not_exist_date_info_data])
+        self.mock_request(side_effect=[resp, test_comment_data, not_exist_date_info_data])
         self.assert_result()
 
     def test_checkok_abnormal_date_info(self):
@@ -109,7 +182,7 @@ during the operation checkok, a failure occurred, and the cause of the error was
         self.mock_jenkins_build_job(return_value=0)
         self.mock_subprocess_check_output(return_value=b'published-Epol-src')
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data, resp, resp, abnormal_date_info_data])
+        self.mock_request(side_effect=[resp, test_comment_data, abnormal_date_info_data])
         self.assert_result()
 
     def test_checkok_date_info_index_error(self):
@@ -127,7 +200,7 @@ during the operation checkok, a failure occurred, and the cause of the error was
         self.mock_jenkins_build_job(return_value=0)
         self.mock_subprocess_check_output(return_value=b'published-Epol-src')
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data, resp, resp, abnormal_date_info_data])
+        self.mock_request(side_effect=[resp, test_comment_data, abnormal_date_info_data])
         self.assert_result()
 
     def test_cvrfok_success(self):
@@ -144,7 +217,7 @@ successful announcement
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
         self.mock_request(return_value=resp)
         self.mock_requests_post(return_value=mock_post_data)
-        self.mock_request(side_effect=[resp, resp, test_comment_data])
+        self.mock_request(side_effect=[resp, test_comment_data])
         self.assert_result()
 
     def test_cvrfok_successfully_not_in_text(self):
@@ -159,7 +232,7 @@ during the operation cvrfok, a failure occurred, and the cause of the error was
         resp = self.make_expect_data(200, 'releasepart.txt')
         mock_post_data = self.make_need_content('mock_post_failed_data.txt', MOCK_DATA_FILE)
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data])
+        self.mock_request(side_effect=[resp, test_comment_data])
         self.mock_requests_post(return_value=mock_post_data)
         self.assert_result()
 
@@ -177,7 +250,7 @@ during the operation cvrfok, a failure occurred, and the cause of the error was
         self.mock_request(return_value=resp)
 
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data])
+        self.mock_request(side_effect=[resp, test_comment_data])
 
         self.mock_requests_post(return_value=mock_post_data)
         self.assert_result()
@@ -194,7 +267,7 @@ during the operation cvrfok, a failure occurred, and the cause of the error was
         resp = self.make_expect_data(200, 'releasepart.txt')
         mock_post_data = self.make_object_data(200, "")
         test_comment_data = self.make_need_content('mock_test_comments.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, resp, test_comment_data])
+        self.mock_request(side_effect=[resp, test_comment_data])
         self.mock_requests_post(return_value=mock_post_data)
         self.assert_result()
 
@@ -229,9 +302,8 @@ Parameter validation failed
         """
         self.command_params = ["--giteeid=Mary", "--token=example", "--type=checkok", "--jenkinsuser=mary",
                                "--jenkinskey=marykey", "--publishuser=tom", "--publishkey=tomkey", "I40769"]
-        resp = self.make_expect_data(200, 'modifypart.txt')
         mock_verify_start_update_data = self.make_need_content('verify_start_update_failed.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, mock_verify_start_update_data])
+        self.mock_request(side_effect=[mock_verify_start_update_data])
         self.assert_result()
 
     def prepare_jenkins_data(self):
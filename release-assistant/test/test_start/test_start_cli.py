@@ -55,7 +55,7 @@ class TestStart(TestMixin):
         mock_label = self.make_need_content('mock_update_label.txt', MOCK_DATA_FILE)
         mock_issue_comment = self.make_need_content('mock_issue_comment.txt', MOCK_DATA_FILE)
         mock_issue_info = self.make_need_content('mock_issue_info.txt', MOCK_DATA_FILE)
-        self.mock_request(side_effect=[resp, mock_issue_comment, resp, resp, mock_issue_info, mock_init_r, mock_label])
+        self.mock_request(side_effect=[resp, mock_issue_comment, resp, mock_issue_info, mock_init_r, mock_label])
         mock_get_r = self.make_object_data(200, "The number of requests is too frequent, "
                                                 "please try again later, there is currently a task being processed")
         self.mock_requests_get(side_effect=[mock_get_r])